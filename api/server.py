@@ -1,16 +1,29 @@
-from fastapi import FastAPI, HTTPException, Request, Depends
+from fastapi import FastAPI, HTTPException, Request, Depends, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+from pathlib import Path
 from core.bot_manager import BotManager
 from core.trading_engine import TradingEngine 
+from core.engine.bar_builder import bar_builder
+from core.engine import event_journal
+from core import log_reader
+from core.log_index import log_index
+from core.log_search import log_search
+from core.status_hub import status_hub, diff_status
+from core import fast_json
+from core.jwt_verifier import TokenVerifier
+from core.run_state import run_state_manager
+from core.account_pool import AccountPool, OutcomeUnknown
 from supabase import create_client, Client
 import asyncio
 import os
+import requests
 import signal
 import sys
+import time
 from dotenv import load_dotenv
 from cachetools import TTLCache 
 
@@ -25,6 +38,18 @@ if os.path.exists(DB_PATH):
     except Exception as e:
         print(f"[STARTUP] Could not clean DB (may be locked): {e}")
 
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with core.fast_json (orjson when available).
+    Accepts pre-serialized bytes as content. Return it directly from a route
+    to also skip FastAPI's jsonable_encoder pass.
+    """
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return fast_json.dumps(content)
+
 app = FastAPI()
 
 app.add_middleware(
@@ -35,21 +60,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(ConnectionError)
+async def account_worker_unavailable(request: Request, exc: ConnectionError):
+    """An account worker that is down or not answering (core.account_pool)."""
+    if isinstance(exc, OutcomeUnknown):
+        # The action was sent: the client must not assume it did not happen
+        return FastJSONResponse({"detail": str(exc), "outcome": "unknown"}, status_code=503)
+    return FastJSONResponse({"detail": str(exc)}, status_code=503)
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Auth: tokens are verified locally (signature/expiry) when a key source is
+# configured; otherwise via supabase.auth.get_user with a short TTL cache
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1000"))
+AUTH_OFFLINE_JWKS = os.getenv("AUTH_OFFLINE_JWKS", "1") == "1"
+
+# Restart the users/symbols that were running before a crash or restart.
+# Off by default: cycle state is not restored, so symbols with positions
+# still open are never resumed (see StrategyOrchestrator.resume)
+AUTO_RESUME = os.getenv("AUTO_RESUME", "0") == "1"
+
+# Users allowed to call /admin/* endpoints (comma-separated Supabase user ids)
+ADMIN_USER_IDS = {u.strip() for u in os.getenv("ADMIN_USER_IDS", "").split(",") if u.strip()}
+
 # Auth Cache (30 seconds - shorter TTL for multi-user support)
-auth_cache = TTLCache(maxsize=100, ttl=30)
+auth_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=30)
 
 # --- 1. Initialize Core Systems ---
-bot_manager = BotManager()
+# Extra MT5 accounts (MT5_ACCOUNTS_FILE): their users run in per-account
+# worker processes; everyone else stays on this process's engine
+account_pool = AccountPool.from_file(auto_resume=AUTO_RESUME)
+bot_manager = BotManager(
+    idle_timeout=float(os.getenv("BOT_IDLE_TIMEOUT", BotManager.IDLE_TIMEOUT)),
+    max_resident=int(os.getenv("BOT_MAX_RESIDENT", BotManager.MAX_RESIDENT)),
+    pool=account_pool,
+)
 trading_engine = TradingEngine(bot_manager)
 
+_resume_task: Optional[asyncio.Task] = None
+
+async def _auto_resume(ready: asyncio.Future, boot_t0: float):
+    """Wait for MT5, then resume every previously running user concurrently."""
+    running = run_state_manager.get_running_symbols()
+    print(f"[RESUME] Waiting for engine to resume {len(running)} users...")
+    try:
+        await asyncio.shield(ready)
+    except Exception as e:
+        print(f"[RESUME] Engine failed to start, not resuming: {e}")
+        return
+    engine_ms = round((time.perf_counter() - boot_t0) * 1000, 2)
+    report = await bot_manager.resume_all(running)
+    report["engine_wait_ms"] = engine_ms
+    report["time_to_resume_ms"] = round((time.perf_counter() - boot_t0) * 1000, 2)
+    print(f"[RESUME] Time to resume: {report['time_to_resume_ms']}ms (engine {engine_ms}ms)")
+
 @app.on_event("startup")
 async def startup_event():
+    global _resume_task
+    boot_t0 = time.perf_counter()
     print("[SERVER] Starting: Launching Monolith Engine...")
-    asyncio.create_task(trading_engine.start())
+    ready = trading_engine.start_in_background()
+    if account_pool is not None:
+        await account_pool.start()
+    if AUTO_RESUME and run_state_manager.get_all_running_users():
+        _resume_task = asyncio.create_task(_auto_resume(ready, boot_t0))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if account_pool is not None:
+        await account_pool.stop()
 
 
 # --- Pydantic Models for Config ---
@@ -68,6 +150,7 @@ class SymbolConfig(BaseModel):
     single_fire_tp_pips: Optional[float] = None  # Single fire TP distance
     single_fire_sl_pips: Optional[float] = None  # Single fire SL distance
     protection_distance: Optional[float] = None  # Pips before nuclear reset on reversal
+    single_fire_prefetch_fraction: Optional[float] = None  # Pre-resolve direction within this fraction of trigger distance
 
 class GlobalConfig(BaseModel):
     """Global settings"""
@@ -78,6 +161,19 @@ class ConfigUpdate(BaseModel):
     global_settings: Optional[GlobalConfig] = None
     symbols: Optional[Dict[str, SymbolConfig]] = None
 
+class BatchAction(BaseModel):
+    """One symbol action in a batch control request"""
+    symbol: str
+    action: str  # start | stop | terminate
+
+class BatchControl(BaseModel):
+    """Batch of symbol actions for the calling user"""
+    actions: List[BatchAction]
+
+class AdminBatchControl(BaseModel):
+    """Batch of symbol actions per user (admin)"""
+    users: Dict[str, List[BatchAction]]
+
 
 # --- 2. Auth Helper ---
 def verify_token_sync(token):
@@ -100,12 +196,39 @@ def verify_token_sync(token):
             del auth_cache[token]
     return None
 
+def _fetch_jwks() -> dict:
+    """Supabase project signing keys (asymmetric JWTs)."""
+    response = requests.get(f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+                            headers={"apikey": SUPABASE_KEY}, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+def _revalidate_token(token: str) -> Optional[bool]:
+    """Background revocation check: False if Supabase rejects the token."""
+    try:
+        user = supabase.auth.get_user(token)
+    except Exception as e:
+        if getattr(e, "status", None) in (401, 403):
+            return False
+        raise  # Transient (network etc.) - keep the token
+    return bool(user and user.user)
+
+token_verifier = TokenVerifier(
+    secret=SUPABASE_JWT_SECRET,
+    jwks_fetcher=_fetch_jwks if (SUPABASE_URL and AUTH_OFFLINE_JWKS) else None,
+    cache_size=AUTH_CACHE_SIZE,
+    revalidate=_revalidate_token,
+)
+
 async def get_current_bot(request: Request):
     """
     Get or create bot instance for the authenticated user.
     Each user gets their own isolated bot instance.
     """
-    auth_header = request.headers.get('Authorization')
+    return await _bot_for_auth_header(request.headers.get('Authorization'))
+
+async def _bot_for_auth_header(auth_header: Optional[str]):
+    """Resolve an `Authorization` header value to the user's bot (raises 401)."""
     if not auth_header: 
         # [DEBUG] Allow debug token for testing without Supabase
         # raise HTTPException(401, "Missing token")
@@ -117,22 +240,27 @@ async def get_current_bot(request: Request):
     
     try:
         token = auth_header.split(" ")[1]
-        user = await asyncio.to_thread(verify_token_sync, token)
+        if token_verifier.can_verify(token):
+            # Local signature/expiry check; revocation is checked in the background
+            user_id = await token_verifier.authenticate(token)
+        else:
+            user = await asyncio.to_thread(verify_token_sync, token)
+            user_id = user.user.id if user else None
     except Exception as e:
         print(f"[AUTH] Check Failed: {e}")
         raise HTTPException(401, "Auth Validation Failed")
 
-    if not user: 
+    if not user_id: 
         raise HTTPException(401, "Invalid Token")
     
     # Each user gets their own bot instance (multi-tenant support)
-    return await bot_manager.get_or_create_bot(user.user.id)
+    return await bot_manager.get_or_create_bot(user_id)
 
 # --- 3. API Routes (Defined BEFORE Static Mount) ---
 
 @app.get("/env")
 async def get_env():
-    return { "SUPABASE_URL": SUPABASE_URL, "SUPABASE_KEY": SUPABASE_KEY }
+    return FastJSONResponse({ "SUPABASE_URL": SUPABASE_URL, "SUPABASE_KEY": SUPABASE_KEY })
 
 @app.get("/health", status_code=200)
 @app.head("/health", status_code=200)
@@ -140,10 +268,25 @@ async def health_check():
     """Lightweight health check for VPS monitoring (GET/HEAD)"""
     return {"status": "ok"}
 
+@app.get("/stats")
+async def get_stats(bot = Depends(get_current_bot)):
+    """Engine, auth and live-status counters for monitoring (admin only: includes every user's resume/account state)"""
+    if bot.user_id not in ADMIN_USER_IDS:
+        raise HTTPException(403, "Admin only")
+    return FastJSONResponse({
+        "engine": trading_engine.get_stats(),
+        "auth": token_verifier.get_stats(),
+        "status_hub": status_hub.get_stats(),
+        "bots": bot_manager.get_stats(),
+        "run_state": run_state_manager.get_stats(),
+        "resume": bot_manager.last_resume,
+        "accounts": await account_pool.get_stats() if account_pool is not None else None,
+    })
+
 @app.get("/config")
 async def get_config(bot = Depends(get_current_bot)):
     """Get full multi-asset config"""
-    return bot.config
+    return FastJSONResponse(bot.config)
 
 @app.post("/config")
 async def update_config(config: ConfigUpdate, bot = Depends(get_current_bot)):
@@ -165,16 +308,26 @@ async def update_config(config: ConfigUpdate, bot = Depends(get_current_bot)):
             if sym_data:
                 update_data["symbols"][symbol] = sym_data
     
-    updated = bot.config_manager.update_config(update_data)
-    return updated
+    await bot.update_config(update_data)
+    return FastJSONResponse(bot.config)
 
 
 # --- Per-Symbol Control Endpoints ---
 
-@app.post("/control/start")
-async def start_all(bot = Depends(get_current_bot)):
-    """Start all enabled symbols - always starts with fresh DB"""
-    # Clean stale DB for fresh session
+ENGINE_READY_TIMEOUT = 10.0  # seconds to wait for MT5 init on restart
+
+async def _ensure_engine_ready(bot=None) -> dict:
+    """
+    Restart the trading engine that serves `bot` (this process's engine, or
+    its account worker's) if it is stopped and wait (bounded) for MT5 to
+    initialize. Returns engine fields for the response, incl. init time.
+    """
+    if bot is not None and bot.remote:
+        return await bot.ensure_engine_ready(ENGINE_READY_TIMEOUT)
+    return await trading_engine.ensure_ready(ENGINE_READY_TIMEOUT)
+
+def _clean_db_for_start() -> Optional[dict]:
+    """Delete the stale DB before a start. Returns a 'blocked' response if locked."""
     if os.path.exists(DB_PATH):
         try:
             os.remove(DB_PATH)
@@ -185,20 +338,21 @@ async def start_all(bot = Depends(get_current_bot)):
                 "status": "blocked",
                 "error": f"DB file locked ({e}). Please terminate all or restart bot."
             }
+    return None
+
+@app.post("/control/start")
+async def start_all(bot = Depends(get_current_bot)):
+    """Start all enabled symbols - always starts with fresh DB"""
+    # Clean stale DB for fresh session
+    blocked = _clean_db_for_start()
+    if blocked:
+        return blocked
     
     # [FIX] Auto-Restart Trading Engine if stopped
-    if not trading_engine.running:
-        print("[SERVER] Restarting Trading Engine...")
-        asyncio.create_task(trading_engine.start())
-        
-        # Wait for engine to initialize (up to 5s)
-        for _ in range(10):
-            if trading_engine.running:
-                break
-            await asyncio.sleep(0.5)
+    engine = await _ensure_engine_ready(bot)
         
     await bot.start()
-    return {"status": "started", "symbols": bot.config_manager.get_enabled_symbols()}
+    return {"status": "started", "symbols": bot.get_enabled_symbols(), **engine}
 
 @app.post("/control/stop")
 async def stop_all(bot = Depends(get_current_bot)):
@@ -210,32 +364,16 @@ async def stop_all(bot = Depends(get_current_bot)):
 async def start_symbol(symbol: str, bot = Depends(get_current_bot)):
     """Start a specific symbol"""
     # Clean stale DB for fresh session
-    if os.path.exists(DB_PATH):
-        try:
-            os.remove(DB_PATH)
-            print(f"[START] Cleaned DB for fresh session: {DB_PATH}")
-        except Exception as e:
-            print(f"[START] Could not clean DB: {e}")
-            return {
-                "status": "blocked",
-                "error": f"DB file locked ({e}). Please terminate all or restart bot."
-            }
+    blocked = _clean_db_for_start()
+    if blocked:
+        return blocked
     
     # [FIX] Auto-Restart Trading Engine if stopped
-    if not trading_engine.running:
-        print("[SERVER] Restarting Trading Engine...")
-        asyncio.create_task(trading_engine.start())
-        
-        # Wait for engine to initialize (up to 5s)
-        for _ in range(10):
-            if trading_engine.running:
-                break
-            await asyncio.sleep(0.5)
+    engine = await _ensure_engine_ready(bot)
 
     # Enable the symbol first
-    bot.config_manager.enable_symbol(symbol, True)
-    await bot.start_symbol(symbol)
-    return {"status": "started", "symbol": symbol}
+    await bot.start_symbol(symbol, enable=True)
+    return {"status": "started", "symbol": symbol, **engine}
 
 @app.post("/control/stop/{symbol}")
 async def stop_symbol(symbol: str, bot = Depends(get_current_bot)):
@@ -243,6 +381,57 @@ async def stop_symbol(symbol: str, bot = Depends(get_current_bot)):
     await bot.stop_symbol(symbol)
     return {"status": "stopped", "symbol": symbol}
 
+@app.post("/control/batch")
+async def control_batch(batch: BatchControl, bot = Depends(get_current_bot)):
+    """
+    Run several symbol actions (start/stop/terminate) concurrently with one
+    auth, one DB clean, one engine check and one config write.
+    Returns per-symbol outcomes and timings, in request order.
+    """
+    t0 = time.perf_counter()
+    engine = {}
+    if any(a.action == "start" for a in batch.actions):
+        blocked = _clean_db_for_start()
+        if blocked:
+            return blocked
+        engine = await _ensure_engine_ready(bot)
+
+    results = await bot.run_batch([(a.symbol, a.action) for a in batch.actions])
+    return {
+        "status": "done",
+        "results": results,
+        "total_ms": round((time.perf_counter() - t0) * 1000, 2),
+        **engine
+    }
+
+@app.post("/admin/control/batch")
+async def admin_control_batch(batch: AdminBatchControl, bot = Depends(get_current_bot)):
+    """Admin: run symbol action batches for many users concurrently (BotManager)."""
+    if bot.user_id not in ADMIN_USER_IDS:
+        raise HTTPException(403, "Admin only")
+
+    t0 = time.perf_counter()
+    engine = {}
+    starting = [uid for uid, actions in batch.users.items() if any(a.action == "start" for a in actions)]
+    if starting:
+        blocked = _clean_db_for_start()
+        if blocked:
+            return blocked
+        # Account workers restart their own engines before starting symbols
+        if not all(bot_manager.is_remote(uid) for uid in starting):
+            engine = await _ensure_engine_ready()
+
+    users = await bot_manager.run_batch({
+        user_id: [(a.symbol, a.action) for a in actions]
+        for user_id, actions in batch.users.items()
+    })
+    return {
+        "status": "done",
+        "users": users,
+        "total_ms": round((time.perf_counter() - t0) * 1000, 2),
+        **engine
+    }
+
 @app.post("/control/terminate/{symbol}")
 async def terminate_symbol(symbol: str, bot = Depends(get_current_bot)):
     """Nuclear reset - close all positions for a symbol immediately"""
@@ -273,100 +462,236 @@ async def terminate_all(bot = Depends(get_current_bot)):
         "warning": db_warning
     }
 
+@app.websocket("/ws/status")
+async def ws_status(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Live status stream. Authenticated once per connection (?token=<jwt>,
+    since browsers cannot set headers on WebSockets). Sends a snapshot,
+    then deltas as state changes; pings keep idle connections checked.
+    """
+    try:
+        bot = await _bot_for_auth_header(f"Bearer {token}" if token else None)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    except ConnectionError:
+        await websocket.close(code=1013)  # Account worker unavailable: try again later
+        return
+
+    await websocket.accept()
+    queue = status_hub.subscribe(bot)
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                message = {"type": "ping"}
+            await websocket.send_text(fast_json.dumps(message).decode("utf-8"))
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        status_hub.unsubscribe(bot, queue)
+
 @app.get("/status")
-async def get_status(bot = Depends(get_current_bot)):
-    """Get status for all active strategies"""
-    return bot.get_status()
+async def get_status(request: Request, since: Optional[str] = None, bot = Depends(get_current_bot)):
+    """
+    Get status for all active strategies.
+
+    Versioned: the ETag / X-Status-Version headers carry "<epoch>-<version>".
+    The epoch is per orchestrator instance (versions restart when a bot is
+    rebuilt after eviction or a restart), so an old tag never matches.
+    - If-None-Match with the current ETag, or ?since=<current tag> -> 304
+    - ?since=<older tag, same epoch> still in history -> {"since", "version", "delta", "removed"}
+    - Otherwise (incl. another epoch) the full status
+    """
+    version, body = bot.get_status_json()
+    tag = f"{bot.status_epoch}-{version}"
+    etag = f'"{tag}"'
+    headers = {"ETag": etag, "X-Status-Version": tag, "Cache-Control": "no-cache"}
+
+    if request.headers.get("if-none-match") == etag or since == tag:
+        return Response(status_code=304, headers=headers)
+
+    since_epoch, _, since_version = (since or "").rpartition("-")
+    if since_epoch == bot.status_epoch and since_version.isdigit():
+        previous = bot.get_status_since(int(since_version))
+        if previous is not None:
+            delta, removed = diff_status(previous, bot.get_status())
+            return FastJSONResponse(
+                {"since": since, "version": tag, "delta": delta, "removed": removed},
+                headers=headers,
+            )
+
+    return FastJSONResponse(body, headers=headers)
 
 # --- History Endpoints ---
 
+GZIP_MIN_BYTES = 1024
+
+def _stream_log_file(request: Request, path, offset: Optional[int] = None,
+                     limit: Optional[int] = None, tail: Optional[int] = None):
+    """
+    Stream a text log with bounded memory.
+
+    - tail=N          last N lines (found by seeking back from EOF)
+    - offset/limit    `limit` lines starting at byte `offset`
+    - Range: bytes=   raw byte range (206 Partial Content)
+    X-Next-Offset is the byte offset to pass as `offset` for the next page
+    (or to poll for newly appended lines). Bodies are gzipped when accepted.
+    """
+    size = path.stat().st_size
+    headers = {"Accept-Ranges": "bytes", "X-File-Size": str(size)}
+
+    range_header = request.headers.get("range")
+    if range_header and offset is None and limit is None and tail is None:
+        byte_range = log_reader.parse_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        headers.update({
+            "Content-Range": f"bytes {start}-{end - 1}/{size}",
+            "Content-Length": str(end - start),
+            "X-Next-Offset": str(end),
+        })
+        return StreamingResponse(log_reader.iter_range(path, start, end), status_code=206,
+                                 media_type="text/plain; charset=utf-8", headers=headers)
+
+    if tail is not None:
+        start = log_reader.tail_offset(path, tail, size)
+    else:
+        start = min(max(offset or 0, 0), size)
+    end = log_reader.advance_lines(path, start, limit, size) if limit is not None else size
+    headers["X-Next-Offset"] = str(end)
+
+    use_gzip = (end - start >= GZIP_MIN_BYTES
+                and "gzip" in request.headers.get("accept-encoding", ""))
+    if use_gzip:
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    else:
+        headers["Content-Length"] = str(end - start)
+    return StreamingResponse(log_reader.iter_range(path, start, end, gzip=use_gzip),
+                             media_type="text/plain; charset=utf-8", headers=headers)
+
+def _safe_log_path(log_dir, filename: str):
+    """Resolve a log filename inside log_dir (no path traversal)."""
+    if Path(filename).name != filename:
+        return None
+    log_path = log_dir / filename
+    return log_path if log_path.is_file() else None
+
 @app.get("/history")
 async def get_history(bot = Depends(get_current_bot)):
     """Get list of session history files for this user"""
     sessions = bot.session_logger.get_sessions()
-    return sessions
+    return FastJSONResponse(sessions)
 
 # NOTE: Specific routes MUST come BEFORE parameterized routes in FastAPI
 @app.get("/history/groups")
 async def get_group_logs(bot = Depends(get_current_bot)):
-    """Get list of group log files for this user"""
-    from pathlib import Path
-    import itertools
+    """Get list of group log files for this user (served from the log index)"""
     log_dir = bot.session_logger.log_dir
-    logs = []
-    if log_dir.exists():
-        # TASK 3 FIX: Include both .log and .txt file types
-        log_files = itertools.chain(
-            log_dir.glob("groups_log_*.txt"),  # Table snapshots
-            log_dir.glob("groups_*.log"),      # Event logs (Group Strategy)
-            log_dir.glob("activity_*.log")     # Activity logs (Pair Strategy)
-        )
-        for file in sorted(log_files, key=lambda f: f.stat().st_mtime, reverse=True):
-            logs.append({
-                "id": file.stem,
-                "name": file.name,
-                "path": str(file)
-            })
-        # Also include group table files
-        for file in sorted(log_dir.glob("group_*_table.txt"), reverse=True):
-            logs.append({
-                "id": file.stem,
-                "name": file.name,
-                "path": str(file)
-            })
-    return logs
+    # TASK 3 FIX: Include both .log and .txt file types
+    log_files = log_index.list(log_dir, (
+        "groups_log_*.txt",  # Table snapshots
+        "groups_*.log",      # Event logs (Group Strategy)
+        "activity_*.log",    # Activity logs (Pair Strategy)
+    ), sort="mtime")
+    # Also include group table files
+    log_files += log_index.list(log_dir, ("group_*_table.txt",), sort="name")
+    return FastJSONResponse([{"id": f["stem"], "name": f["name"], "path": f["path"]} for f in log_files])
 
 @app.get("/history/groups/{filename}")
-async def get_group_log_content(filename: str, bot = Depends(get_current_bot)):
-    """Get contents of a specific group log file"""
-    from pathlib import Path
-    from fastapi.responses import PlainTextResponse
-    log_dir = bot.session_logger.log_dir
-    log_path = log_dir / filename
-    if log_path.exists() and log_path.is_file():
-        return PlainTextResponse(log_path.read_text(encoding="utf-8"))
-    raise HTTPException(404, "Group log not found")
-
-@app.get("/history/{session_id}")
-async def get_session_log(session_id: str, bot = Depends(get_current_bot)):
-    """Get contents of a specific session log"""
-    content = bot.session_logger.get_session_content(session_id)
-    if content:
-        from fastapi.responses import PlainTextResponse
-        return PlainTextResponse(content)
-    raise HTTPException(404, "Session not found")
-
-# --- Activity Log Endpoints ---
+async def get_group_log_content(filename: str, request: Request, offset: Optional[int] = None,
+                                limit: Optional[int] = None, tail: Optional[int] = None,
+                                bot = Depends(get_current_bot)):
+    """Get contents of a specific group log file (streamed; supports offset/limit/tail/Range)"""
+    log_path = _safe_log_path(bot.session_logger.log_dir, filename)
+    if log_path is None:
+        raise HTTPException(404, "Group log not found")
+    return await asyncio.to_thread(_stream_log_file, request, log_path, offset, limit, tail)
 
 @app.get("/history/activity")
 async def get_activity_logs(bot = Depends(get_current_bot)):
-    """Get list of activity log files for this user"""
-    from pathlib import Path
+    """Get list of activity log files for this user (served from the log index)"""
+    user_id = getattr(bot, 'user_id', 'default')
+    return FastJSONResponse([
+        {
+            "id": f["stem"],
+            "name": f["name"],
+            "path": f["path"],
+            "size": f["size"],
+            "modified": f["modified"]
+        }
+        for f in log_index.list(Path(f"logs/activity/{user_id}"), ("*.log",), sort="mtime")
+    ])
+
+@app.get("/history/search")
+async def search_history(q: str, limit: int = 100, bot = Depends(get_current_bot)):
+    """
+    Full-text search over this user's session/activity logs.
+    All tokens must match (tickets, legs like Bx/SingleFire, cycles, reasons).
+    Returns matching lines with their file and byte offset.
+    """
+    return FastJSONResponse(await asyncio.to_thread(log_search.search, bot.session_logger.log_dir, q, limit))
+
+# --- Event Journal Endpoints ---
+
+@app.get("/history/journal")
+async def get_journals(bot = Depends(get_current_bot)):
+    """List event journals (one per symbol) for this user"""
     user_id = getattr(bot, 'user_id', 'default')
-    log_dir = Path(f"logs/activity/{user_id}")
-    logs = []
-    if log_dir.exists():
-        for file in sorted(log_dir.glob("*.log"), key=lambda f: f.stat().st_mtime, reverse=True):
-            logs.append({
-                "id": file.stem,
-                "name": file.name,
-                "path": str(file),
-                "size": file.stat().st_size,
-                "modified": file.stat().st_mtime
-            })
-    return logs
+    return FastJSONResponse(await asyncio.to_thread(event_journal.list_journals, user_id))
+
+@app.get("/history/journal/{symbol}")
+async def get_journal_events(symbol: str, start: Optional[float] = None, end: Optional[float] = None,
+                             cycle: Optional[int] = None, limit: int = 1000, format: str = "json",
+                             bot = Depends(get_current_bot)):
+    """
+    Query journal events by time range (epoch seconds) and/or cycle.
+    Uses the sparse index to seek instead of reading the whole file.
+    """
+    user_id = getattr(bot, 'user_id', 'default')
+    limit = max(1, min(limit, 10000))
+    events = await asyncio.to_thread(
+        event_journal.query_events, user_id, symbol, start, end, cycle, limit
+    )
+    if format == "text":
+        return PlainTextResponse(event_journal.render_text(events))
+    return FastJSONResponse(events)
+
+@app.get("/history/{session_id}")
+async def get_session_log(session_id: str, request: Request, offset: Optional[int] = None,
+                          limit: Optional[int] = None, tail: Optional[int] = None,
+                          bot = Depends(get_current_bot)):
+    """Get contents of a specific session log (streamed; supports offset/limit/tail/Range)"""
+    log_path = _safe_log_path(bot.session_logger.log_dir, f"{session_id}.txt")
+    if log_path is None:
+        raise HTTPException(404, "Session not found")
+    return await asyncio.to_thread(_stream_log_file, request, log_path, offset, limit, tail)
+
+# --- Activity Log Endpoints ---
 
 @app.get("/history/activity/{filename}")
-async def get_activity_log_content(filename: str, bot = Depends(get_current_bot)):
-    """Get contents of a specific activity log file"""
-    from pathlib import Path
-    from fastapi.responses import PlainTextResponse
+async def get_activity_log_content(filename: str, request: Request, offset: Optional[int] = None,
+                                   limit: Optional[int] = None, tail: Optional[int] = None,
+                                   bot = Depends(get_current_bot)):
+    """Get contents of a specific activity log file (streamed; supports offset/limit/tail/Range)"""
     user_id = getattr(bot, 'user_id', 'default')
-    log_dir = Path(f"logs/activity/{user_id}")
-    log_path = log_dir / filename
-    if log_path.exists() and log_path.is_file():
-        return PlainTextResponse(log_path.read_text(encoding="utf-8"))
-    raise HTTPException(404, "Activity log not found")
+    log_path = _safe_log_path(Path(f"logs/activity/{user_id}"), filename)
+    if log_path is None:
+        raise HTTPException(404, "Activity log not found")
+    return await asyncio.to_thread(_stream_log_file, request, log_path, offset, limit, tail)
+
+# --- Chart Endpoints ---
+
+@app.get("/chart/{symbol}")
+async def get_chart(symbol: str, timeframe: str = "M1", count: int = 100, bot = Depends(get_current_bot)):
+    """OHLC bars for a symbol, served from the local tick-built bars"""
+    count = max(1, min(count, 500))
+    try:
+        return bar_builder.chart(symbol, timeframe, count)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
 # Mount static folder for assets (css/js images)
 app.mount("/static", StaticFiles(directory="static"), name="static")
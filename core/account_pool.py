@@ -0,0 +1,514 @@
+"""
+MT5 Account Worker Pool
+
+Routes users to MT5 accounts. The MetaTrader5 binding drives one terminal
+per process, so each account listed in the accounts file runs in its own
+worker process (core.account_worker) with its own tick loop; users not
+listed stay on this process's TradingEngine (the MT5_* env account).
+
+Accounts file (MT5_ACCOUNTS_FILE, default accounts.json; absent = no pool):
+{
+    "accounts": [
+        {"name": "acc-a", "login": 123, "password_env": "ACC_A_PASSWORD",
+         "server": "Exness-MT5Real", "path": "C:/MT5/acc-a/terminal64.exe",
+         "users": ["<supabase user id>", ...]}
+    ]
+}
+("password" may be given inline instead of "password_env".)
+
+- IPC is a multiprocessing Connection over localhost (authkey-protected);
+  a reader thread per worker hands messages to the event loop
+- Each routed user gets a RemoteOrchestrator: control calls are forwarded
+  to the worker; config and status are mirrored from the worker's replies
+  and status pushes, so /config, /status and /ws/status stay local reads
+- A worker that exits is restarted after RESTART_DELAY; in-flight calls
+  fail with ConnectionError, as do calls made while it is down (after
+  REQUEST_TIMEOUT) or left unanswered (the API answers 503). Reads give up
+  after REQUEST_TIMEOUT; state-changing calls (closing positions, batches)
+  get CONTROL_TIMEOUT, and if one was sent but not answered it raises
+  OutcomeUnknown: it may still have been applied
+- Workers auto-resume their users only if the API process does (AUTO_RESUME)
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core import fast_json
+from core.session_logger import SessionLogger
+
+ACCOUNTS_FILE = os.getenv("MT5_ACCOUNTS_FILE", "accounts.json")
+
+# Orchestrator methods/attributes a worker runs for the API process
+WORKER_METHODS = (
+    "config", "get_status", "update_config", "start", "stop", "start_symbol",
+    "stop_symbol", "terminate_symbol", "terminate_all", "run_batch",
+)
+START_METHODS = ("start", "start_symbol", "run_batch")  # Worker ensures its engine first
+READ_METHODS = ("config", "get_status")  # The rest change state
+STATUS_PUSH_INTERVAL = 0.25  # Seconds between worker status pushes
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def load_accounts(path: str = ACCOUNTS_FILE) -> List[Dict[str, Any]]:
+    """Accounts from the accounts file ([] if there is none)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        accounts = json.load(f).get("accounts", [])
+    names = [a["name"] for a in accounts]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate account names in {path}")
+    return accounts
+
+
+class OutcomeUnknown(ConnectionError):
+    """A state-changing call reached the worker but its reply never came."""
+
+
+class RemoteOrchestrator:
+    """
+    Stand-in for a StrategyOrchestrator that lives in an account worker.
+    Same interface as far as the API uses it; control methods are async RPCs.
+    """
+
+    remote = True
+    STATUS_HISTORY = 32
+
+    def __init__(self, worker: "AccountWorkerHandle", user_id: str):
+        self.worker = worker
+        self.user_id = user_id
+        # Same per-user log directories as a local bot (written by the worker)
+        self.session_logger = SessionLogger(user_id)
+
+        self._config: Dict[str, Any] = {}
+        self.status_epoch = os.urandom(4).hex()  # See StrategyOrchestrator.status_epoch
+        self.status_version = 0
+        self._status: Dict[str, Any] = {}
+        self._status_history: deque = deque(maxlen=self.STATUS_HISTORY)  # (version, status)
+        self._status_json: Tuple[int, bytes] = (0, b"")
+
+    async def sync(self):
+        """Initial config and status (the worker creates the bot on first call)."""
+        self._set_config(await self._call("config"))
+        self.on_status(await self._call("get_status"))
+
+    async def _call(self, method: str, *args, **kwargs):
+        return await self.worker.call(self.user_id, method, *args, **kwargs)
+
+    # ========================
+    # CONFIG MIRROR
+    # ========================
+
+    def _set_config(self, config: Dict[str, Any]):
+        self._config = config
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self._config
+
+    def get_enabled_symbols(self) -> List[str]:
+        return [s for s, cfg in self._config.get("symbols", {}).items() if cfg.get("enabled", False)]
+
+    # ========================
+    # CONTROL (forwarded)
+    # ========================
+
+    async def ensure_engine_ready(self, timeout: float) -> dict:
+        return {**await self.worker.engine_ready(timeout), "account": self.worker.name}
+
+    async def update_config(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._call("update_config", update)
+
+    async def start(self):
+        await self._call("start")
+
+    async def stop(self):
+        await self._call("stop")
+
+    async def start_symbol(self, symbol: str, enable: bool = False):
+        await self._call("start_symbol", symbol, enable=enable)
+
+    async def stop_symbol(self, symbol: str):
+        await self._call("stop_symbol", symbol)
+
+    async def terminate_symbol(self, symbol: str):
+        await self._call("terminate_symbol", symbol)
+
+    async def terminate_all(self):
+        await self._call("terminate_all")
+
+    async def run_batch(self, actions: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        return await self._call("run_batch", [tuple(a) for a in actions])
+
+    # ========================
+    # STATUS MIRROR
+    # ========================
+
+    def on_status(self, status: Dict[str, Any]):
+        """Status pushed by the worker (versions are local to this process)."""
+        if status == self._status:
+            return
+        self.status_version += 1
+        self._status = status
+        self._status_history.append((self.status_version, status))
+
+    def get_status(self) -> Dict[str, Any]:
+        return self._status
+
+    def get_status_versioned(self) -> Tuple[int, Dict[str, Any]]:
+        return self.status_version, self._status
+
+    def get_status_json(self) -> Tuple[int, bytes]:
+        if self._status_json[0] != self.status_version:
+            self._status_json = (self.status_version, fast_json.dumps(self._status))
+        return self._status_json
+
+    def get_status_since(self, version: int) -> Optional[dict]:
+        for v, status in self._status_history:
+            if v == version:
+                return status
+        return None
+
+
+class AccountWorkerHandle:
+    """One account's worker process: supervision, IPC and pending calls."""
+
+    RESTART_DELAY = 5.0
+    STOP_TIMEOUT = 10.0
+    REQUEST_TIMEOUT = 30.0   # Seconds a call waits for a connection, and a read for its reply
+    CONTROL_TIMEOUT = 300.0  # Seconds a state-changing call waits for its reply
+
+    def __init__(self, account: Dict[str, Any], auto_resume: bool = False):
+        self.account = account
+        self.name = account["name"]
+        self.users = set(account.get("users", []))
+        self.auto_resume = auto_resume
+        self.bots: Dict[str, RemoteOrchestrator] = {}
+
+        self._conn = None
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._connected: Optional[asyncio.Event] = None
+        self._supervisor: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.stats = {
+            "calls": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "status_pushes": 0,
+            "restarts": 0,
+        }
+
+    # ========================
+    # PROCESS SUPERVISION
+    # ========================
+
+    def start(self):
+        self._connected = asyncio.Event()
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    def _worker_env(self, address: Tuple[str, int], authkey: bytes) -> Dict[str, str]:
+        account = self.account
+        password = account.get("password")
+        if password is None and account.get("password_env"):
+            password = os.getenv(account["password_env"], "")
+        env = dict(os.environ)
+        env.update({
+            "MT5_LOGIN": str(account.get("login", 0)),
+            "MT5_PASSWORD": password or "",
+            "MT5_SERVER": account.get("server", ""),
+            "MT5_PATH": account.get("path", ""),
+            "AUTO_RESUME": "1" if self.auto_resume else "0",
+            "RUN_STATE_FILE": f"run_state_{self.name}.json",
+            "BOT_SNAPSHOT_FILE": f"bot_snapshots_{self.name}.json",
+            "BAR_CHECKPOINT_FILE": f"db/bar_state_{self.name}.npz",
+            "ACCOUNT_WORKER_NAME": self.name,
+            "ACCOUNT_WORKER_ADDRESS": f"{address[0]}:{address[1]}",
+            "ACCOUNT_WORKER_AUTHKEY": authkey.hex(),
+        })
+        return env
+
+    async def _supervise(self):
+        while not self._stopping:
+            try:
+                await self._run_once()
+            except Exception as e:
+                print(f"[ACCOUNTS] Worker {self.name} failed: {e}")
+            if self._stopping:
+                break
+            self.stats["restarts"] += 1
+            print(f"[ACCOUNTS] Worker {self.name} exited; restarting in {self.RESTART_DELAY:.0f}s")
+            await asyncio.sleep(self.RESTART_DELAY)
+
+    async def _run_once(self):
+        authkey = secrets.token_bytes(32)
+        listener = Listener(("127.0.0.1", 0), authkey=authkey)
+        log_dir = ROOT_DIR / "logs" / "workers"
+        log_dir.mkdir(parents=True, exist_ok=True)
+        log_file = open(log_dir / f"{self.name}.log", "ab")
+        try:
+            self._proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "core.account_worker",
+                cwd=str(ROOT_DIR), env=self._worker_env(listener.address, authkey),
+                stdout=log_file, stderr=asyncio.subprocess.STDOUT,
+            )
+            print(f"[ACCOUNTS] Worker {self.name} started (pid {self._proc.pid}, login {self.account.get('login')})")
+
+            accept = self._accept(listener)
+            exited = asyncio.ensure_future(self._proc.wait())
+            await asyncio.wait({accept, exited}, return_when=asyncio.FIRST_COMPLETED)
+            if not accept.done():
+                # Died before connecting: unblock accept() with our own connection
+                Client(listener.address, authkey=authkey).close()
+                results = await asyncio.gather(accept, return_exceptions=True)
+                if not isinstance(results[0], BaseException):
+                    results[0].close()
+                return
+
+            self._conn = accept.result()
+            loop = asyncio.get_running_loop()
+            threading.Thread(target=self._read_loop, args=(self._conn, loop),
+                             name=f"account-{self.name}-ipc", daemon=True).start()
+            self._connected.set()
+            await exited
+        finally:
+            self._connected.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            listener.close()
+            log_file.close()
+            self._fail_pending(ConnectionError(f"Account worker {self.name} exited"))
+
+    def _accept(self, listener) -> asyncio.Future:
+        """
+        listener.accept() on its own daemon thread; it blocks until the worker
+        connects, so it is kept off the loop's default executor.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def settle(conn, error):
+            if future.done():
+                if conn is not None:
+                    conn.close()
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(conn)
+
+        def run():
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                loop.call_soon_threadsafe(settle, None, e)
+            else:
+                loop.call_soon_threadsafe(settle, conn, None)
+
+        threading.Thread(target=run, name=f"account-{self.name}-accept", daemon=True).start()
+        return future
+
+    async def stop(self):
+        self._stopping = True
+        if self._conn is not None:
+            try:
+                self._send({"op": "shutdown"})
+            except OSError:
+                pass
+        proc = self._proc
+        if proc is not None and proc.returncode is None:
+            try:
+                await asyncio.wait_for(proc.wait(), self.STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"[ACCOUNTS] Worker {self.name} did not exit; terminating")
+                try:
+                    proc.terminate()
+                except ProcessLookupError:
+                    pass  # Exited just now
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+
+    # ========================
+    # IPC
+    # ========================
+
+    def _read_loop(self, conn, loop):
+        try:
+            while True:
+                message = conn.recv()
+                loop.call_soon_threadsafe(self._on_message, message)
+        except (EOFError, OSError, TypeError):
+            pass  # Worker gone, or the connection was closed under recv() (TypeError)
+
+    def _on_message(self, message: dict):
+        if message.get("op") == "status":
+            self.stats["status_pushes"] += 1
+            for user_id, status in message["statuses"].items():
+                bot = self.bots.get(user_id)
+                if bot is not None:
+                    bot.on_status(status)
+            return
+
+        future = self._pending.pop(message.get("id"), None)
+        if future is None or future.done():
+            return
+        if "error" in message:
+            self.stats["errors"] += 1
+            future.set_exception(RuntimeError(f"[{self.name}] {message['error']}"))
+        else:
+            future.set_result(message)
+
+    def _send(self, message: dict):
+        with self._send_lock:
+            self._conn.send(message)
+
+    def _fail_pending(self, error: Exception):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def _request(self, message: dict, timeout: Optional[float] = None,
+                       control: bool = False) -> dict:
+        """
+        Send `message` and await the worker's reply. Raises ConnectionError if
+        the worker is not connected within REQUEST_TIMEOUT, or does not reply
+        within `timeout` (REQUEST_TIMEOUT by default). For a `control` call
+        that was sent, a missing reply raises OutcomeUnknown instead.
+        """
+        timeout = self.REQUEST_TIMEOUT if timeout is None else timeout
+        connect_timeout = min(timeout, self.REQUEST_TIMEOUT)
+        try:
+            await asyncio.wait_for(self._connected.wait(), connect_timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise ConnectionError(f"Account worker {self.name} not connected after {connect_timeout:.0f}s")
+        self._next_id += 1
+        message["id"] = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message["id"]] = future
+        self.stats["calls"] += 1
+        try:
+            self._send(message)
+        except OSError as e:
+            self._pending.pop(message["id"], None)
+            raise ConnectionError(f"Account worker {self.name} unavailable: {e}")
+        what = message.get("method", message["op"])
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            error = f"Account worker {self.name} did not reply to {what} within {timeout:.0f}s"
+            if control:
+                raise OutcomeUnknown(f"{error}; it may still have been applied, check status before retrying")
+            raise ConnectionError(error)
+        except ConnectionError as e:
+            if control:
+                raise OutcomeUnknown(f"{e} during {what}; it may still have been applied, check status before retrying")
+            raise
+        finally:
+            self._pending.pop(message["id"], None)  # A late reply is dropped
+
+    async def call(self, user_id: str, method: str, *args, **kwargs):
+        control = method not in READ_METHODS
+        reply = await self._request({"op": "call", "user_id": user_id, "method": method,
+                                     "args": args, "kwargs": kwargs},
+                                    self.CONTROL_TIMEOUT if control else None, control=control)
+        bot = self.bots.get(user_id)
+        if bot is not None and "config" in reply:
+            bot._set_config(reply["config"])
+        return reply.get("result")
+
+    async def engine_ready(self, timeout: float) -> dict:
+        # The worker itself waits up to `timeout` for MT5
+        reply = await self._request({"op": "engine_ready", "timeout": timeout}, timeout + self.REQUEST_TIMEOUT)
+        return reply["result"]
+
+    async def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            **self.stats,
+            "connected": self._connected is not None and self._connected.is_set(),
+            "pid": self._proc.pid if self._proc is not None else None,
+            "users": len(self.users),
+            "proxies": len(self.bots),
+        }
+        if stats["connected"]:
+            try:
+                stats["worker"] = (await self._request({"op": "stats"}, timeout=5.0))["result"]
+            except Exception as e:
+                stats["worker_error"] = str(e)
+        return stats
+
+
+class AccountPool:
+    """Account workers plus the user -> account routing table."""
+
+    def __init__(self, accounts: List[Dict[str, Any]], auto_resume: bool = False):
+        self.workers: Dict[str, AccountWorkerHandle] = {}
+        self._routes: Dict[str, AccountWorkerHandle] = {}  # user_id -> worker
+        self._pending: Dict[str, asyncio.Task] = {}
+        for account in accounts:
+            worker = AccountWorkerHandle(account, auto_resume)
+            self.workers[worker.name] = worker
+            for user_id in worker.users:
+                if user_id in self._routes:
+                    raise ValueError(f"User {user_id} is assigned to more than one account")
+                self._routes[user_id] = worker
+
+    @classmethod
+    def from_file(cls, path: str = ACCOUNTS_FILE, auto_resume: bool = False) -> Optional["AccountPool"]:
+        accounts = load_accounts(path)
+        return cls(accounts, auto_resume) if accounts else None
+
+    def owns(self, user_id: str) -> bool:
+        return user_id in self._routes
+
+    async def start(self):
+        for worker in self.workers.values():
+            worker.start()
+        print(f"[ACCOUNTS] {len(self.workers)} account workers, {len(self._routes)} routed users")
+
+    async def stop(self):
+        await asyncio.gather(*(w.stop() for w in self.workers.values()), return_exceptions=True)
+
+    async def get_bot(self, user_id: str) -> RemoteOrchestrator:
+        """The user's RemoteOrchestrator (created and synced once, single-flight)."""
+        worker = self._routes[user_id]
+        bot = worker.bots.get(user_id)
+        if bot is not None:
+            return bot
+        task = self._pending.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._create(worker, user_id))
+            self._pending[user_id] = task
+            task.add_done_callback(lambda _: self._pending.pop(user_id, None))
+        return await asyncio.shield(task)
+
+    async def _create(self, worker: AccountWorkerHandle, user_id: str) -> RemoteOrchestrator:
+        t0 = time.perf_counter()
+        bot = RemoteOrchestrator(worker, user_id)
+        worker.bots[user_id] = bot  # Registered first so status pushes reach it
+        try:
+            await bot.sync()
+        except Exception:
+            worker.bots.pop(user_id, None)
+            raise
+        print(f"[ACCOUNTS] User {user_id} -> {worker.name} ({(time.perf_counter() - t0) * 1000:.1f}ms)")
+        return bot
+
+    async def get_stats(self) -> Dict[str, Any]:
+        names = list(self.workers)
+        stats = await asyncio.gather(*(self.workers[n].get_stats() for n in names))
+        return dict(zip(names, stats))
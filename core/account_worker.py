@@ -0,0 +1,222 @@
+"""
+MT5 Account Worker Process
+
+Runs one MT5 account (terminal) in its own process: the MetaTrader5 binding
+drives a single terminal per process, so every extra account gets a worker.
+Started by core.account_pool as `python -m core.account_worker`; the account
+credentials, IPC address and per-account file names arrive in env vars
+(MT5_LOGIN / MT5_PASSWORD / MT5_SERVER / MT5_PATH, AUTO_RESUME,
+RUN_STATE_FILE, BOT_SNAPSHOT_FILE, BAR_CHECKPOINT_FILE, ACCOUNT_WORKER_*).
+
+Inside, it is the usual stack: a BotManager for the account's users and a
+TradingEngine with its own tick loop. It connects back to the API process
+and then:
+- Runs orchestrator calls for a user ({"op": "call"}), restricted to
+  WORKER_METHODS; replies carry the user's config whenever it changed
+- Pushes status snapshots of its resident bots every STATUS_PUSH_INTERVAL
+  (only users whose status version moved)
+- Resumes the users it was running before a restart, if AUTO_RESUME=1
+  (set by the pool from the API process's setting). Symbols with positions
+  still open are not restarted, so a crash-looping worker never fires new
+  start orders on top of them
+- Exits when asked to, or when the API process goes away
+
+Output goes through the same console sinks and queue logging pipeline as
+main.py; the pool captures it in logs/workers/<name>.log.
+"""
+
+import asyncio
+import atexit
+import inspect
+import logging
+import os
+import threading
+from multiprocessing.connection import Client
+
+from core.account_pool import WORKER_METHODS, START_METHODS, STATUS_PUSH_INTERVAL
+from core.bot_manager import BotManager
+from core.console_sink import redirect_console
+from core.logging_pipeline import setup_logging, stop_logging
+from core.run_state import run_state_manager
+from core.trading_engine import TradingEngine
+
+ENGINE_READY_TIMEOUT = 10.0
+AUTO_RESUME = os.getenv("AUTO_RESUME", "0") == "1"
+
+
+class AccountWorker:
+    """Serves one account's bots to the API process over a Connection."""
+
+    def __init__(self, name: str, conn):
+        self.name = name
+        self.conn = conn
+        self.bot_manager = BotManager()
+        self.engine = TradingEngine(self.bot_manager)
+        self._send_lock = threading.Lock()
+        self._status_versions = {}  # user_id -> status version last pushed
+        self._config_versions = {}  # user_id -> config version last sent
+        self._done: asyncio.Future = None
+
+    def send(self, message: dict):
+        with self._send_lock:
+            self.conn.send(message)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._done = loop.create_future()
+        threading.Thread(target=self._read_loop, args=(loop,), name=f"worker-{self.name}-ipc", daemon=True).start()
+
+        ready = self.engine.start_in_background()
+        asyncio.create_task(self._resume(ready))
+        publisher = asyncio.create_task(self._publish_status())
+        print(f"[WORKER {self.name}] Ready (pid {os.getpid()})")
+
+        await self._done
+        publisher.cancel()
+        if self.engine.running:
+            await self.engine.stop()
+        print(f"[WORKER {self.name}] Stopped")
+
+    def _read_loop(self, loop):
+        """IPC reader thread: hand each message to the loop."""
+        try:
+            while True:
+                message = self.conn.recv()
+                loop.call_soon_threadsafe(self._dispatch, message)
+        except (EOFError, OSError):
+            print(f"[WORKER {self.name}] API process disconnected")
+            loop.call_soon_threadsafe(self._finish)
+
+    def _finish(self):
+        if not self._done.done():
+            self._done.set_result(None)
+
+    def _dispatch(self, message: dict):
+        if message.get("op") == "shutdown":
+            self._finish()
+            return
+        asyncio.create_task(self._handle(message))
+
+    # ========================
+    # REQUESTS
+    # ========================
+
+    async def _handle(self, message: dict):
+        reply = {"id": message.get("id")}
+        try:
+            op = message["op"]
+            if op == "call":
+                user_id = message["user_id"]
+                reply["result"] = await self._call(user_id, message["method"],
+                                                   message.get("args", ()), message.get("kwargs", {}))
+                config = await self._config_if_changed(user_id)
+                if config is not None:
+                    reply["config"] = config
+            elif op == "engine_ready":
+                reply["result"] = await self.engine.ensure_ready(message.get("timeout", ENGINE_READY_TIMEOUT))
+            elif op == "stats":
+                reply["result"] = {
+                    "engine": self.engine.get_stats(),
+                    "bots": self.bot_manager.get_stats(),
+                    "run_state": run_state_manager.get_stats(),
+                }
+            else:
+                raise ValueError(f"Unknown op {op!r}")
+        except Exception as e:
+            reply["error"] = f"{type(e).__name__}: {e}"
+        try:
+            self.send(reply)
+        except Exception as e:
+            print(f"[WORKER {self.name}] Could not send reply: {e}")
+
+    async def _call(self, user_id: str, method: str, args, kwargs):
+        if method not in WORKER_METHODS:
+            raise ValueError(f"Method {method!r} not allowed")
+        if method in START_METHODS:
+            await self.engine.ensure_ready(ENGINE_READY_TIMEOUT)
+        bot = await self.bot_manager.get_or_create_bot(user_id)
+        attr = getattr(bot, method)
+        result = attr(*args, **kwargs) if callable(attr) else attr
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _config_if_changed(self, user_id: str):
+        bot = self.bot_manager.get_bot(user_id)
+        if bot is None:
+            return None
+        version = bot.config_manager.version
+        if self._config_versions.get(user_id) == version:
+            return None
+        self._config_versions[user_id] = version
+        return bot.config
+
+    # ========================
+    # STATUS / RESUME
+    # ========================
+
+    async def _publish_status(self):
+        """Push changed status snapshots of resident bots to the API process."""
+        while True:
+            await asyncio.sleep(STATUS_PUSH_INTERVAL)
+            statuses = {}
+            for user_id, bot in list(self.bot_manager.bots.items()):
+                try:
+                    version, status = bot.get_status_versioned()
+                except Exception as e:
+                    print(f"[WORKER {self.name}] Status failed for {user_id}: {e}")
+                    continue
+                if self._status_versions.get(user_id) != version:
+                    self._status_versions[user_id] = version
+                    statuses[user_id] = status
+            for user_id in [u for u in self._status_versions if u not in self.bot_manager.bots]:
+                del self._status_versions[user_id]  # Evicted; resent in full if rehydrated
+            if statuses:
+                try:
+                    self.send({"op": "status", "statuses": statuses})
+                except Exception as e:
+                    print(f"[WORKER {self.name}] Status push failed: {e}")
+
+    async def _resume(self, ready: asyncio.Future):
+        running = run_state_manager.get_running_symbols()
+        if not running:
+            return
+        if not AUTO_RESUME:
+            print(f"[WORKER {self.name}] AUTO_RESUME off, not resuming {len(running)} users")
+            return
+        try:
+            await asyncio.shield(ready)
+        except Exception as e:
+            print(f"[WORKER {self.name}] Engine failed to start, not resuming: {e}")
+            return
+        await self.bot_manager.resume_all(running)
+
+
+def setup_worker_logging(name: str):
+    """
+    Same pipeline as main.py: buffered console sinks for print(), and root
+    logging through the QueueListener. The console is the log file the pool
+    captures the worker's output into, so there is no second file copy.
+    """
+    redirect_console()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(f"%(asctime)s | %(levelname)s | {name} | %(name)s | %(message)s"))
+    setup_logging([handler], level=logging.INFO)
+    atexit.register(stop_logging)
+
+
+def main():
+    name = os.getenv("ACCOUNT_WORKER_NAME", "worker")
+    host, _, port = os.environ["ACCOUNT_WORKER_ADDRESS"].rpartition(":")
+    authkey = bytes.fromhex(os.environ["ACCOUNT_WORKER_AUTHKEY"])
+
+    setup_worker_logging(name)
+    conn = Client((host, int(port)), authkey=authkey)
+    try:
+        asyncio.run(AccountWorker(name, conn).run())
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
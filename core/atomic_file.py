@@ -0,0 +1,151 @@
+"""
+Atomic, Debounced File Writes
+
+Small JSON state files (per-user config, run state) are rewritten whole on
+every change. DebouncedWriter makes that cheap and crash-safe:
+
+- write_atomic(): temp file in the same directory, fsync, rename over the
+  target, fsync the directory (POSIX) - a crash leaves the old or the new
+  file, never a half-written one
+- On the event loop, requests within `delay` seconds coalesce into one
+  write on a worker thread; the data is serialized on the loop first, so
+  the worker never sees a structure mid-update
+- Without a running loop (worker threads, scripts) the write is immediate
+- A failed write leaves the data pending: on the loop it is retried after
+  RETRY_DELAY, otherwise by the next request/flush
+- Pending writes are flushed at interpreter exit
+"""
+
+import asyncio
+import atexit
+import os
+import tempfile
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Union
+
+
+def write_atomic(path: str, data: Union[str, bytes]):
+    """Replace `path` with `data` (text or bytes) atomically (raises on failure)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if os.name != "nt":
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class DebouncedWriter:
+    """Coalesces save requests for one file; see module docstring."""
+
+    RETRY_DELAY = 5.0  # Seconds before retrying a failed write on the loop
+
+    def __init__(self, path: str, serialize: Callable[[], str], delay: float = 0.25, tag: str = "SAVE"):
+        self.path = path
+        self.serialize = serialize
+        self.delay = delay
+        self.tag = tag
+
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()        # Held for the file write
+        self._state_lock = threading.Lock()  # Held (briefly) for _dirty/_seq
+        self._seq = 0           # Snapshot sequence (newer snapshots win)
+        self._written_seq = 0
+        self.stats = {
+            "requests": 0,
+            "writes": 0,
+            "write_errors": 0,
+        }
+        _writers.add(self)
+
+    @property
+    def pending(self) -> bool:
+        return self._dirty
+
+    def request(self):
+        """Schedule a write (debounced on the loop, immediate otherwise)."""
+        self._dirty = True
+        self.stats["requests"] += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._write_later())
+
+    async def _write_later(self):
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            snapshot = self._snapshot()
+            if snapshot is not None and not await asyncio.to_thread(self._write, *snapshot):
+                await asyncio.sleep(self.RETRY_DELAY)
+
+    def flush(self) -> bool:
+        """Write any pending changes now (blocking). False if the write failed."""
+        snapshot = self._snapshot()
+        return snapshot is None or self._write(*snapshot)
+
+    async def flush_async(self) -> bool:
+        """flush() for the event loop: serialize here, write in a worker thread."""
+        snapshot = self._snapshot()
+        return snapshot is None or await asyncio.to_thread(self._write, *snapshot)
+
+    def _snapshot(self):
+        """(seq, data) of the pending changes, or None if there are none."""
+        with self._state_lock:
+            if not self._dirty:
+                return None
+            self._dirty = False
+            self._seq += 1
+            return self._seq, self.serialize()
+
+    def _write(self, seq: int, data: str) -> bool:
+        with self._lock:
+            if seq <= self._written_seq:
+                return True  # A newer snapshot is already on disk
+            try:
+                write_atomic(self.path, data)
+                self._written_seq = seq
+                self.stats["writes"] += 1
+                return True
+            except Exception as e:
+                self.stats["write_errors"] += 1
+                print(f"[{self.tag}] Error saving {self.path}: {e}")
+        with self._state_lock:
+            if seq == self._seq:
+                self._dirty = True  # Nothing newer is queued: keep this data pending
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending": self._dirty,
+        }
+
+
+# Live writers, so pending debounced writes land on interpreter exit
+_writers: "weakref.WeakSet[DebouncedWriter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for writer in list(_writers):
+        writer.flush()
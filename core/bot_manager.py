@@ -1,40 +1,315 @@
+import asyncio
+import json
+import os
+import sys
+import time
 import uuid
-from typing import Dict
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from core.atomic_file import DebouncedWriter
 from core.config_manager import ConfigManager
 from core.strategy_orchestrator import StrategyOrchestrator
 from core.engine.pair_strategy_engine import PairStrategyEngine
+from core.status_hub import status_hub
+
+# Snapshots of evicted bots, so a restart still rehydrates them
+# (per-process override: each account worker keeps its own)
+BOT_SNAPSHOT_FILE = os.getenv("BOT_SNAPSHOT_FILE", "bot_snapshots.json")
+
+
+def _approx_size(root) -> int:
+    """
+    Rough deep size (bytes) of a bot: builtin containers plus objects from
+    this codebase (core.*). Other objects (locks, tasks, the loop, ...) count
+    shallowly, so shared singletons are not attributed to each bot.
+    """
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif type(obj).__module__.startswith("core."):
+            if hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total
+
 
 class BotManager:
-    def __init__(self):
+    IDLE_TIMEOUT = 1800.0   # Evict idle orchestrators unused for this long (seconds)
+    MAX_RESIDENT = 500      # LRU cap on resident orchestrators
+    MIN_IDLE = 60.0         # Never evict a bot used more recently than this
+    SWEEP_INTERVAL = 60.0   # How often idle bots are looked for (and sized, see get_stats)
+    SNAPSHOT_DEBOUNCE = 1.0 # Seconds to coalesce snapshot file saves
+
+    def __init__(self, idle_timeout: Optional[float] = None, max_resident: Optional[int] = None,
+                 pool=None, snapshot_file: str = BOT_SNAPSHOT_FILE):
         # Maps user_id -> StrategyOrchestrator
         self.bots: Dict[str, StrategyOrchestrator] = {}
+        # Maps user_id -> in-flight creation (single-flight per user)
+        self._pending: Dict[str, asyncio.Task] = {}
+
+        # Eviction: orchestrators with nothing running are dropped after
+        # idle_timeout (or LRU beyond max_resident) and rehydrated on demand
+        self.idle_timeout = self.IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.max_resident = self.MAX_RESIDENT if max_resident is None else max_resident
+        self._last_used: Dict[str, float] = {}  # user_id -> monotonic time
+        self._snapshots: Dict[str, Dict[str, Any]] = {}  # Evicted user_id -> compact snapshot
+        self._sizes: Dict[str, int] = {}  # user_id -> approx bytes, measured by the sweep
+        self._sweeper: Optional[asyncio.Task] = None
+
+        # Snapshots are persisted atomically (see core.atomic_file)
+        self.snapshot_file = snapshot_file
+        self._snapshot_writer = DebouncedWriter(
+            snapshot_file, lambda: json.dumps(self._snapshots), self.SNAPSHOT_DEBOUNCE, tag="BOT SNAPSHOTS")
+        self._load_snapshots()
+
+        self.stats = {
+            "created": 0,
+            "coalesced": 0,  # Callers that awaited another caller's creation
+            "evicted": 0,
+            "rehydrated": 0,
+        }
+        # Report of the last auto-resume (see resume_all)
+        self.last_resume: Optional[dict] = None
+        # Users assigned to another MT5 account run in its worker (core.account_pool)
+        self.pool = pool
 
     async def get_or_create_bot(self, user_id: str) -> StrategyOrchestrator:
         """
         Retrieves an existing bot orchestrator for the user, or creates a new one 
         if the server restarted or it doesn't exist.
+        Concurrent first requests for a user all await the same creation.
+        Users routed to an account worker get its RemoteOrchestrator.
         """
+        if self.is_remote(user_id):
+            return await self.pool.get_bot(user_id)
+
+        self._last_used[user_id] = time.monotonic()
+
         # 1. Return existing instance if in memory
-        if user_id in self.bots:
-            return self.bots[user_id]
-        
-        # 2. Re-initialize bot for this user (restores config from DB/File)
+        bot = self.bots.get(user_id)
+        if bot is not None:
+            return bot
+
+        # 2. Join an in-flight creation, or start one
+        task = self._pending.get(user_id)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.create_task(self._create_bot(user_id))
+            self._pending[user_id] = task
+            task.add_done_callback(lambda _: self._pending.pop(user_id, None))
+
+        # Shield: one caller disconnecting must not cancel creation for the rest
+        return await asyncio.shield(task)
+
+    async def _create_bot(self, user_id: str) -> StrategyOrchestrator:
+        # Re-initialize bot for this user (restores config from DB/File)
         print(f"[BOT] Restoring/Creating bot session for User: {user_id}")
-        config_manager = ConfigManager(user_id=user_id)
-        
-        # Initialize Strategy Orchestrator with user_id for session logging
-        orchestrator = StrategyOrchestrator(config_manager, user_id=user_id)
-        
+
+        # Config read, log directories and session file setup are blocking I/O
+        snapshot = self._snapshots.get(user_id)
+        orchestrator = await asyncio.to_thread(self._build_bot, user_id, snapshot)
+
         # Start Ticker (Passive) - Actually for Orchestrator this syncs strategies
         await orchestrator.start_ticker()
-        
+
+        # Only now is the snapshot used up (a failed build keeps it for the next try)
+        if snapshot is not None:
+            self._snapshots.pop(user_id, None)
+            self._snapshot_writer.request()
+
         # Store in memory
         self.bots[user_id] = orchestrator
+        self._last_used[user_id] = time.monotonic()
+        self.stats["created"] += 1
+        if snapshot is not None:
+            self.stats["rehydrated"] += 1
+
+        self._ensure_sweeper()
+        if len(self.bots) > self.max_resident:
+            await self._evict_lru()
         return orchestrator
 
+    @staticmethod
+    def _build_bot(user_id: str, snapshot: Optional[Dict[str, Any]] = None) -> StrategyOrchestrator:
+        """Construct config + orchestrator (runs in a worker thread; no MT5 calls)."""
+        config_manager = ConfigManager(user_id=user_id)
+
+        # Initialize Strategy Orchestrator with user_id for session logging
+        orchestrator = StrategyOrchestrator(config_manager, user_id=user_id)
+        if snapshot is not None:
+            orchestrator.restore(snapshot)
+        return orchestrator
+
+    # ========================
+    # IDLE EVICTION
+    # ========================
+
+    def _load_snapshots(self):
+        """Load the snapshots of bots evicted before the last restart."""
+        if not os.path.exists(self.snapshot_file):
+            return
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                self._snapshots = json.load(f)
+            print(f"[BOT] Loaded {len(self._snapshots)} evicted bot snapshots")
+        except Exception as e:
+            print(f"[BOT] Error loading bot snapshots: {e}")
+            self._snapshots = {}
+
+    def _evictable(self, user_id: str, min_idle: float) -> bool:
+        bot = self.bots.get(user_id)
+        return (
+            bot is not None
+            and user_id not in self._pending
+            and time.monotonic() - self._last_used.get(user_id, 0.0) >= min_idle
+            and bot.is_idle()
+            and not status_hub.has_subscribers(bot)
+        )
+
+    async def evict(self, user_id: str) -> bool:
+        """Drop an idle orchestrator, keeping a compact snapshot for rehydration."""
+        if not self._evictable(user_id, 0.0):
+            return False
+        # Any pending debounced save lands before a rehydration re-reads the file
+        # (normally a no-op: the bot has been idle far longer than the debounce)
+        bot = self.bots[user_id]
+        if not await bot.config_manager.flush_async():
+            return False  # Config not on disk: keep the bot rather than lose it
+        if not self._evictable(user_id, 0.0):
+            return False  # Used again while the config was being written
+        del self.bots[user_id]
+        self._last_used.pop(user_id, None)
+        self._sizes.pop(user_id, None)
+        self._snapshots[user_id] = bot.snapshot()
+        self._snapshot_writer.request()
+        self.stats["evicted"] += 1
+        print(f"[BOT] Evicted idle bot for User: {user_id}")
+        return True
+
+    async def evict_idle(self) -> int:
+        """Evict bots idle past idle_timeout. Returns how many were evicted."""
+        candidates = [uid for uid in list(self.bots) if self._evictable(uid, self.idle_timeout)]
+        evicted = 0
+        for user_id in candidates:
+            if await self.evict(user_id):
+                evicted += 1
+        return evicted
+
+    async def _evict_lru(self):
+        """Over max_resident: evict least recently used idle bots."""
+        by_age = sorted(self.bots, key=lambda uid: self._last_used.get(uid, 0.0))
+        for user_id in by_age:
+            if len(self.bots) <= self.max_resident:
+                break
+            if self._evictable(user_id, self.MIN_IDLE):
+                await self.evict(user_id)
+
+    def _ensure_sweeper(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        while self.bots:
+            await asyncio.sleep(self.SWEEP_INTERVAL)
+            try:
+                await self.evict_idle()
+                self.measure_sizes()
+            except Exception as e:
+                print(f"[BOT] Idle sweep failed: {e}")
+
+    def measure_sizes(self):
+        """Re-measure resident bots' approximate memory (walks every object; sweep only)."""
+        self._sizes = {user_id: _approx_size(bot) for user_id, bot in self.bots.items()}
+
+    async def run_batch(self, per_user: Dict[str, List[Tuple[str, str]]]) -> Dict[str, dict]:
+        """
+        Admin batch: run each user's (symbol, action) list through their
+        orchestrator, all users concurrently.
+        Returns user_id -> {"results": [...], "ms"} or {"error": ...}.
+        """
+        async def run(user_id: str, actions: List[Tuple[str, str]]):
+            t0 = time.perf_counter()
+            try:
+                bot = await self.get_or_create_bot(user_id)
+                results = await bot.run_batch(actions)
+            except Exception as e:
+                print(f"[BATCH] User {user_id} failed: {e}")
+                return user_id, {"error": str(e)}
+            return user_id, {"results": results, "ms": round((time.perf_counter() - t0) * 1000, 2)}
+
+        outcomes = await asyncio.gather(*(run(uid, acts) for uid, acts in per_user.items()))
+        return dict(outcomes)
+
+    async def resume_all(self, running: Dict[str, List[str]]) -> dict:
+        """
+        Auto-resume after a restart: recreate every user in `running`
+        (user_id -> symbols, from the run state) and restart their symbols,
+        all users concurrently. Symbols with positions still open are left
+        stopped (see StrategyOrchestrator.resume).
+        Returns {"users": {user_id: {"symbols", "running", "blocked", "ms"} | {"error"}}, "total_ms"}.
+        """
+        t0 = time.perf_counter()
+
+        async def resume(user_id: str, symbols: List[str]):
+            t_user = time.perf_counter()
+            try:
+                bot = await self.get_or_create_bot(user_id)
+                outcome = await bot.resume(symbols)
+            except Exception as e:
+                print(f"[RESUME] User {user_id} failed: {e}")
+                return user_id, {"symbols": symbols, "error": str(e)}
+            ms = round((time.perf_counter() - t_user) * 1000, 2)
+            print(f"[RESUME] User {user_id}: {outcome['running']} in {ms}ms"
+                  + (f" (blocked: {outcome['blocked']})" if outcome["blocked"] else ""))
+            return user_id, {"symbols": symbols, **outcome, "ms": ms}
+
+        outcomes = await asyncio.gather(*(resume(uid, syms) for uid, syms in running.items()))
+        report = {
+            "users": dict(outcomes),
+            "total_ms": round((time.perf_counter() - t0) * 1000, 2),
+        }
+        self.last_resume = report
+        print(f"[RESUME] Resumed {len(running)} users in {report['total_ms']}ms")
+        return report
+
     def get_bot(self, user_id: str) -> StrategyOrchestrator:
         return self.bots.get(user_id)
 
+    def is_remote(self, user_id: str) -> bool:
+        """True if the user's bot runs in an account worker, not this process."""
+        return self.pool is not None and self.pool.owns(user_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Resident/evicted counts and approximate memory per resident bot
+        (as of the last sweep; bots created since are not counted yet).
+        """
+        sizes = [self._sizes[user_id] for user_id in self.bots if user_id in self._sizes]
+        return {
+            **self.stats,
+            "resident": len(self.bots),
+            "idle": sum(1 for bot in self.bots.values() if bot.is_idle()),
+            "snapshots": len(self._snapshots),
+            "resident_bytes": sum(sizes),
+            "bytes_per_bot": sum(sizes) // len(sizes) if sizes else 0,
+            "sized_bots": len(sizes),
+            "snapshot_file": self._snapshot_writer.get_stats(),
+        }
+
     async def stop_bot(self, user_id: str):
         bot = self.bots.get(user_id)
         if bot:
@@ -2,6 +2,8 @@ import json
 import os
 from typing import Dict, Any, List, Optional
 
+from core.atomic_file import DebouncedWriter
+
 # All available trading symbols (Exness)
 AVAILABLE_SYMBOLS = [
     # Forex Majors
@@ -80,6 +82,7 @@ def get_default_symbol_config(symbol: str = "EURUSD") -> Dict[str, Any]:
         "single_fire_tp_pips": sf_tp,    # Single fire TP
         "single_fire_sl_pips": sf_sl,    # Single fire SL
         "protection_distance": prot,     # Pips before nuclear reset on reversal
+        "single_fire_prefetch_fraction": 0.25,  # Pre-resolve direction within this fraction of trigger distance
     }
 
 
@@ -98,7 +101,14 @@ class ConfigManager:
             ...
         }
     }
+
+    Saves are atomic (temp file, fsync, rename) and, on the event loop,
+    debounced: bursts of changes within SAVE_DEBOUNCE seconds coalesce into
+    one write on a worker thread. `version` increases on every change, so
+    strategies can detect a new config with one integer compare.
     """
+
+    SAVE_DEBOUNCE = 0.25  # Seconds to coalesce saves on the event loop
     
     def __init__(self, user_id: str = "default", config_file: str = "config.json"):
         self.user_id = user_id
@@ -110,6 +120,12 @@ class ConfigManager:
             self.config_file = config_file
             
         self.config: Dict[str, Any] = {}
+        self.version = 0  # Bumped on every config change
+
+        # Atomic, debounced saves (see core.atomic_file)
+        self._writer = DebouncedWriter(
+            self.config_file, lambda: json.dumps(self.config, indent=4), self.SAVE_DEBOUNCE, tag="CONFIG")
+
         self.load_config()
 
     def load_config(self):
@@ -125,20 +141,34 @@ class ConfigManager:
                 
                 if is_new_format:
                     self.config = loaded
+                    self._touch()
                 else:
                     # Migrate from old format (symbols is a list or missing)
                     print(f"[CONFIG] Migrating config to multi-asset format...")
                     self.config = self._migrate_old_config(loaded)
+                    self._touch()
                     self.save_config()
                     
             except Exception as e:
                 print(f"[CONFIG] Error loading config {self.config_file}: {e}")
+                self._quarantine_corrupt()
                 self.config = self._get_defaults()
+                self._touch()
         else:
             print(f"[CONFIG] Creating new config file: {self.config_file}")
             self.config = self._get_defaults()
+            self._touch()
             self.save_config()
 
+    def _quarantine_corrupt(self):
+        """Keep an unreadable config aside so the next save can't overwrite it."""
+        backup = f"{self.config_file}.corrupt"
+        try:
+            os.replace(self.config_file, backup)
+            print(f"[CONFIG] Unreadable config moved to {backup}; using defaults")
+        except OSError as e:
+            print(f"[CONFIG] Could not move unreadable config aside: {e}")
+
     def _migrate_old_config(self, old_config: Dict[str, Any]) -> Dict[str, Any]:
         """Migrate from old single-asset config to new multi-asset format"""
         new_config = self._get_defaults()
@@ -162,18 +192,79 @@ class ConfigManager:
                     
         return new_config
 
+    # ========================
+    # PERSISTENCE
+    # ========================
+
+    def _touch(self):
+        self.version += 1
+
     def save_config(self):
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=4)
-        except Exception as e:
-            print(f" Error saving config: {e}")
+        """
+        Persist the config. On the event loop this schedules a debounced
+        write on a worker thread; without a running loop (construction in a
+        worker thread, scripts) it writes immediately.
+        """
+        self._writer.request()
+
+    def flush(self) -> bool:
+        """Write any pending changes now (blocking). False if the write failed."""
+        return self._writer.flush()
+
+    async def flush_async(self) -> bool:
+        """Write any pending changes now: serialized on the loop, written in a worker thread."""
+        return await self._writer.flush_async()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._writer.get_stats(),
+            "version": self.version,
+        }
 
     def update_config(self, new_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update config with new values.
         Handles both flat updates and nested symbol updates.
         """
+        self.apply_update(new_config)
+        return self.config
+
+    def apply_update(self, new_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply an update (see update_config) and return what it changed:
+        {"version", "global": [fields], "added": [symbols], "removed": [symbols],
+         "changed": {symbol: [fields]}}. added/removed are enabled flips.
+        Saves only if something changed.
+        """
+        symbols = self.config.get("symbols", {})
+        before_global = dict(self.config["global"])
+        before = {s: dict(symbols[s]) for s in new_config.get("symbols", {}) if s in symbols}
+
+        self._apply(new_config)
+
+        diff = {
+            "version": self.version,
+            "global": sorted(k for k, v in self.config["global"].items() if before_global.get(k) != v),
+            "added": [],
+            "removed": [],
+            "changed": {},
+        }
+        for symbol, old in before.items():
+            cfg = symbols[symbol]
+            if old.get("enabled", False) != cfg.get("enabled", False):
+                diff["added" if cfg.get("enabled") else "removed"].append(symbol)
+            changed = sorted(k for k, v in cfg.items() if k != "enabled" and old.get(k) != v)
+            if changed:
+                diff["changed"][symbol] = changed
+
+        if diff["global"] or diff["added"] or diff["removed"] or diff["changed"]:
+            self._touch()
+            diff["version"] = self.version
+            self.save_config()
+        return diff
+
+    def _apply(self, new_config: Dict[str, Any]):
+        """Merge and validate an update in place (no version bump, no save)."""
         # Handle global settings
         if "global" in new_config:
             self.config["global"].update(new_config["global"])
@@ -205,9 +296,10 @@ class ConfigManager:
                     # Validate protection_distance: must be > 0
                     prot_dist = self.config["symbols"][symbol].get("protection_distance", 100.0)
                     self.config["symbols"][symbol]["protection_distance"] = max(1.0, float(prot_dist))
-        
-        self.save_config()
-        return self.config
+
+                    # Validate single_fire_prefetch_fraction: clamp to [0, 1]
+                    prefetch = self.config["symbols"][symbol].get("single_fire_prefetch_fraction", 0.25)
+                    self.config["symbols"][symbol]["single_fire_prefetch_fraction"] = min(1.0, max(0.0, float(prefetch)))
 
     def get_config(self) -> Dict[str, Any]:
         return self.config
@@ -239,7 +331,23 @@ class ConfigManager:
         """Enable or disable a symbol"""
         if symbol in self.config.get("symbols", {}):
             self.config["symbols"][symbol]["enabled"] = enabled
+            self._touch()
             self.save_config()
+
+    def set_symbols_enabled(self, symbols: List[str], enabled: bool = True) -> bool:
+        """
+        Enable or disable several symbols in memory (no save).
+        Returns True if anything changed; the caller saves once.
+        """
+        changed = False
+        for symbol in symbols:
+            sym_cfg = self.config.get("symbols", {}).get(symbol)
+            if sym_cfg is not None and sym_cfg.get("enabled") != enabled:
+                sym_cfg["enabled"] = enabled
+                changed = True
+        if changed:
+            self._touch()
+        return changed
     
     def _get_defaults(self) -> Dict[str, Any]:
         """Generate default multi-asset config structure"""
@@ -251,4 +359,5 @@ class ConfigManager:
                 symbol: get_default_symbol_config(symbol)
                 for symbol in AVAILABLE_SYMBOLS
             }
-        }
\ No newline at end of file
+        }
+
@@ -0,0 +1,120 @@
+"""
+Console Redirection
+
+Replaces stdout/stderr with ConsoleSinks so print() from the event loop never
+blocks on the terminal (or on the file a parent process captures it into).
+Used by main.py and by account workers (core.account_worker).
+"""
+
+import atexit
+import sys
+import threading
+import time
+
+from core.log_writer import log_writer
+
+
+class ConsoleSink:
+    """
+    Non-blocking stdout/stderr replacement.
+
+    Console output is buffered in memory and written to the terminal on a
+    timer or once FLUSH_BYTES are pending. The file copy (if `log_path` is
+    given) goes through the background LogWriter, which batches and
+    size-rotates it. Everything is flushed at exit and after an uncaught
+    exception.
+    """
+
+    FLUSH_INTERVAL = 0.25  # seconds
+    FLUSH_BYTES = 64 * 1024
+
+    _sinks = []
+    _timer = None
+
+    def __init__(self, original_stream, log_path=None):
+        self.original_stream = original_stream
+        self.log_path = str(log_path) if log_path is not None else None
+        self._buffer = []
+        self._pending = 0
+        self._lock = threading.Lock()     # guards the buffer
+        self._io_lock = threading.Lock()  # keeps flushed chunks in order
+        ConsoleSink._sinks.append(self)
+        ConsoleSink._start_timer()
+
+    def write(self, data):
+        if not data:
+            return 0
+        try:
+            if self.log_path is not None:
+                log_writer.write(self.log_path, data)
+            with self._lock:
+                self._buffer.append(data)
+                self._pending += len(data)
+                full = self._pending >= self.FLUSH_BYTES
+            if full:
+                self.flush()
+        except Exception:
+            pass  # Prevent recursion or errors during write
+        return len(data)
+
+    def flush(self):
+        with self._io_lock:
+            with self._lock:
+                if not self._buffer:
+                    return
+                data = "".join(self._buffer)
+                self._buffer.clear()
+                self._pending = 0
+            try:
+                self.original_stream.write(data)
+                self.original_stream.flush()
+            except Exception:
+                pass
+
+    def isatty(self):
+        try:
+            return self.original_stream.isatty()
+        except AttributeError:
+            return False
+
+    def __getattr__(self, name):
+        return getattr(self.original_stream, name)
+
+    @classmethod
+    def flush_all(cls):
+        for sink in cls._sinks:
+            sink.flush()
+
+    @classmethod
+    def _start_timer(cls):
+        if cls._timer is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(cls.FLUSH_INTERVAL)
+                cls.flush_all()
+
+        cls._timer = threading.Thread(target=run, name="console-flush", daemon=True)
+        cls._timer.start()
+
+
+def flush_on_crash(exc_type, exc_value, exc_tb):
+    """Print the traceback, then push it to terminal and file immediately."""
+    sys.__excepthook__(exc_type, exc_value, exc_tb)
+    ConsoleSink.flush_all()
+    log_writer.flush()
+
+
+def redirect_console(log_path=None) -> bool:
+    """Route stdout and stderr through ConsoleSinks (copied to `log_path`, if given)."""
+    try:
+        sys.stdout = ConsoleSink(sys.stdout, log_path)
+        sys.stderr = ConsoleSink(sys.stderr, log_path)
+        sys.excepthook = flush_on_crash
+        # Registered after log_writer's own hook, so it runs first (LIFO)
+        atexit.register(ConsoleSink.flush_all)
+        return True
+    except Exception as e:
+        print(f"[SYSTEM] Failed to redirect terminal output: {e}")
+        return False
@@ -3,12 +3,19 @@ Activity Logger for Pair Strategy Engine
 
 Logs all trading activity to downloadable files in plain English.
 Designed to be readable by anyone — no technical jargon.
+
+Lines are handed to the background LogWriter; nothing here touches disk
+or stdout synchronously. Every event is also recorded in the binary event
+journal (core/engine/event_journal.py) for indexed history queries.
 """
 
 import os
 from datetime import datetime
 from typing import Optional
 
+from core.log_writer import log_writer
+from core.engine.event_journal import get_journal
+
 # Friendly names for position legs
 LEG_NAMES = {
     "Bx": "1st Buy",
@@ -24,6 +31,7 @@ class ActivityLogger:
     Per-symbol activity logging with timestamped, downloadable files.
 
     Log files stored in: logs/users/{user_id}/sessions/{symbol}_{date}.log
+    A new file is started when the date changes.
     """
 
     def __init__(self, symbol: str, user_id: str = "default", session_logger=None):
@@ -41,10 +49,22 @@ class ActivityLogger:
         os.makedirs(self.log_dir, exist_ok=True)
 
         # Generate filename with date
+        self._date_str = ""
+        self.log_file = self._current_log_file()
+
+        # Structured journal (cycle tracked from events that carry one)
+        self.journal = get_journal(user_id, symbol)
+        self.cycle = 0
+
+    def _current_log_file(self):
+        """Dated log file path; rolls over when the day changes."""
         date_str = datetime.now().strftime("%Y-%m-%d")
-        safe_symbol = symbol.replace(" ", "_")
-        # Prefix with 'activity_' so we can distinguish from session logs
-        self.log_file = self.log_dir / f"activity_{safe_symbol}_{date_str}.log"
+        if date_str != self._date_str:
+            self._date_str = date_str
+            safe_symbol = self.symbol.replace(" ", "_")
+            # Prefix with 'activity_' so we can distinguish from session logs
+            self.log_file = self.log_dir / f"activity_{safe_symbol}_{date_str}.log"
+        return self.log_file
 
     def _friendly_leg(self, leg: str) -> str:
         """Convert leg code to friendly name"""
@@ -55,20 +75,25 @@ class ActivityLogger:
         return "BUY" if direction == "buy" else "SELL"
 
     def _write(self, entry: str):
-        """Write timestamped entry to log file"""
+        """Queue timestamped entry for the log file (written off-loop)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         line = f"  {timestamp}  {entry}\n"
 
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(line)
+        log_writer.write(self._current_log_file(), line)
 
-        # Also print to console
-        print(f"[{self.symbol}] {entry}")
+        # Also echo to console
+        log_writer.console(f"[{self.symbol}] {entry}\n")
 
         # Also write to session log if available
         if self.session_logger:
             self.session_logger.log(f"[{self.symbol}] {entry}")
 
+    def _journal(self, event: str, cycle: Optional[int] = None, **fields):
+        """Record a structured event in the binary journal"""
+        if cycle is not None:
+            self.cycle = cycle
+        self.journal.record(event, self.cycle, **fields)
+
     def _write_header(self, text: str):
         """Write a prominent section header"""
         border = "=" * 60
@@ -88,13 +113,16 @@ class ActivityLogger:
                  tp: float, sl: float, ticket: int = 0):
         """Log a position opening (atomic fire)"""
         friendly = self._friendly_leg(leg_name)
-        
+        self._journal("fire", cycle, leg=leg_name, price=price, lot=lot,
+                      tp=tp, sl=sl, ticket=ticket)
+
         self._write(
             f"Opened {friendly} @ {price:.5f}  |  Lot: {lot:.2f}"
         )
 
     def log_second_fire(self, cycle: int, price: float):
         """Log the second atomic fire (grid distance reached)"""
+        self._journal("second_fire", cycle, price=price)
         self._write_separator()
         self._write(
             f"Price moved to {price:.5f} — grid distance reached. Opening 2nd pair..."
@@ -107,6 +135,8 @@ class ActivityLogger:
     def log_tp_hit(self, ticket: int, leg: str, tp_price: float,
                    realized_pnl: float, action: str = ""):
         """Log a take profit hit"""
+        self._journal("tp_hit", ticket=ticket, leg=leg, price=tp_price,
+                      pnl=realized_pnl, action=action)
         friendly = self._friendly_leg(leg)
         result = "profit" if realized_pnl >= 0 else "loss"
         self._write(
@@ -117,6 +147,7 @@ class ActivityLogger:
     def log_sl_hit(self, ticket: int, leg: str, sl_price: float,
                    realized_pnl: float):
         """Log a stop loss hit"""
+        self._journal("sl_hit", ticket=ticket, leg=leg, price=sl_price, pnl=realized_pnl)
         friendly = self._friendly_leg(leg)
         self._write(
             f"{friendly} hit SL @ {sl_price:.5f}  |  "
@@ -126,6 +157,8 @@ class ActivityLogger:
     def log_single_buy_opened(self, cycle: int, price: float, lot: float,
                                tp: float, sl: float, ticket: int = 0):
         """Log recovery single buy opening (legacy — kept for compatibility)"""
+        self._journal("fire", cycle, leg="SingleFire", direction="buy", price=price,
+                      lot=lot, tp=tp, sl=sl, ticket=ticket)
         self._write(
             f"Opened Recovery BUY @ {price:.5f}  |  Lot: {lot:.2f}"
         )
@@ -137,6 +170,8 @@ class ActivityLogger:
     def log_liquidation_calc(self, profit_price: float, loss_price: float,
                              net_lots: float, realized_pnl: float):
         """Log calculated liquidation prices"""
+        self._journal("liquidation_calc", profit_price=profit_price, loss_price=loss_price,
+                      net_lots=net_lots, pnl=realized_pnl)
         self._write(
             f"Calculated exit prices — Profit target at: {profit_price:.2f}  |  "
             f"Loss limit at: {loss_price:.2f}  |  Running P&L: ${realized_pnl:.2f}"
@@ -149,6 +184,7 @@ class ActivityLogger:
     def log_threshold_hit(self, threshold_type: str, price: float,
                           total_pnl: float):
         """Log when max profit/loss threshold is hit"""
+        self._journal("threshold", type=threshold_type, price=price, pnl=total_pnl)
         friendly_type = {
             "MAX_PROFIT": "Maximum profit target",
             "MAX_LOSS": "Maximum loss limit",
@@ -166,6 +202,8 @@ class ActivityLogger:
     def log_reset(self, old_cycle: int, new_cycle: int, reason: str,
                   total_pnl: float):
         """Log nuclear reset and restart"""
+        self._journal("reset", old_cycle, new_cycle=new_cycle, reason=reason, pnl=total_pnl)
+        self.cycle = new_cycle
         friendly_reasons = {
             "ALL_CLOSED": "All trades closed naturally",
             "PROTECTION_DISTANCE": "Price reversed past protection level — safety reset",
@@ -185,18 +223,21 @@ class ActivityLogger:
 
     def log_graceful_stop(self, cycle: int, reason: str):
         """Log graceful stop activation"""
+        self._journal("graceful_stop", cycle, reason=reason)
         self._write(
             "Graceful stop requested — bot will stop after all open trades close."
         )
 
     def log_start(self, cycle: int, start_price: float):
         """Log strategy start"""
+        self._journal("start", cycle, price=start_price)
         self._write_header(
             f"CYCLE #{cycle} STARTED  |  {self.symbol}  |  Entry price: {start_price:.2f}"
         )
 
     def log_stop(self, cycle: int, reason: str = "manual"):
         """Log strategy stop"""
+        self._journal("stop", cycle, reason=reason)
         friendly_reasons = {
             "manual": "Manually stopped by user",
             "graceful_stop_immediate": "Graceful stop — no open trades, stopped immediately",
@@ -212,14 +253,17 @@ class ActivityLogger:
 
     def log_info(self, message: str):
         """Log general info message"""
+        self._journal("info", message=message)
         self._write(message)
 
     def log_error(self, message: str):
         """Log error message"""
+        self._journal("error", message=message)
         self._write(f"ERROR: {message}")
 
     def log_phase_transition(self, old_phase: str, new_phase: str):
         """Log phase state transition"""
+        self._journal("phase", old=old_phase, new=new_phase)
         friendly_phases = {
             "IDLE": "Idle",
             "FIRST_FIRE": "Opening first pair of trades",
@@ -0,0 +1,324 @@
+"""
+Local OHLC Bar Builder
+
+Builds rolling M1/M5/H1 bars per symbol from the ticks the TradingEngine
+already polls, so DirectionEngine and the chart endpoint do not have to call
+mt5.copy_rates_from_pos on the critical path.
+
+Each (symbol, timeframe) keeps a fixed-size ring buffer, seeded once from MT5
+history the first time the symbol ticks. Bars use the bid price, like MT5's
+own forex bars. If the symbol stops being polled for longer than
+RESEED_GAP_SECONDS the ring catches up from history, since ticks were missed.
+A ring is only served while it is current: one not updated within its bar
+length (symbol no longer polled, or restored from a checkpoint and not yet
+caught up) falls back to the candle cache.
+
+Rings are checkpointed to a single .npz file (raw structured arrays, last bar
+time included), written atomically (core.atomic_file). On boot the checkpoint
+is read off the event loop and each symbol fetches only the bars appended
+since its last checkpointed bar. Indicators are derived
+from these bars, so the rings are the whole warm state.
+
+Polling can miss intra-poll extremes, so high/low of locally built bars may
+differ marginally from the terminal's.
+"""
+
+import io
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import MetaTrader5 as mt5
+
+from core.atomic_file import write_atomic
+from core.engine.candle_cache import candle_cache, fetch_since
+
+# Per-process override (account workers each keep their own rings)
+BAR_CHECKPOINT_FILE = os.getenv("BAR_CHECKPOINT_FILE", "db/bar_state.npz")
+
+# Same layout as the structured arrays returned by copy_rates_from_pos
+RATE_DTYPE = np.dtype([
+    ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+    ('close', '<f8'), ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8'),
+])
+
+# timeframe -> (bar length in seconds, ring capacity)
+TIMEFRAMES = {
+    mt5.TIMEFRAME_M1: (60, 500),
+    mt5.TIMEFRAME_M5: (300, 500),
+    mt5.TIMEFRAME_H1: (3600, 500),
+}
+
+TIMEFRAME_NAMES = {
+    "M1": mt5.TIMEFRAME_M1,
+    "M5": mt5.TIMEFRAME_M5,
+    "H1": mt5.TIMEFRAME_H1,
+}
+
+
+class BarRing:
+    """
+    Fixed-size ring of bars.
+
+    Every slot is mirrored at index + capacity, so the newest N bars are
+    always one contiguous slice of the backing array.
+    """
+
+    def __init__(self, capacity: int, seconds: int):
+        self.capacity = capacity
+        self.seconds = seconds
+        self._buf = np.zeros(2 * capacity, dtype=RATE_DTYPE)
+        self._head = 0  # next write slot
+        self.size = 0
+        self.updated_at: Optional[float] = None  # monotonic time of the last seed/catch-up/tick
+
+    def _last_index(self) -> int:
+        return (self._head - 1) % self.capacity
+
+    @property
+    def last_time(self) -> int:
+        return int(self._buf['time'][self._last_index()]) if self.size else 0
+
+    def seed(self, rates: np.ndarray):
+        """Replace contents with the newest `capacity` bars of `rates`."""
+        n = min(len(rates), self.capacity)
+        self._buf[:n] = rates[-n:]
+        self._buf[self.capacity:self.capacity + n] = rates[-n:]
+        self._head = n % self.capacity
+        self.size = n
+        self.updated_at = time.monotonic()
+
+    def catch_up(self, new: np.ndarray):
+        """Replace bars from new[0].time onward with `new` (delta merge)."""
+        current = self.latest(self.size)
+        keep = current[current['time'] < new['time'][0]]
+        self.seed(np.concatenate((keep, new)))
+
+    def update(self, tick_time: int, price: float):
+        """Fold one tick into the forming bar, opening a new bar if needed."""
+        bar_time = tick_time - tick_time % self.seconds
+
+        if self.size and bar_time == self.last_time:
+            i = self._last_index()
+            for j in (i, i + self.capacity):
+                bar = self._buf[j]
+                if price > bar['high']:
+                    bar['high'] = price
+                if price < bar['low']:
+                    bar['low'] = price
+                bar['close'] = price
+                bar['tick_volume'] += 1
+        elif not self.size or bar_time > self.last_time:
+            bar = (bar_time, price, price, price, price, 1, 0, 0)
+            self._buf[self._head] = bar
+            self._buf[self._head + self.capacity] = bar
+            self._head = (self._head + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+        # else: out-of-order tick for an older bar — ignore
+        self.updated_at = time.monotonic()
+
+    def is_current(self) -> bool:
+        """Updated within one bar length (a restored ring is not, until caught up)."""
+        return self.updated_at is not None and time.monotonic() - self.updated_at <= self.seconds
+
+    def latest(self, count: int) -> np.ndarray:
+        """Newest `count` bars (oldest first), as a copy safe to hand off-thread."""
+        n = min(count, self.size)
+        end = self._head + self.capacity
+        return self._buf[end - n:end].copy()
+
+
+class BarBuilder:
+    """Per-symbol M1/M5/H1 rings fed from the engine's tick stream."""
+
+    # Catch up from history if a symbol was not polled for this long
+    RESEED_GAP_SECONDS = 120
+
+    def __init__(self):
+        self._rings: Dict[Tuple[str, int], BarRing] = {}
+        self._last_tick: Dict[str, Tuple[int, int]] = {}  # symbol -> (time, time_msc)
+        self._restored: Set[str] = set()  # symbols loaded from checkpoint, awaiting delta
+        self.stats = {
+            "seeds": 0,
+            "catch_ups": 0,
+            "restored": 0,
+            "ticks": 0,
+            "served": 0,
+            "fallbacks": 0,
+            "stale": 0,  # Fallbacks because the ring was not current
+        }
+
+    def seed(self, symbol: str) -> bool:
+        """Seed all timeframes for a symbol from MT5 history."""
+        seeded = False
+        for timeframe, (seconds, capacity) in TIMEFRAMES.items():
+            rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, capacity)
+            if rates is None or len(rates) == 0:
+                self._rings.pop((symbol, timeframe), None)
+                continue
+            ring = self._rings.get((symbol, timeframe))
+            if ring is None:
+                ring = BarRing(capacity, seconds)
+                self._rings[(symbol, timeframe)] = ring
+            ring.seed(rates)
+            seeded = True
+        if seeded:
+            self.stats["seeds"] += 1
+        return seeded
+
+    def catch_up(self, symbol: str) -> bool:
+        """
+        Fetch only bars newer than each ring's last bar.
+        Falls back to a full seed if any timeframe cannot be stitched.
+        """
+        for timeframe, (seconds, capacity) in TIMEFRAMES.items():
+            ring = self._rings.get((symbol, timeframe))
+            if ring is None or not ring.size:
+                return self.seed(symbol)
+            new = fetch_since(symbol, timeframe, ring.last_time, capacity)
+            if new is None:
+                return self.seed(symbol)
+            ring.catch_up(new)
+        self.stats["catch_ups"] += 1
+        return True
+
+    def on_tick(self, symbol: str, tick):
+        """Called by the TradingEngine for every polled tick."""
+        tick_msc = getattr(tick, 'time_msc', 0)
+        last = self._last_tick.get(symbol)
+        if last is not None and tick_msc and last[1] == tick_msc:
+            return  # Same tick polled again
+
+        if last is None:
+            if symbol in self._restored:
+                self._restored.discard(symbol)
+                self.catch_up(symbol)
+            else:
+                self.seed(symbol)
+        elif tick.time - last[0] > self.RESEED_GAP_SECONDS:
+            self.catch_up(symbol)
+
+        self._last_tick[symbol] = (tick.time, tick_msc)
+        self.stats["ticks"] += 1
+
+        for timeframe in TIMEFRAMES:
+            ring = self._rings.get((symbol, timeframe))
+            if ring is not None:
+                ring.update(tick.time, tick.bid)
+
+    def get(self, symbol: str, timeframe: int, count: int) -> Optional[np.ndarray]:
+        """
+        Newest `count` bars from the local rings, or None if the symbol is
+        not being built locally, has fewer bars than requested, or its ring
+        is not current (see BarRing.is_current).
+        """
+        ring = self._rings.get((symbol, timeframe))
+        if ring is None or ring.size < count:
+            self.stats["fallbacks"] += 1
+            return None
+        if not ring.is_current():
+            self.stats["fallbacks"] += 1
+            self.stats["stale"] += 1
+            return None
+        self.stats["served"] += 1
+        return ring.latest(count)
+
+    def chart(self, symbol: str, timeframe: str, count: int) -> List[dict]:
+        """Bars for the chart API; falls back to the shared candle cache."""
+        tf = TIMEFRAME_NAMES.get(timeframe.upper())
+        if tf is None:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+        rates = self.get(symbol, tf, count)
+        if rates is None:
+            rates = candle_cache.get(symbol, tf, count)
+        if rates is None:
+            return []
+
+        return [
+            {
+                "time": int(bar['time']),
+                "open": float(bar['open']),
+                "high": float(bar['high']),
+                "low": float(bar['low']),
+                "close": float(bar['close']),
+                "tick_volume": int(bar['tick_volume']),
+            }
+            for bar in rates
+        ]
+
+    # ========================
+    # CHECKPOINT
+    # ========================
+
+    def snapshot_rings(self) -> Dict[str, np.ndarray]:
+        """Copy every ring (oldest first). Keys are '{symbol}|{timeframe}'."""
+        return {
+            f"{symbol}|{timeframe}": ring.latest(ring.size)
+            for (symbol, timeframe), ring in self._rings.items()
+            if ring.size
+        }
+
+    @staticmethod
+    def write_checkpoint(arrays: Dict[str, np.ndarray], path: str = BAR_CHECKPOINT_FILE):
+        """Write ring copies to disk atomically (blocking: run off the event loop)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        buf = io.BytesIO()
+        np.savez(buf, **arrays)
+        write_atomic(path, buf.getvalue())
+
+    @staticmethod
+    def read_checkpoint(path: str = BAR_CHECKPOINT_FILE) -> Dict[str, np.ndarray]:
+        """Read a checkpoint's arrays ({} if missing or unreadable). Blocking: run off the event loop."""
+        if not os.path.exists(path):
+            return {}
+        try:
+            with np.load(path) as data:
+                return {key: data[key] for key in data.files}
+        except Exception as e:
+            print(f"[BARS] Could not load checkpoint {path}: {e}")
+            return {}
+
+    def restore_checkpoint(self, arrays: Dict[str, np.ndarray]) -> int:
+        """
+        Restore rings from read_checkpoint() arrays. Restored symbols fetch
+        only the delta on their first tick. Returns the number of rings loaded.
+        """
+        t0 = time.perf_counter()
+        loaded = 0
+        for key, rates in arrays.items():
+            symbol, _, tf_str = key.rpartition("|")
+            try:
+                timeframe = int(tf_str)
+            except ValueError:
+                continue
+            if timeframe not in TIMEFRAMES:
+                continue
+            seconds, capacity = TIMEFRAMES[timeframe]
+            ring = BarRing(capacity, seconds)
+            ring.seed(rates.astype(RATE_DTYPE, copy=False))
+            ring.updated_at = None  # Not current until the first tick catches it up
+            self._rings[(symbol, timeframe)] = ring
+            self._restored.add(symbol)
+            loaded += 1
+
+        if loaded:
+            self.stats["restored"] += loaded
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            print(f"[BARS] Restored {loaded} bar rings for {len(self._restored)} symbols in {elapsed_ms:.1f} ms")
+        return loaded
+
+    def load_checkpoint(self, path: str = BAR_CHECKPOINT_FILE) -> int:
+        """read_checkpoint + restore_checkpoint in one (blocking) call."""
+        return self.restore_checkpoint(self.read_checkpoint(path))
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "symbols": len(self._last_tick),
+        }
+
+
+# Global singleton instance (fed by the TradingEngine tick loop)
+bar_builder = BarBuilder()
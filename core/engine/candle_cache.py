@@ -0,0 +1,121 @@
+"""
+Shared Candle Cache
+
+Process-wide cache of MT5 rate arrays keyed by (symbol, timeframe), shared by
+every DirectionEngine across all strategies and users.
+
+Closed bars never change, so after the first full download each refresh only
+pulls the bars appended since the last cached bar (plus that bar itself,
+which may still have been forming). Bars with time >= the first refreshed bar
+are replaced — that is the bar-close invalidation.
+"""
+
+import threading
+from typing import Dict, Tuple, Optional
+
+import numpy as np
+import MetaTrader5 as mt5
+
+
+# First delta request size; doubled until it overlaps the known tail
+INITIAL_DELTA = 2
+
+
+def fetch_since(symbol: str, timeframe: int, last_time: int, limit: int,
+                on_fetch=None) -> Optional[np.ndarray]:
+    """
+    Fetch the newest bars back to (and including) the bar at `last_time`.
+
+    Requests a small tail from position 0 and doubles it until it overlaps
+    `last_time`, so only appended bars plus the possibly-forming last bar are
+    transferred. Returns None if no overlap is found within `limit` bars.
+    on_fetch(rates) is called for every batch received (for accounting).
+    """
+    delta = INITIAL_DELTA
+    while delta < limit:
+        new = mt5.copy_rates_from_pos(symbol, timeframe, 0, delta)
+        if new is None or len(new) == 0:
+            return None
+        if on_fetch:
+            on_fetch(new)
+        if new['time'][0] <= last_time:
+            return new
+        delta *= 2
+    return None
+
+
+class CandleCache:
+    """
+    Incremental (symbol, timeframe) -> rates cache.
+
+    get() returns the newest `count` bars exactly like
+    mt5.copy_rates_from_pos(symbol, timeframe, 0, count).
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, int], np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,            # served from cache + delta refresh
+            "misses": 0,          # full history download
+            "bytes_fetched": 0,
+            "bars_fetched": 0,
+        }
+
+    def get(self, symbol: str, timeframe: int, count: int) -> Optional[np.ndarray]:
+        """Return the newest `count` bars, or None if MT5 has no data."""
+        key = (symbol, timeframe)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and len(cached) >= count:
+                merged = self._refresh(symbol, timeframe, cached, count)
+                if merged is not None:
+                    self._entries[key] = merged
+                    self.stats["hits"] += 1
+                    return merged[-count:]
+
+            # Cold, too short, or the delta could not be stitched: full fetch
+            rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+            self.stats["misses"] += 1
+            if rates is None or len(rates) == 0:
+                return None
+            self._account(rates)
+            self._entries[key] = rates
+            return rates
+
+    def _refresh(self, symbol: str, timeframe: int, cached: np.ndarray,
+                 count: int) -> Optional[np.ndarray]:
+        """
+        Fetch only the bars newer than the cached tail and merge them in.
+        Returns None when a full reload is needed.
+        """
+        new = fetch_since(symbol, timeframe, int(cached['time'][-1]), count, self._account)
+        if new is None:
+            return None
+        keep = cached[cached['time'] < new['time'][0]]
+        return np.concatenate((keep, new))[-max(count, len(cached)):]
+
+    def _account(self, rates: np.ndarray):
+        self.stats["bytes_fetched"] += rates.nbytes
+        self.stats["bars_fetched"] += len(rates)
+
+    def invalidate(self, symbol: str = None):
+        """Drop cached bars for one symbol, or everything."""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == symbol]:
+                    del self._entries[key]
+
+    def get_stats(self) -> dict:
+        total = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": self.stats["hits"] / total if total else 0.0,
+        }
+
+
+# Global singleton instance (shared across all users/strategies)
+candle_cache = CandleCache()
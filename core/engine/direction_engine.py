@@ -11,10 +11,19 @@ Indicators and timeframes:
 
 Resolution: direction = 'buy' if BUY_SCORE >= SELL_SCORE else 'sell'
 No minimum threshold. No skip. No None return. Always resolves.
+
+Indicator math runs through core/engine/indicators.py (NumPy, bit-compatible
+with the pure-Python reference methods below).
 """
 
+from typing import Dict, Tuple
+
 import MetaTrader5 as mt5
 
+from core.engine import indicators
+from core.engine.bar_builder import bar_builder
+from core.engine.candle_cache import candle_cache
+
 
 class DirectionEngine:
     """
@@ -31,17 +40,22 @@ class DirectionEngine:
 
     def _fetch_candles(self, timeframe, count: int):
         """
-        Fetch OHLCV candle data from MT5.
-        Returns list of tuples or None on failure.
+        Fetch OHLCV candle data from the local tick-built bars, falling back
+        to the shared candle cache (only bars appended since the last fetch
+        hit the terminal). Returns the MT5 rates array or None on failure.
         Each element has: time, open, high, low, close, tick_volume, spread, real_volume
         """
-        rates = mt5.copy_rates_from_pos(self.symbol, timeframe, 0, count)
+        rates = bar_builder.get(self.symbol, timeframe, count)
+        if rates is None:
+            rates = candle_cache.get(self.symbol, timeframe, count)
         if rates is None or len(rates) == 0:
             return None
         return rates
 
     # ──────────────────────────────────────────────
-    # INDICATOR CALCULATIONS (pure Python)
+    # INDICATOR CALCULATIONS (pure Python reference)
+    # Scoring uses the vectorized versions in indicators.py;
+    # these are kept as the reference they are validated against.
     # ──────────────────────────────────────────────
 
     def _ema(self, closes: list, period: int) -> float:
@@ -276,111 +290,58 @@ class DirectionEngine:
     # MAIN SCORING RESOLUTION
     # ──────────────────────────────────────────────
 
-    def resolve(self, ask: float, bid: float) -> str:
+    def fetch_candles(self):
+        """Fetch (h1, m5, m1) rate arrays used for scoring."""
+        return (
+            self._fetch_candles(mt5.TIMEFRAME_H1, 200),
+            self._fetch_candles(mt5.TIMEFRAME_M5, 100),
+            self._fetch_candles(mt5.TIMEFRAME_M1, 50),
+        )
+
+    @staticmethod
+    def prepare(candles) -> dict:
         """
-        Evaluate all indicators and return 'buy' or 'sell'.
-        Called once per single fire trigger event.
-        Never returns None. Ties resolve to 'buy'.
+        Compute the price-independent indicator snapshot from (h1, m5, m1).
+        Pure NumPy — safe to run off the event loop.
         """
-        buy_score = 0
-        sell_score = 0
-        mid = (ask + bid) / 2
-
-        # ── Fetch candle data ──
-        h1_candles = self._fetch_candles(mt5.TIMEFRAME_H1, 200)
-        m5_candles = self._fetch_candles(mt5.TIMEFRAME_M5, 100)
-        m1_candles = self._fetch_candles(mt5.TIMEFRAME_M1, 50)
-
-        # Extract close arrays (index 4 = close in MT5 rate tuples)
-        h1_closes = [c[4] for c in h1_candles] if h1_candles is not None else []
-        m5_closes = [c[4] for c in m5_candles] if m5_candles is not None else []
-        m1_closes = [c[4] for c in m1_candles] if m1_candles is not None else []
-        m1_highs = [c[2] for c in m1_candles] if m1_candles is not None else []
-        m1_lows = [c[3] for c in m1_candles] if m1_candles is not None else []
-        m5_highs = [c[2] for c in m5_candles] if m5_candles is not None else []
-        m5_lows = [c[3] for c in m5_candles] if m5_candles is not None else []
-
-        # ── 1. 200 EMA structural bias (H1) — weight: 30 ──
-        if len(h1_closes) >= 200:
-            ema200 = self._ema(h1_closes, 200)
-            if mid > ema200:
-                buy_score += 30
-            elif mid < ema200:
-                sell_score += 30
-
-        # ── 2. 50 EMA slope (H1) — weight: 20 ──
-        if len(h1_closes) >= 50:
-            ema50_series = self._ema_series(h1_closes, 50)
-            if len(ema50_series) >= 2:
-                slope = ema50_series[-1] - ema50_series[-2]
-                if slope > 0:
-                    buy_score += 20
-                elif slope < 0:
-                    sell_score += 20
-
-        # ── 3. MACD histogram (M5) — weight: 20 ──
-        if len(m5_closes) >= 26:
-            macd_line, signal, histogram = self._macd(m5_closes)
-
-            # Check if histogram is expanding (current > previous magnitude)
-            # Recalculate with one fewer candle to get previous histogram
-            _, _, prev_histogram = self._macd(m5_closes[:-1])
-
-            if histogram > 0 and abs(histogram) > abs(prev_histogram):
-                buy_score += 20
-            elif histogram < 0 and abs(histogram) > abs(prev_histogram):
-                sell_score += 20
-
-        # ── 4. RSI regime (M5) — weight: 15 ──
-        if len(m5_closes) >= 15:
-            rsi_val = self._rsi(m5_closes)
-            if rsi_val > 60:
-                buy_score += 15
-            elif rsi_val < 40:
-                sell_score += 15
-
-        # ── 5. RSI divergence (M5) — weight: 10 ──
-        if len(m5_closes) >= 19:  # Need enough for RSI series + 5 candle lookback
-            rsi_series = self._rsi_series(m5_closes)
-            if len(rsi_series) >= 5:
-                div = self._divergence(m5_closes[-5:], rsi_series[-5:])
-                if div == 'bullish':
-                    buy_score += 10
-                elif div == 'bearish':
-                    sell_score += 10
-
-        # ── 6. Bollinger Bands (M5) — weight: 10 ──
-        if len(m5_closes) >= 20:
-            upper, lower, bb_mid, bandwidth = self._bollinger(m5_closes)
-
-            # Also get previous bandwidth for expansion detection
-            _, _, _, prev_bandwidth = self._bollinger(m5_closes[:-1])
-            expanding = bandwidth > prev_bandwidth
-
-            if expanding:
-                # Price riding upper band with expansion -> bullish
-                if mid >= upper:
-                    buy_score += 10
-                # Price riding lower band with expansion -> bearish
-                elif mid <= lower:
-                    sell_score += 10
-
-        # ── 7. Stochastic crossover (M1) — weight: 5 ──
-        if len(m1_closes) >= 17:  # k_period(14) + d_period(3)
-            k_curr, d_curr, k_prev, d_prev = self._stochastic(
-                m1_highs, m1_lows, m1_closes
-            )
-
-            # Bullish cross: %K crosses above %D below 40
-            if k_prev <= d_prev and k_curr > d_curr and k_curr < 40:
-                buy_score += 5
-            # Bearish cross: %K crosses below %D above 60
-            elif k_prev >= d_prev and k_curr < d_curr and k_curr > 60:
-                sell_score += 5
+        h1_candles, m5_candles, m1_candles = candles
+        return indicators.snapshot_rates(h1_candles, m5_candles, m1_candles)
+
+    def resolve_snapshot(self, snap: dict, ask: float, bid: float) -> str:
+        """Finish a prepared snapshot against the live quote. O(1)."""
+        buy_score, sell_score = indicators.score_snapshot(snap, (ask + bid) / 2)
+        buy_score, sell_score = int(buy_score), int(sell_score)
 
         # ── Resolution ──
-        direction = 'buy' if buy_score >= sell_score else 'sell'
+        direction = indicators.direction_from_score(buy_score, sell_score)
 
         print(f'[DIR] BUY_SCORE={buy_score} SELL_SCORE={sell_score} → {direction.upper()}')
 
         return direction
+
+    def resolve(self, ask: float, bid: float) -> str:
+        """
+        Evaluate all indicators and return 'buy' or 'sell'.
+        Called once per single fire trigger event.
+        Never returns None. Ties resolve to 'buy'.
+        """
+        # ── Fetch candle data, score on zero-copy column views ──
+        return self.resolve_snapshot(self.prepare(self.fetch_candles()), ask, bid)
+
+    @classmethod
+    def resolve_many(cls, quotes: Dict[str, Tuple[float, float]]) -> Dict[str, str]:
+        """
+        Resolve direction for many symbols in one vectorized pass.
+        quotes: symbol -> (ask, bid). Returns symbol -> 'buy' | 'sell'.
+        """
+        rate_sets = {}
+        for symbol in quotes:
+            rate_sets[symbol] = cls(symbol).fetch_candles()
+
+        scores = indicators.score_many(rate_sets, quotes)
+        directions = {}
+        for symbol, (buy_score, sell_score) in scores.items():
+            directions[symbol] = indicators.direction_from_score(buy_score, sell_score)
+            print(f'[DIR] {symbol}: BUY_SCORE={buy_score} SELL_SCORE={sell_score} '
+                  f'→ {directions[symbol].upper()}')
+        return directions
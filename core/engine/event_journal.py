@@ -0,0 +1,261 @@
+"""
+Strategy Event Journal
+
+Append-only, length-prefixed binary journal of every ActivityLogger event,
+one file per user/symbol, with a sparse index for seek-based queries.
+
+Files (logs/users/{user_id}/journal/):
+    {symbol}.jrnl   records: <u32 payload_len><f64 ts><u32 cycle><u16 type><json fields>
+    {symbol}.idx    entries: <f64 ts><u32 cycle><u64 offset>
+
+An index entry is written for the first record, every INDEX_EVERY records
+and whenever the cycle changes, so time-range and cycle queries seek
+straight to the right region instead of reading the whole file.
+
+Writes go through the background LogWriter. Each journal tracks its own
+logical end offset, so there is exactly one EventJournal per user/symbol
+(see get_journal). On open, a partial record left by a crash is cut off
+(scanning from the last index entry), so new records follow the last
+complete one and sequential reads never hit the broken bytes.
+"""
+
+import bisect
+import json
+import os
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.log_writer import log_writer
+
+RECORD_HEADER = struct.Struct("<IdIH")   # payload_len, timestamp, cycle, event type
+PAYLOAD_HEADER = struct.Struct("<dIH")   # timestamp, cycle, event type
+LENGTH = struct.Struct("<I")
+INDEX_ENTRY = struct.Struct("<dIQ")      # timestamp, cycle, offset
+
+INDEX_EVERY = 64
+
+EVENT_TYPES = {
+    "start": 1,
+    "stop": 2,
+    "fire": 3,
+    "second_fire": 4,
+    "tp_hit": 5,
+    "sl_hit": 6,
+    "reset": 7,
+    "phase": 8,
+    "graceful_stop": 9,
+    "info": 10,
+    "error": 11,
+    "liquidation_calc": 12,
+    "threshold": 13,
+}
+EVENT_NAMES = {code: name for name, code in EVENT_TYPES.items()}
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def journal_dir(user_id: str) -> Path:
+    return ROOT_DIR / "logs" / "users" / user_id / "journal"
+
+
+def _safe_symbol(symbol: str) -> str:
+    return symbol.replace(" ", "_")
+
+
+class EventJournal:
+    """Writer for one user/symbol journal."""
+
+    def __init__(self, user_id: str, symbol: str):
+        self.user_id = user_id
+        self.symbol = symbol
+        directory = journal_dir(user_id)
+        os.makedirs(directory, exist_ok=True)
+        self.path = directory / f"{_safe_symbol(symbol)}.jrnl"
+        self.index_path = directory / f"{_safe_symbol(symbol)}.idx"
+
+        self._offset = self._recover()
+        self._since_index = INDEX_EVERY  # Index the first record
+        self._last_cycle: Optional[int] = None
+
+    def _recover(self) -> int:
+        """
+        Truncate the journal to its last complete record, and the index to
+        entries inside it. Returns the journal's end offset.
+        """
+        if not self.path.exists():
+            return 0
+        size = self.path.stat().st_size
+        index = [entry for entry in _load_index(self.index_path) if entry[2] < size]
+        start = index[-1][2] if index else 0
+
+        with open(self.path, "rb") as f:
+            end = _complete_end(f, start)
+        if end < size:
+            print(f"[JOURNAL] {self.path.name}: dropping {size - end} bytes of partial record")
+            os.truncate(self.path, end)
+
+        index = [entry for entry in index if entry[2] < end]
+        if self.index_path.exists() and self.index_path.stat().st_size != len(index) * INDEX_ENTRY.size:
+            os.truncate(self.index_path, len(index) * INDEX_ENTRY.size)
+        return end
+
+    def record(self, event: str, cycle: int, **fields):
+        """Append one event (queued; never blocks)."""
+        ts = time.time()
+        cycle = int(cycle) & 0xFFFFFFFF
+        body = json.dumps(fields, separators=(",", ":"), default=str).encode("utf-8")
+        data = RECORD_HEADER.pack(PAYLOAD_HEADER.size + len(body), ts, cycle,
+                                  EVENT_TYPES.get(event, 0)) + body
+
+        if self._since_index >= INDEX_EVERY or cycle != self._last_cycle:
+            log_writer.write_bytes(self.index_path, INDEX_ENTRY.pack(ts, cycle, self._offset))
+            self._since_index = 0
+
+        log_writer.write_bytes(self.path, data)
+        self._offset += len(data)
+        self._since_index += 1
+        self._last_cycle = cycle
+
+
+# One journal per (user_id, symbol) — offsets must have a single owner
+_journals: Dict[Tuple[str, str], EventJournal] = {}
+
+
+def get_journal(user_id: str, symbol: str) -> EventJournal:
+    key = (user_id, symbol)
+    journal = _journals.get(key)
+    if journal is None:
+        journal = EventJournal(user_id, symbol)
+        _journals[key] = journal
+    return journal
+
+
+# ========================
+# QUERIES (run off the event loop)
+# ========================
+
+def _load_index(index_path: Path) -> List[Tuple[float, int, int]]:
+    if not index_path.exists():
+        return []
+    data = index_path.read_bytes()
+    usable = len(data) - len(data) % INDEX_ENTRY.size
+    return list(INDEX_ENTRY.iter_unpack(data[:usable]))
+
+
+def _complete_end(f, offset: int) -> int:
+    """Offset just past the last complete record from `offset` on."""
+    f.seek(offset)
+    while True:
+        raw_len = f.read(LENGTH.size)
+        if len(raw_len) < LENGTH.size:
+            return offset
+        (payload_len,) = LENGTH.unpack(raw_len)
+        if payload_len < PAYLOAD_HEADER.size or len(f.read(payload_len)) < payload_len:
+            return offset
+        offset += LENGTH.size + payload_len
+
+
+def _iter_records(f, offset: int):
+    """Yield (offset, ts, cycle, type, fields) from `offset` until EOF/truncation."""
+    f.seek(offset)
+    while True:
+        raw_len = f.read(LENGTH.size)
+        if len(raw_len) < LENGTH.size:
+            return
+        (payload_len,) = LENGTH.unpack(raw_len)
+        payload = f.read(payload_len)
+        if len(payload) < payload_len or payload_len < PAYLOAD_HEADER.size:
+            return  # Partially written tail
+        ts, cycle, event_type = PAYLOAD_HEADER.unpack_from(payload)
+        try:
+            fields = json.loads(payload[PAYLOAD_HEADER.size:])
+        except ValueError:
+            fields = {}
+        yield offset, ts, cycle, event_type, fields
+        offset += LENGTH.size + payload_len
+
+
+def _to_event(offset, ts, cycle, event_type, fields) -> dict:
+    return {
+        "offset": offset,
+        "ts": ts,
+        "time": datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"),
+        "cycle": cycle,
+        "event": EVENT_NAMES.get(event_type, "unknown"),
+        **fields,
+    }
+
+
+def query_events(user_id: str, symbol: str, start: Optional[float] = None,
+                 end: Optional[float] = None, cycle: Optional[int] = None,
+                 limit: int = 1000) -> List[dict]:
+    """
+    Events for a user/symbol filtered by time range [start, end] (epoch
+    seconds) and/or cycle, oldest first, at most `limit`.
+    """
+    log_writer.flush()  # Make queued records visible
+
+    directory = journal_dir(user_id)
+    path = directory / f"{_safe_symbol(symbol)}.jrnl"
+    if not path.exists():
+        return []
+
+    index = _load_index(directory / f"{_safe_symbol(symbol)}.idx")
+
+    # Seek points: start of each run of the requested cycle, or the last
+    # index entry at/before `start`
+    if cycle is not None:
+        seeks = [
+            entry[2] for i, entry in enumerate(index)
+            if entry[1] == cycle and (i == 0 or index[i - 1][1] != cycle)
+        ]
+    elif start is not None and index:
+        pos = bisect.bisect_right([entry[0] for entry in index], start) - 1
+        seeks = [index[pos][2] if pos >= 0 else 0]
+    else:
+        seeks = [0]
+
+    events: List[dict] = []
+    with open(path, "rb") as f:
+        for seek in seeks:
+            for offset, ts, rec_cycle, event_type, fields in _iter_records(f, seek):
+                if cycle is not None and rec_cycle != cycle:
+                    break  # End of this cycle run
+                if end is not None and ts > end:
+                    break
+                if start is not None and ts < start:
+                    continue
+                events.append(_to_event(offset, ts, rec_cycle, event_type, fields))
+                if len(events) >= limit:
+                    return events
+    return events
+
+
+def render_text(events: List[dict]) -> str:
+    """Human-readable rendering of journal events."""
+    lines = []
+    for ev in events:
+        details = "  ".join(
+            f"{k}={v}" for k, v in ev.items()
+            if k not in ("offset", "ts", "time", "cycle", "event")
+        )
+        lines.append(f"  {ev['time']}  [C{ev['cycle']}] {ev['event'].upper():<14} {details}".rstrip())
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def list_journals(user_id: str) -> List[dict]:
+    directory = journal_dir(user_id)
+    journals = []
+    if directory.exists():
+        for file in sorted(directory.glob("*.jrnl")):
+            stat = file.stat()
+            journals.append({
+                "symbol": file.stem,
+                "name": file.name,
+                "size": stat.st_size,
+                "modified": stat.st_mtime,
+            })
+    return journals
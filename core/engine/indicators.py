@@ -0,0 +1,441 @@
+"""
+Vectorized Indicator Library
+
+NumPy implementations of the DirectionEngine indicators, operating directly
+on the structured arrays returned by mt5.copy_rates_from_pos.
+
+Every indicator accepts either a 1-D array (one symbol) or a 2-D array
+shaped (symbols, bars) and works along the last axis, so a whole watch list
+can be scored in a single pass.
+
+Results are bit-compatible with the pure-Python reference methods on
+DirectionEngine:
+    - sums are accumulated left-to-right (never pairwise), as builtin sum()
+      does for the NumPy float64 values the rates arrays hold
+    - the recursive EMA / Wilder smoothing performs the same float
+      operations in the same order, vectorized across symbols
+    - rolling max/min, differences and ratios are exact elementwise ops
+
+On Python 3.12+, sum() over plain Python floats is compensated (Neumaier),
+so for such inputs the results may differ from the reference in the last
+bits; verify_against_reference(rtol=...) checks them within a tolerance.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# ──────────────────────────────────────────────
+# ARRAY HELPERS
+# ──────────────────────────────────────────────
+
+def column(rates, name: str) -> np.ndarray:
+    """
+    Zero-copy float64 view of one field of an MT5 rates array.
+    Returns an empty array when rates is None/empty.
+    """
+    if rates is None or len(rates) == 0:
+        return np.empty(0, dtype=np.float64)
+    return np.asarray(rates[name], dtype=np.float64)
+
+
+def _seq_sum(x: np.ndarray) -> np.ndarray:
+    """Left-to-right sum along the last axis (matches Python's sum())."""
+    total = np.zeros(x.shape[:-1], dtype=np.float64)
+    for i in range(x.shape[-1]):
+        total = total + x[..., i]
+    return total
+
+
+def _last_or(x: np.ndarray, default: float) -> np.ndarray:
+    """Last value along the last axis, or `default` if the axis is empty."""
+    if x.shape[-1] == 0:
+        return np.full(x.shape[:-1], default, dtype=np.float64)
+    return x[..., -1]
+
+
+# ──────────────────────────────────────────────
+# INDICATORS
+# ──────────────────────────────────────────────
+
+def ema_series(closes: np.ndarray, period: int) -> np.ndarray:
+    """EMA series seeded with the SMA of the first `period` values."""
+    closes = np.asarray(closes, dtype=np.float64)
+    n = closes.shape[-1]
+    if n < period:
+        return closes.copy()
+
+    multiplier = 2.0 / (period + 1)
+    out = np.empty(closes.shape[:-1] + (n - period + 1,), dtype=np.float64)
+
+    ema_val = _seq_sum(closes[..., :period]) / period
+    out[..., 0] = ema_val
+    for i in range(period, n):
+        ema_val = (closes[..., i] - ema_val) * multiplier + ema_val
+        out[..., i - period + 1] = ema_val
+    return out
+
+
+def ema(closes: np.ndarray, period: int) -> np.ndarray:
+    """Last EMA value."""
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.shape[-1] < period:
+        return _last_or(closes, 0.0)
+    return ema_series(closes, period)[..., -1]
+
+
+def macd(closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD (12, 26, 9). Returns (macd_line, signal, histogram) for the last candle."""
+    closes = np.asarray(closes, dtype=np.float64)
+    lead = closes.shape[:-1]
+    if closes.shape[-1] < 26:
+        zero = np.zeros(lead, dtype=np.float64)
+        return zero, zero, zero
+
+    ema12 = ema_series(closes, 12)
+    ema26 = ema_series(closes, 26)
+    offset = ema12.shape[-1] - ema26.shape[-1]
+    macd_line = ema12[..., offset:] - ema26
+
+    if macd_line.shape[-1] < 9:
+        macd_val = _last_or(macd_line, 0.0)
+        return macd_val, np.zeros(lead, dtype=np.float64), macd_val
+
+    signal = ema_series(macd_line, 9)
+    macd_val = macd_line[..., -1]
+    signal_val = signal[..., -1]
+    return macd_val, signal_val, macd_val - signal_val
+
+
+def rsi_series(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI series (Wilder smoothing)."""
+    closes = np.asarray(closes, dtype=np.float64)
+    lead = closes.shape[:-1]
+    n = closes.shape[-1]
+    if n < period + 1:
+        return np.full(lead + (1,), 50.0, dtype=np.float64)
+
+    changes = closes[..., 1:] - closes[..., :-1]
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+
+    avg_gain = _seq_sum(gains[..., :period]) / period
+    avg_loss = _seq_sum(losses[..., :period]) / period
+
+    out = np.empty(lead + (n - period,), dtype=np.float64)
+    out[..., 0] = _rsi_value(avg_gain, avg_loss)
+    for i in range(period, n - 1):
+        avg_gain = (avg_gain * (period - 1) + gains[..., i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[..., i]) / period
+        out[..., i - period + 1] = _rsi_value(avg_gain, avg_loss)
+    return out
+
+
+def _rsi_value(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    """100 - 100 / (1 + RS), with RSI = 100 when there are no losses."""
+    safe_loss = np.where(avg_loss == 0, 1.0, avg_loss)
+    rs = avg_gain / safe_loss
+    return np.where(avg_loss == 0, 100.0, 100.0 - (100.0 / (1.0 + rs)))
+
+
+def rsi(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI for the last candle."""
+    return rsi_series(closes, period)[..., -1]
+
+
+def bollinger(closes: np.ndarray, period: int = 20, num_std: float = 2.0):
+    """
+    Bollinger Bands. Returns (upper, lower, mid, bandwidth) for the last candle.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.shape[-1] < period:
+        mid = _last_or(closes, 0.0)
+        return mid, mid, mid, np.zeros(closes.shape[:-1], dtype=np.float64)
+
+    window = closes[..., -period:]
+    mid = _seq_sum(window) / period
+    variance = _seq_sum((window - mid[..., None]) ** 2) / period
+    std = variance ** 0.5
+
+    upper = mid + num_std * std
+    lower = mid - num_std * std
+    safe_mid = np.where(mid != 0, mid, 1.0)
+    bandwidth = np.where(mid != 0, (upper - lower) / safe_mid, 0.0)
+    return upper, lower, mid, bandwidth
+
+
+def stochastic(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+               k_period: int = 14, d_period: int = 3):
+    """
+    Stochastic %K and %D. Returns (k_current, d_current, k_prev, d_prev).
+    Rolling high/low windows are strided views — no per-window copies.
+    """
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    closes = np.asarray(closes, dtype=np.float64)
+    lead = closes.shape[:-1]
+    if closes.shape[-1] < k_period + d_period:
+        fifty = np.full(lead, 50.0, dtype=np.float64)
+        return fifty, fifty, fifty, fifty
+
+    highest = sliding_window_view(highs, k_period, axis=-1).max(axis=-1)
+    lowest = sliding_window_view(lows, k_period, axis=-1).min(axis=-1)
+    span = highest - lowest
+    flat = span == 0
+    k_values = np.where(
+        flat, 50.0,
+        100.0 * (closes[..., k_period - 1:] - lowest) / np.where(flat, 1.0, span)
+    )
+
+    # %D = SMA of %K, summed left-to-right across the window
+    n_d = k_values.shape[-1] - d_period + 1
+    d_sum = np.zeros(lead + (n_d,), dtype=np.float64)
+    for j in range(d_period):
+        d_sum = d_sum + k_values[..., j:j + n_d]
+    d_values = d_sum / d_period
+
+    k_current = k_values[..., -1]
+    d_current = d_values[..., -1]
+    k_prev = k_values[..., -2] if k_values.shape[-1] >= 2 else k_current
+    d_prev = d_values[..., -2] if d_values.shape[-1] >= 2 else d_current
+    return k_current, d_current, k_prev, d_prev
+
+
+def divergence(closes: np.ndarray, rsi_values: np.ndarray) -> np.ndarray:
+    """
+    Two-point divergence on the last 5 candles.
+    Returns 1 (bullish), -1 (bearish) or 0 (none) per symbol.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    rsi_values = np.asarray(rsi_values, dtype=np.float64)
+    lead = closes.shape[:-1]
+    if closes.shape[-1] < 5 or rsi_values.shape[-1] < 5:
+        return np.zeros(lead, dtype=np.int64)
+
+    recent_closes = closes[..., -5:]
+    recent_rsi = rsi_values[..., -5:]
+
+    # argmin/argmax return the first occurrence, like list.index
+    idx_low_1 = np.argmin(recent_closes[..., :3], axis=-1)
+    idx_low_2 = np.argmin(recent_closes[..., 2:], axis=-1) + 2
+    idx_high_1 = np.argmax(recent_closes[..., :3], axis=-1)
+    idx_high_2 = np.argmax(recent_closes[..., 2:], axis=-1) + 2
+
+    def at(a, idx):
+        return np.take_along_axis(a, idx[..., None], axis=-1)[..., 0]
+
+    bullish = ((at(recent_closes, idx_low_2) < at(recent_closes, idx_low_1)) &
+               (at(recent_rsi, idx_low_2) > at(recent_rsi, idx_low_1)))
+    bearish = ((at(recent_closes, idx_high_2) > at(recent_closes, idx_high_1)) &
+               (at(recent_rsi, idx_high_2) < at(recent_rsi, idx_high_1)))
+
+    return np.where(bullish, 1, np.where(bearish, -1, 0)).astype(np.int64)
+
+
+# ──────────────────────────────────────────────
+# SCORING
+# ──────────────────────────────────────────────
+
+def snapshot(h1_closes: np.ndarray, m5_closes: np.ndarray,
+             m1_highs: np.ndarray, m1_lows: np.ndarray,
+             m1_closes: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute every price-independent part of the direction score.
+
+    Only rules 1 (EMA200) and 6 (Bollinger) compare against the live mid
+    price; their levels are stored so score_snapshot() can finish the score
+    in O(1) at trigger time. Keys are absent when there are too few bars.
+    """
+    snap: Dict[str, np.ndarray] = {}
+    lead = m5_closes.shape[:-1]
+    zero = np.zeros(lead, dtype=np.int64)
+    fixed_buy, fixed_sell = zero.copy(), zero.copy()
+
+    h1_n = h1_closes.shape[-1]
+    m5_n = m5_closes.shape[-1]
+    m1_n = m1_closes.shape[-1]
+
+    # 1. 200 EMA structural bias (H1) — weight: 30 (price-dependent)
+    if h1_n >= 200:
+        snap['ema200'] = ema(h1_closes, 200)
+
+    # 2. 50 EMA slope (H1) — weight: 20
+    if h1_n >= 50:
+        ema50 = ema_series(h1_closes, 50)
+        if ema50.shape[-1] >= 2:
+            slope = ema50[..., -1] - ema50[..., -2]
+            fixed_buy = fixed_buy + 20 * (slope > 0)
+            fixed_sell = fixed_sell + 20 * (slope < 0)
+
+    # 3. MACD histogram expansion (M5) — weight: 20
+    if m5_n >= 26:
+        _, _, histogram = macd(m5_closes)
+        _, _, prev_histogram = macd(m5_closes[..., :-1])
+        expanding = np.abs(histogram) > np.abs(prev_histogram)
+        fixed_buy = fixed_buy + 20 * ((histogram > 0) & expanding)
+        fixed_sell = fixed_sell + 20 * ((histogram < 0) & expanding)
+
+    # 4. RSI regime (M5) — weight: 15
+    if m5_n >= 15:
+        rsi_val = rsi(m5_closes)
+        fixed_buy = fixed_buy + 15 * (rsi_val > 60)
+        fixed_sell = fixed_sell + 15 * (rsi_val < 40)
+
+    # 5. RSI divergence (M5) — weight: 10
+    if m5_n >= 19:
+        rsi_vals = rsi_series(m5_closes)
+        if rsi_vals.shape[-1] >= 5:
+            div = divergence(m5_closes[..., -5:], rsi_vals[..., -5:])
+            fixed_buy = fixed_buy + 10 * (div == 1)
+            fixed_sell = fixed_sell + 10 * (div == -1)
+
+    # 6. Bollinger Bands expansion (M5) — weight: 10 (price-dependent)
+    if m5_n >= 20:
+        upper, lower, _, bandwidth = bollinger(m5_closes)
+        _, _, _, prev_bandwidth = bollinger(m5_closes[..., :-1])
+        snap['bb_upper'] = upper
+        snap['bb_lower'] = lower
+        snap['bb_expanding'] = bandwidth > prev_bandwidth
+
+    # 7. Stochastic crossover (M1) — weight: 5
+    if m1_n >= 17:
+        k_curr, d_curr, k_prev, d_prev = stochastic(m1_highs, m1_lows, m1_closes)
+        bull_cross = (k_prev <= d_prev) & (k_curr > d_curr) & (k_curr < 40)
+        bear_cross = (k_prev >= d_prev) & (k_curr < d_curr) & (k_curr > 60)
+        fixed_buy = fixed_buy + 5 * bull_cross
+        fixed_sell = fixed_sell + 5 * (~bull_cross & bear_cross)
+
+    snap['fixed_buy'] = fixed_buy
+    snap['fixed_sell'] = fixed_sell
+    return snap
+
+
+def score_snapshot(snap: Dict[str, np.ndarray], mid) -> Tuple[np.ndarray, np.ndarray]:
+    """Finish a snapshot against the live mid price. Returns (buy_score, sell_score)."""
+    mid = np.asarray(mid, dtype=np.float64)
+    buy = snap['fixed_buy'] + np.zeros(mid.shape, dtype=np.int64)
+    sell = snap['fixed_sell'] + np.zeros(mid.shape, dtype=np.int64)
+
+    if 'ema200' in snap:
+        buy = buy + 30 * (mid > snap['ema200'])
+        sell = sell + 30 * (mid < snap['ema200'])
+
+    if 'bb_upper' in snap:
+        at_upper = mid >= snap['bb_upper']
+        buy = buy + 10 * (snap['bb_expanding'] & at_upper)
+        sell = sell + 10 * (snap['bb_expanding'] & ~at_upper & (mid <= snap['bb_lower']))
+
+    return buy, sell
+
+
+def score(h1_closes: np.ndarray, m5_closes: np.ndarray,
+          m1_highs: np.ndarray, m1_lows: np.ndarray, m1_closes: np.ndarray,
+          mid) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Direction score for one symbol (1-D inputs) or a block of symbols
+    (2-D inputs sharing the same bar counts). Returns (buy_score, sell_score).
+    Weights and rules mirror DirectionEngine.resolve.
+    """
+    return score_snapshot(
+        snapshot(h1_closes, m5_closes, m1_highs, m1_lows, m1_closes), mid
+    )
+
+
+def snapshot_rates(h1_rates, m5_rates, m1_rates) -> Dict[str, np.ndarray]:
+    """snapshot() straight from MT5 rate arrays (zero-copy)."""
+    return snapshot(
+        column(h1_rates, 'close'),
+        column(m5_rates, 'close'),
+        column(m1_rates, 'high'),
+        column(m1_rates, 'low'),
+        column(m1_rates, 'close'),
+    )
+
+
+def score_rates(h1_rates, m5_rates, m1_rates, ask: float, bid: float) -> Tuple[int, int]:
+    """Score a single symbol straight from MT5 rate arrays (zero-copy)."""
+    buy, sell = score_snapshot(snapshot_rates(h1_rates, m5_rates, m1_rates), (ask + bid) / 2)
+    return int(buy), int(sell)
+
+
+def score_many(rate_sets: Dict[str, Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray]]],
+               quotes: Dict[str, Tuple[float, float]]) -> Dict[str, Tuple[int, int]]:
+    """
+    Score many symbols at once.
+
+    rate_sets: symbol -> (h1_rates, m5_rates, m1_rates)
+    quotes:    symbol -> (ask, bid)
+
+    Symbols with identical bar counts are stacked into one (symbols, bars)
+    block and scored together; the result maps symbol -> (buy, sell).
+    """
+    groups: Dict[Tuple[int, int, int], list] = {}
+    for symbol, (h1, m5, m1) in rate_sets.items():
+        if symbol not in quotes:
+            continue
+        key = tuple(0 if r is None else len(r) for r in (h1, m5, m1))
+        groups.setdefault(key, []).append(symbol)
+
+    results: Dict[str, Tuple[int, int]] = {}
+    for symbols in groups.values():
+        def stack(idx: int, name: str) -> np.ndarray:
+            return np.stack([column(rate_sets[s][idx], name) for s in symbols])
+
+        mids = np.array([(quotes[s][0] + quotes[s][1]) / 2 for s in symbols])
+        buy, sell = score(
+            stack(0, 'close'),
+            stack(1, 'close'),
+            stack(2, 'high'),
+            stack(2, 'low'),
+            stack(2, 'close'),
+            mids,
+        )
+        for i, symbol in enumerate(symbols):
+            results[symbol] = (int(buy[i]), int(sell[i]))
+    return results
+
+
+def direction_from_score(buy_score: int, sell_score: int) -> str:
+    """Ties resolve to 'buy'."""
+    return 'buy' if buy_score >= sell_score else 'sell'
+
+
+def verify_against_reference(engine, h1_rates, m5_rates, m1_rates,
+                             ask: float, bid: float, rtol: float = 0.0,
+                             python_floats: bool = False) -> Dict[str, bool]:
+    """
+    Compare every vectorized indicator with the pure-Python reference
+    methods on a DirectionEngine instance. Returns name -> match: exact by
+    default, within `rtol` (relative and absolute) when given.
+    The reference gets NumPy float64 elements, as from the rates arrays,
+    or plain Python floats with python_floats=True (see module docstring).
+    """
+    h1 = column(h1_rates, 'close')
+    m5 = column(m5_rates, 'close')
+    m1_h, m1_l, m1_c = (column(m1_rates, n) for n in ('high', 'low', 'close'))
+    to_list = (lambda a: a.tolist()) if python_floats else list
+    h1_list, m5_list = to_list(h1), to_list(m5)
+
+    def same(a, b) -> bool:
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        if rtol:
+            return a.shape == b.shape and np.allclose(a, b, rtol=rtol, atol=rtol)
+        return np.array_equal(a, b)
+
+    checks = {
+        'ema200': same(ema(h1, 200), engine._ema(h1_list, 200)),
+        'ema50_series': same(ema_series(h1, 50), engine._ema_series(h1_list, 50)),
+        'macd': same(macd(m5), engine._macd(m5_list)),
+        'rsi': same(rsi(m5), engine._rsi(m5_list)),
+        'rsi_series': same(rsi_series(m5), engine._rsi_series(m5_list)),
+        'bollinger': same(bollinger(m5), engine._bollinger(m5_list)),
+        'stochastic': same(stochastic(m1_h, m1_l, m1_c),
+                           engine._stochastic(to_list(m1_h), to_list(m1_l), to_list(m1_c))),
+    }
+    ref_div = engine._divergence(m5_list[-5:], engine._rsi_series(m5_list)[-5:])
+    vec_div = int(divergence(m5[-5:], rsi_series(m5)[-5:]))
+    checks['divergence'] = {'bullish': 1, 'bearish': -1, None: 0}[ref_div] == vec_div
+    return checks
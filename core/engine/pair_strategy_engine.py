@@ -12,7 +12,8 @@ Implements the paired-position trading strategy:
 6. All positions closed: auto-restart cycle (or stop if graceful)
 """
 
-from dataclasses import dataclass, field, asdict
+from collections import deque
+from dataclasses import dataclass, field, asdict, fields, replace
 from typing import Dict, Optional, Tuple
 import asyncio
 import json
@@ -67,6 +68,36 @@ class StrategyState:
     cycle_count: int = 0
 
 
+@dataclass(frozen=True)
+class StrategyParams:
+    """
+    Precomputed, immutable strategy parameters for one symbol.
+    Swapped as a whole, so the engine never sees a half-applied update.
+    """
+    pip_size: float = 0.0001
+    grid_distance: float = 50.0
+    bx_lot: float = 0.01
+    sy_lot: float = 0.01
+    sx_lot: float = 0.01
+    by_lot: float = 0.01
+    single_fire_lot: float = 0.01
+    single_fire_tp_pips: float = 150.0
+    single_fire_sl_pips: float = 200.0
+    protection_distance: float = 100.0
+    single_fire_prefetch_fraction: float = 0.25
+
+    # Fields that may change mid-cycle; everything else waits for the cycle boundary
+    LIVE_FIELDS = ("single_fire_prefetch_fraction",)
+
+    @classmethod
+    def from_config(cls, cfg: dict, pip_size: float) -> "StrategyParams":
+        values = {f.name: float(cfg.get(f.name, f.default)) for f in fields(cls) if f.name != "pip_size"}
+        return cls(pip_size=float(pip_size), **values)
+
+    def cycle_fields(self) -> tuple:
+        return tuple(getattr(self, f.name) for f in fields(self) if f.name not in self.LIVE_FIELDS)
+
+
 class PairStrategyEngine:
     """
     Main strategy engine for a single symbol.
@@ -75,6 +106,17 @@ class PairStrategyEngine:
     """
 
     MAGIC_NUMBER = 123456
+    QUOTE_MAX_AGE = 1.0  # seconds a tick-loop quote may serve current_price
+    # Without a fresh tick-loop quote (bot stopped), current_price asks MT5
+    # at most this often per symbol, shared by every user's strategy
+    LIVE_QUOTE_INTERVAL = 1.0
+    _live_quotes: Dict[str, Tuple[float, float]] = {}  # symbol -> (monotonic time, mid)
+
+    @classmethod
+    def managed_positions(cls, symbol: str) -> list:
+        """Open positions on `symbol` placed by this strategy (MAGIC_NUMBER)."""
+        positions = mt5.positions_get(symbol=symbol)
+        return [p for p in positions or () if getattr(p, "magic", None) == cls.MAGIC_NUMBER]
 
     def __init__(self, config_manager, symbol: str, user_id: str = "default", session_logger=None):
         self.config_manager = config_manager
@@ -101,12 +143,36 @@ class PairStrategyEngine:
         # Persistence
         self.db_path = f"db/pair_strategy_{user_id}.db"
 
-        # pip_size cache
-        self.pip_size = self.config_manager.get_pip_size(self.symbol)
+        # Strategy parameters (replaced by reload_params; cycle-critical
+        # changes wait in _pending_params until the next cycle boundary)
+        self.params = self._load_params()
+        self._pending_params: Optional[StrategyParams] = None
 
         # Direction scoring engine for single fire
         self.direction_engine = DirectionEngine(self.symbol)
-        
+
+        # Speculative single fire direction (prepared as price nears the trigger)
+        self._direction_snapshot: Optional[dict] = None
+        self._direction_snapshot_bar: int = 0  # Open time of the newest M1 candle the snapshot saw
+        self._direction_task: Optional[asyncio.Task] = None
+        self._tick_time: int = 0  # Server time of the latest tick (seconds)
+        self._last_order_sent_at: float = 0.0
+
+        # Last quote from the tick loop (mid, monotonic time) for status reads
+        self._last_mid: float = 0.0
+        self._last_mid_at: float = 0.0
+
+        # Versioned status snapshot (rebuilt only when state actually changes)
+        self.status_version = 0
+        self._status_fingerprint: Optional[tuple] = None
+        self._status_snapshot: Optional[dict] = None
+
+        # Trigger-to-order latency (ms), split by how the direction was obtained
+        self.single_fire_latency: Dict[str, deque] = {
+            "speculative": deque(maxlen=100),
+            "sync": deque(maxlen=100),
+        }
+
     def _get_filling_mode(self):
         """
         Get appropriate filling mode for the symbol.
@@ -140,41 +206,79 @@ class PairStrategyEngine:
         """Get symbol-specific config"""
         return self.config_manager.get_symbol_config(self.symbol) or {}
 
+    def _load_params(self) -> StrategyParams:
+        return StrategyParams.from_config(self.config, self.config_manager.get_pip_size(self.symbol))
+
+    def reload_params(self) -> bool:
+        """
+        Rebuild parameters from the config. Live fields apply now; if a
+        cycle-critical field changed while running, the new parameters are
+        queued for the next cycle. Returns True if anything was deferred.
+        """
+        new = self._load_params()
+        if new.cycle_fields() == self.params.cycle_fields() or not self.running:
+            self.params = new
+            self._pending_params = None
+            return False
+
+        live = {name: getattr(new, name) for name in StrategyParams.LIVE_FIELDS}
+        self.params = replace(self.params, **live)
+        self._pending_params = new
+        print(f"[CONFIG] {self.symbol}: Parameter change queued for the next cycle")
+        self.activity_log.log_info("Config change queued until the next cycle")
+        return True
+
+    def _apply_pending_params(self):
+        """Cycle boundary: switch to any queued parameters."""
+        if self._pending_params is not None:
+            self.params = self._pending_params
+            self._pending_params = None
+            self.activity_log.log_info(f"Queued config applied for cycle {self.state.cycle_count}")
+
+    @property
+    def pip_size(self) -> float:
+        return self.params.pip_size
+
     @property
     def grid_distance(self) -> float:
-        return float(self.config.get('grid_distance', 50.0))
+        return self.params.grid_distance
 
     @property
     def bx_lot(self) -> float:
-        return float(self.config.get('bx_lot', 0.01))
+        return self.params.bx_lot
 
     @property
     def sy_lot(self) -> float:
-        return float(self.config.get('sy_lot', 0.01))
+        return self.params.sy_lot
 
     @property
     def sx_lot(self) -> float:
-        return float(self.config.get('sx_lot', 0.01))
+        return self.params.sx_lot
 
     @property
     def by_lot(self) -> float:
-        return float(self.config.get('by_lot', 0.01))
+        return self.params.by_lot
 
     @property
     def single_fire_lot(self) -> float:
-        return float(self.config.get('single_fire_lot', 0.01))
+        return self.params.single_fire_lot
 
     @property
     def single_fire_tp_pips(self) -> float:
-        return float(self.config.get('single_fire_tp_pips', 150.0))
+        return self.params.single_fire_tp_pips
 
     @property
     def single_fire_sl_pips(self) -> float:
-        return float(self.config.get('single_fire_sl_pips', 200.0))
+        return self.params.single_fire_sl_pips
 
     @property
     def protection_distance(self) -> float:
-        return float(self.config.get('protection_distance', 100.0))
+        return self.params.protection_distance
+
+    @property
+    def single_fire_prefetch_fraction(self) -> float:
+        """Start resolving direction once remaining distance <= this fraction of the trigger distance."""
+        return self.params.single_fire_prefetch_fraction
 
     # ========================
     # LIFECYCLE
@@ -189,6 +293,7 @@ class PairStrategyEngine:
 
         self.running = True
         self.graceful_stop = False
+        self._apply_pending_params()
 
         # Ensure symbol is selected in Market Watch
         if not mt5.symbol_select(self.symbol, True):
@@ -306,6 +411,10 @@ class PairStrategyEngine:
         if ask <= 0 or bid <= 0:
             return
 
+        self._last_mid = (ask + bid) / 2
+        self._last_mid_at = time.monotonic()
+        self._tick_time = tick_data.get('time', 0)
+
         async with self.execution_lock:
             # 1. Update touch flags FIRST
             self._update_touch_flags(ask, bid)
@@ -327,6 +436,9 @@ class PairStrategyEngine:
             if self.state.phase == "AWAITING_SECOND":
                 await self._handle_awaiting_second(ask, bid)
 
+        # Refresh the cached status from this tick's state
+        self._refresh_status()
+
     # ========================
     # PHASE HANDLERS
     # ========================
@@ -489,6 +601,7 @@ class PairStrategyEngine:
                         request["tp"] = check_price - min_dist
 
         # Send order
+        self._last_order_sent_at = time.perf_counter()
         result = mt5.order_send(request)
 
         if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
@@ -703,10 +816,13 @@ class PairStrategyEngine:
         if not self.state.second_fire_price:
             return
 
+        self._maybe_prefetch_direction(ask, bid)
+
         if self.state.location == "DOWN":
             # Single fire trigger: bid falls to/below trigger -> direction from scoring engine
             if bid <= self.state.single_fire_trigger_price:
-                direction = self.direction_engine.resolve(ask, bid)
+                trigger_t0 = time.perf_counter()
+                direction, source = await self._resolve_single_fire_direction(ask, bid)
                 print(f"[MATH-TRIGGER] {self.symbol}: Single fire {direction.upper()} triggered "
                       f"(bid {bid:.5f} <= {self.state.single_fire_trigger_price:.5f})")
                 self.activity_log.log_info(
@@ -714,6 +830,7 @@ class PairStrategyEngine:
                 )
                 self.state.single_fire_executed = True
                 await self._execute_single_fire(bid, direction)
+                self._record_trigger_latency(source, trigger_t0)
                 # Force-close Pair X (Bx + Sx) - broker spread may have prevented TP/SL
                 await self._force_close_pair("X")
                 return
@@ -731,7 +848,8 @@ class PairStrategyEngine:
         elif self.state.location == "UP":
             # Single fire trigger: ask rises to/above trigger -> direction from scoring engine
             if ask >= self.state.single_fire_trigger_price:
-                direction = self.direction_engine.resolve(ask, bid)
+                trigger_t0 = time.perf_counter()
+                direction, source = await self._resolve_single_fire_direction(ask, bid)
                 print(f"[MATH-TRIGGER] {self.symbol}: Single fire {direction.upper()} triggered "
                       f"(ask {ask:.5f} >= {self.state.single_fire_trigger_price:.5f})")
                 self.activity_log.log_info(
@@ -739,6 +857,7 @@ class PairStrategyEngine:
                 )
                 self.state.single_fire_executed = True
                 await self._execute_single_fire(ask, direction)
+                self._record_trigger_latency(source, trigger_t0)
                 # Force-close Pair Y (By + Sy) - broker spread may have prevented TP/SL
                 await self._force_close_pair("Y")
                 return
@@ -753,6 +872,92 @@ class PairStrategyEngine:
                 await self._nuclear_reset_and_restart("PROTECTION_DISTANCE", self.state.realized_pnl)
                 return
 
+    # ========================
+    # SPECULATIVE DIRECTION
+    # ========================
+
+    def _current_m1_bar(self) -> int:
+        """Open time of the M1 bar the latest tick belongs to (local clock if unknown)."""
+        tick_time = int(self._tick_time or time.time())
+        return tick_time - tick_time % 60
+
+    def _maybe_prefetch_direction(self, ask: float, bid: float):
+        """
+        Start preparing the single fire direction in the background once price
+        is within single_fire_prefetch_fraction of the trigger distance.
+        Re-prepares whenever the ticks move past the snapshot's M1 bar.
+        """
+        total = 3 * self.grid_distance * self.pip_size
+        if self.state.location == "DOWN":
+            remaining = bid - self.state.single_fire_trigger_price
+        else:
+            remaining = self.state.single_fire_trigger_price - ask
+
+        if remaining > self.single_fire_prefetch_fraction * total:
+            return
+
+        if self._direction_snapshot is not None and self._direction_snapshot_bar >= self._current_m1_bar():
+            return
+        if self._direction_task and not self._direction_task.done():
+            return
+
+        self._direction_task = asyncio.create_task(self._prefetch_direction())
+
+    async def _prefetch_direction(self):
+        """Fetch candles (shared cache) and compute the indicator snapshot off-loop."""
+        cycle = self.state.cycle_count
+        try:
+            candles = self.direction_engine.fetch_candles()
+            m1 = candles[2]
+            bar = int(m1['time'][-1]) if m1 is not None and len(m1) else 0
+            snap = await asyncio.to_thread(DirectionEngine.prepare, candles)
+        except Exception as e:
+            logger.error(f"[{self.symbol}] Direction prefetch failed: {e}")
+            return
+
+        # Discard if the cycle moved on while we were computing
+        if cycle != self.state.cycle_count or self.state.single_fire_executed:
+            return
+
+        self._direction_snapshot = snap
+        self._direction_snapshot_bar = bar
+
+    async def _resolve_single_fire_direction(self, ask: float, bid: float) -> Tuple[str, str]:
+        """
+        Resolve single fire direction, preferring the speculative snapshot.
+        The snapshot is only used if it was built from the triggering tick's
+        M1 bar; once a newer bar has opened its candles are stale, so the
+        direction is resolved synchronously on the current candles instead.
+        Returns (direction, source) where source is 'speculative' or 'sync'.
+        """
+        if self._direction_task and not self._direction_task.done():
+            # Already in flight — finishing it is cheaper than starting over
+            await asyncio.wait({self._direction_task})
+
+        if self._direction_snapshot is not None and self._direction_snapshot_bar >= self._current_m1_bar():
+            return self.direction_engine.resolve_snapshot(self._direction_snapshot, ask, bid), "speculative"
+
+        return self.direction_engine.resolve(ask, bid), "sync"
+
+    def _record_trigger_latency(self, source: str, trigger_t0: float):
+        """Record trigger-to-order latency for the single fire."""
+        if self._last_order_sent_at < trigger_t0:
+            return  # Order was never sent (e.g. no tick)
+        latency_ms = (self._last_order_sent_at - trigger_t0) * 1000
+        self.single_fire_latency[source].append(latency_ms)
+        print(f"[LATENCY] {self.symbol}: Single fire trigger->order {latency_ms:.2f} ms ({source})")
+
+    def get_single_fire_latency(self) -> dict:
+        """Summary of trigger-to-order latency per direction source."""
+        summary = {}
+        for source, samples in self.single_fire_latency.items():
+            summary[source] = {
+                "count": len(samples),
+                "last_ms": samples[-1] if samples else None,
+                "avg_ms": sum(samples) / len(samples) if samples else None,
+            }
+        return summary
+
     async def _force_close_pair(self, pair: str):
         """
         Force-close all positions in a pair (X or Y).
@@ -1031,6 +1236,14 @@ class PairStrategyEngine:
         self.state.cycle_count = cycle
         self.ticket_map.clear()
         self.ticket_touch_flags.clear()
+        self._apply_pending_params()
+
+        # Drop any speculative direction from the finished cycle
+        if self._direction_task and not self._direction_task.done():
+            self._direction_task.cancel()
+        self._direction_task = None
+        self._direction_snapshot = None
+        self._direction_snapshot_bar = 0
 
     # ========================
     # HELPERS
@@ -1091,18 +1304,50 @@ class PairStrategyEngine:
 
     @property
     def current_price(self) -> float:
-        """Get current price for the symbol"""
+        """Get current price for the symbol (cached tick-loop quote when fresh)"""
+        now = time.monotonic()
+        if now - self._last_mid_at < self.QUOTE_MAX_AGE:
+            return self._last_mid
+        cached = self._live_quotes.get(self.symbol)
+        if cached is not None and now - cached[0] < self.LIVE_QUOTE_INTERVAL:
+            return cached[1]
         tick = mt5.symbol_info_tick(self.symbol)
-        if tick:
-            return (tick.ask + tick.bid) / 2
-        return 0.0
+        mid = (tick.ask + tick.bid) / 2 if tick else 0.0
+        self._live_quotes[self.symbol] = (now, mid)
+        return mid
 
     async def start_ticker(self):
         """Called when config updates. Re-sync strategy."""
         pass  # No special handling needed for pair strategy
 
+    def _refresh_status(self) -> int:
+        """
+        Rebuild the status snapshot if anything it depends on changed.
+        The fingerprint is a flat tuple, so the unchanged case costs no dict
+        building. Returns the (monotonic) status version.
+        """
+        fingerprint = (
+            self.running,
+            self.graceful_stop,
+            self._last_order_sent_at,  # Moves whenever latency samples do
+            self._pending_params is not None,
+            *vars(self.state).values(),
+        )
+        if fingerprint != self._status_fingerprint:
+            self._status_fingerprint = fingerprint
+            self._status_snapshot = self._build_status()
+            self.status_version += 1
+        return self.status_version
+
     def get_status(self) -> dict:
-        """Return status dict for API polling."""
+        """
+        Return status dict for API polling.
+        The dict is a shared cached snapshot — callers must not mutate it.
+        """
+        self._refresh_status()
+        return self._status_snapshot
+
+    def _build_status(self) -> dict:
         open_count = len(self._get_open_positions_from_state())
 
         return {
@@ -1118,7 +1363,9 @@ class PairStrategyEngine:
             "open_positions": open_count,
             "realized_pnl": self.state.realized_pnl,
             "graceful_stop": self.graceful_stop,
+            "config_pending": self._pending_params is not None,
             "is_resetting": self.state.phase == "RESETTING",
+            "single_fire_latency": self.get_single_fire_latency(),
             "step": self.state.cycle_count,
             "iteration": self.state.cycle_count,
             "positions": {
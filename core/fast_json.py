@@ -0,0 +1,27 @@
+"""
+Fast JSON Encoding
+
+orjson-backed dumps() for hot API responses (status, config, listings),
+falling back to the stdlib encoder when orjson is not installed. Output is
+compact UTF-8 bytes either way, so callers can cache it as-is.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib fallback
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def backend() -> str:
+    return "orjson" if orjson is not None else "json"
@@ -0,0 +1,253 @@
+"""
+Offline JWT Verification
+
+Verifies Supabase access tokens locally (signature, expiry, audience)
+instead of calling supabase.auth.get_user on every cache miss.
+
+- HS256 tokens are checked against the project JWT secret
+  (SUPABASE_JWT_SECRET); RS256/ES256 tokens against the project's JWKS,
+  fetched once and refreshed only when an unknown `kid` shows up
+- Verified claims are cached (LRU, AUTH_CACHE_SIZE entries) until the token
+  expires; hits and misses are counted
+- Revocation is checked in the background: the first time a token is seen
+  (and every REVALIDATE_INTERVAL after) `revalidate(token)` runs in a worker
+  thread; a token it reports as revoked is rejected from then on
+- Tokens it has no key source for (or without PyJWT) are left to the
+  caller's remote check; see can_verify()
+- The cache and revocation set are guarded by a lock, so verify() is safe
+  from any thread; authenticate() only moves the JWKS fetch off the loop
+
+Keys, the JWKS fetcher and the revalidation hook are constructor arguments,
+so the verifier works with locally generated keys.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set
+
+try:
+    import jwt
+except ImportError:  # Optional: fall back to remote verification
+    jwt = None
+
+HMAC_ALGORITHMS = ("HS256",)
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+
+class TokenVerifier:
+    """Local JWT verification with a claims cache and background revocation."""
+
+    JWKS_REFRESH_MIN_INTERVAL = 60.0   # Don't refetch JWKS more often (unknown kid spam)
+    REVALIDATE_INTERVAL = 300.0        # Remote revocation check per token
+    LEEWAY = 5                         # Seconds of clock skew tolerated
+
+    def __init__(self, secret: Optional[str] = None, jwks_fetcher: Optional[Callable[[], dict]] = None,
+                 audience: Optional[str] = "authenticated", cache_size: int = 1000,
+                 revalidate: Optional[Callable[[str], Optional[bool]]] = None):
+        self.secret = secret
+        self.jwks_fetcher = jwks_fetcher
+        self.audience = audience
+        self.cache_size = cache_size
+        self.revalidate = revalidate
+
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (user_id, exp)
+        self._keys: Dict[str, object] = {}  # kid -> public key
+        self._jwks_fetched_at = 0.0
+        self._revoked: Set[str] = set()
+        self._revalidated_at: Dict[str, float] = {}
+        self._revalidating: Set[str] = set()
+        self._lock = threading.Lock()       # Cache, revoked set, stats
+        self._jwks_lock = threading.Lock()  # One JWKS fetch at a time
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "verified": 0,
+            "rejected": 0,
+            "revoked": 0,
+            "jwks_fetches": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return jwt is not None and (self.secret is not None or self.jwks_fetcher is not None)
+
+    def can_verify(self, token: str) -> bool:
+        """True if this token's algorithm has a local key source."""
+        if not self.enabled:
+            return False
+        try:
+            alg = jwt.get_unverified_header(token).get("alg")
+        except jwt.PyJWTError:
+            return False
+        if alg in HMAC_ALGORITHMS:
+            return self.secret is not None
+        return alg in ASYMMETRIC_ALGORITHMS and self.jwks_fetcher is not None
+
+    # ========================
+    # VERIFICATION
+    # ========================
+
+    def verify(self, token: str) -> Optional[str]:
+        """
+        User id (`sub`) for a valid token, or None. CPU only, except the
+        rare JWKS refresh for an unknown key id.
+        """
+        with self._lock:
+            if token in self._revoked:
+                self.stats["rejected"] += 1
+                return None
+
+            cached = self._cache.get(token)
+            if cached is not None:
+                if cached[1] > time.time():
+                    self._cache.move_to_end(token)
+                    self.stats["hits"] += 1
+                    return cached[0]
+                del self._cache[token]
+            self.stats["misses"] += 1
+
+        claims = self._decode(token)  # Outside the lock: CPU (and maybe a JWKS fetch)
+        with self._lock:
+            if claims is None or not claims.get("sub") or token in self._revoked:
+                self.stats["rejected"] += 1
+                return None
+
+            self.stats["verified"] += 1
+            self._cache[token] = (claims["sub"], claims.get("exp", float("inf")))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return claims["sub"]
+
+    async def authenticate(self, token: str) -> Optional[str]:
+        """
+        verify() for the event loop: only a JWKS refresh (unknown kid) is
+        moved to a worker thread; cache and verification stay on the loop.
+        Valid tokens get a background revocation check.
+        """
+        kid = self._missing_kid(token)
+        if kid is not None:
+            await asyncio.to_thread(self._public_key, kid)
+        user_id = self.verify(token)
+        if user_id is not None:
+            self.schedule_revalidation(token)
+        return user_id
+
+    def _missing_kid(self, token: str) -> Optional[str]:
+        """The key id of an asymmetric token whose key is not loaded yet (else None)."""
+        if token in self._cache:
+            return None
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError:
+            return None
+        if header.get("alg") in ASYMMETRIC_ALGORITHMS and header.get("kid") not in self._keys:
+            return header.get("kid")
+        return None
+
+    def _decode(self, token: str) -> Optional[dict]:
+        try:
+            header = jwt.get_unverified_header(token)
+            alg = header.get("alg")
+            if alg in HMAC_ALGORITHMS and self.secret:
+                key = self.secret
+            elif alg in ASYMMETRIC_ALGORITHMS:
+                key = self._public_key(header.get("kid"))
+                if key is None:
+                    return None
+            else:
+                return None
+            return jwt.decode(
+                token, key, algorithms=[alg], audience=self.audience,
+                leeway=self.LEEWAY, options={"require": ["exp", "sub"], "verify_aud": self.audience is not None},
+            )
+        except jwt.PyJWTError as e:
+            print(f"[AUTH] Token rejected: {e}")
+            return None
+
+    def _public_key(self, kid: Optional[str]):
+        key = self._keys.get(kid)
+        if key is None and self.jwks_fetcher is not None:
+            with self._jwks_lock:
+                key = self._keys.get(kid)  # Another thread may have just fetched it
+                if key is None and time.time() - self._jwks_fetched_at >= self.JWKS_REFRESH_MIN_INTERVAL:
+                    self.load_jwks(self.jwks_fetcher())
+                    key = self._keys.get(kid)
+        return key
+
+    def load_jwks(self, jwks: dict):
+        """Replace the signing keys from a JWKS document."""
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            try:
+                keys[jwk.get("kid")] = jwt.PyJWK.from_dict(jwk).key
+            except jwt.PyJWTError as e:
+                print(f"[AUTH] Skipping JWKS key {jwk.get('kid')}: {e}")
+        with self._lock:
+            self._keys = keys  # Swapped whole; readers never see a partial dict
+            self._jwks_fetched_at = time.time()
+            self.stats["jwks_fetches"] += 1
+
+    # ========================
+    # BACKGROUND REVOCATION
+    # ========================
+
+    def schedule_revalidation(self, token: str):
+        """Kick off a remote revocation check for `token` if one is due."""
+        if self.revalidate is None or token in self._revalidating:
+            return
+        if time.time() - self._revalidated_at.get(token, 0.0) < self.REVALIDATE_INTERVAL:
+            return
+        self._revalidating.add(token)
+        asyncio.create_task(self._revalidate(token))
+
+    async def _revalidate(self, token: str):
+        try:
+            valid = await asyncio.to_thread(self.revalidate, token)
+            self._revalidated_at[token] = time.time()
+            if valid is False:
+                self.revoke(token)
+        except Exception as e:
+            print(f"[AUTH] Background revalidation failed: {e}")
+        finally:
+            self._revalidating.discard(token)
+            # Forget tokens that have left the cache
+            if len(self._revalidated_at) > 2 * self.cache_size:
+                with self._lock:
+                    cached = set(self._cache)
+                for t in [t for t in self._revalidated_at if t not in cached]:
+                    del self._revalidated_at[t]
+
+    def revoke(self, token: str):
+        """Reject `token` from now on."""
+        with self._lock:
+            self._cache.pop(token, None)
+            if token not in self._revoked:
+                self._revoked.add(token)
+                self.stats["revoked"] += 1
+                print("[AUTH] Token revoked by background check")
+            # Revoked tokens only need remembering while they could still verify
+            now = time.time()
+            if len(self._revoked) > self.cache_size:
+                self._revoked = {t for t in self._revoked if self._token_exp(t) > now}
+
+    @staticmethod
+    def _token_exp(token: str) -> float:
+        try:
+            return float(jwt.decode(token, options={"verify_signature": False}).get("exp", 0))
+        except jwt.PyJWTError:
+            return 0.0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            cached = len(self._cache)
+        total = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "enabled": self.enabled,
+            "cache_size": self.cache_size,
+            "cached": cached,
+            "hit_rate": stats["hits"] / total if total else 0.0,
+        }
@@ -0,0 +1,156 @@
+"""
+Log Directory Index
+
+In-memory index of the files in each log directory, so history listings do
+not glob and stat() every file on every request.
+
+- A directory is scanned once, on its first listing
+- The LogWriter reports every write (new files, sizes) and rotation, so the
+  index follows the loggers without touching disk
+- Each listing still stats the directory itself; if its mtime moved for a
+  reason the writer did not report (files added/removed externally, or
+  written before a restart) the directory is rescanned
+- Filtered/sorted listings are cached until the set of files changes;
+  mtime-sorted ones also when a write makes a different file the newest
+
+Nothing is persisted: after a restart the first listing rescans the disk.
+"""
+
+import fnmatch
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+class _DirEntry:
+    __slots__ = ("files", "dir_mtime", "version", "order_version", "newest", "listings")
+
+    def __init__(self):
+        self.files: Dict[str, List[float]] = {}  # name -> [size, mtime]
+        self.dir_mtime = 0
+        self.version = 0        # Bumped when the set of files changes
+        self.order_version = 0  # Bumped when the mtime order changes
+        self.newest = None      # Most recently modified file
+        self.listings: Dict[Tuple, Tuple[Tuple[int, int], List[str]]] = {}  # key -> (versions, names)
+
+
+class LogIndex:
+    """Per-directory file index shared by all users' history endpoints."""
+
+    def __init__(self):
+        self._dirs: Dict[str, _DirEntry] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "scans": 0,
+            "listings": 0,
+            "cached_listings": 0,
+        }
+
+    # ========================
+    # WRITER NOTIFICATIONS (log writer thread)
+    # ========================
+
+    def on_write(self, path: str, size: int):
+        """A file in an indexed directory was appended to (or created)."""
+        directory, name = os.path.split(os.path.abspath(path))
+        with self._lock:
+            entry = self._dirs.get(directory)
+            if entry is None:
+                return  # Not listed yet; scanned on first listing
+            info = entry.files.get(name)
+            if info is None:
+                entry.files[name] = [size, time.time()]
+                entry.version += 1
+                self._sync_dir_mtime(directory, entry)
+            else:
+                info[0] = size
+                info[1] = time.time()
+            if entry.newest != name:
+                # This file just became the newest; mtime listings must re-sort
+                entry.newest = name
+                entry.order_version += 1
+
+    def on_rotate(self, path: str):
+        """Backups were renamed; rescan the directory on next listing."""
+        with self._lock:
+            self._dirs.pop(os.path.dirname(os.path.abspath(path)), None)
+
+    def _sync_dir_mtime(self, directory: str, entry: _DirEntry):
+        # Our own file creation moved the directory mtime; don't rescan for it
+        try:
+            entry.dir_mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            pass
+
+    # ========================
+    # LISTINGS
+    # ========================
+
+    def _scan(self, directory: str, dir_mtime: int) -> _DirEntry:
+        entry = _DirEntry()
+        with os.scandir(directory) as it:
+            for de in it:
+                if de.is_file():
+                    st = de.stat()
+                    entry.files[de.name] = [st.st_size, st.st_mtime]
+        entry.dir_mtime = dir_mtime
+        if entry.files:
+            entry.newest = max(entry.files, key=lambda n: entry.files[n][1])
+        self.stats["scans"] += 1
+        return entry
+
+    def list(self, directory, patterns: Tuple[str, ...], sort: str = "mtime") -> List[dict]:
+        """
+        Files in `directory` matching any of `patterns`, newest first
+        (sort="mtime") or by name descending (sort="name").
+        Each item: {"name", "stem", "path", "size", "modified"}.
+        """
+        directory = os.path.abspath(directory)
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return []
+
+        with self._lock:
+            entry = self._dirs.get(directory)
+            if entry is None or entry.dir_mtime != dir_mtime:
+                entry = self._scan(directory, dir_mtime)
+                self._dirs[directory] = entry
+
+            self.stats["listings"] += 1
+            key = (patterns, sort)
+            versions = (entry.version, entry.order_version if sort == "mtime" else 0)
+            cached = entry.listings.get(key)
+            if cached is not None and cached[0] == versions:
+                self.stats["cached_listings"] += 1
+                names = cached[1]
+            else:
+                names = [n for n in entry.files if any(fnmatch.fnmatch(n, p) for p in patterns)]
+                if sort == "name":
+                    names.sort(reverse=True)
+                else:
+                    names.sort(key=lambda n: entry.files[n][1], reverse=True)
+                entry.listings[key] = (versions, names)
+
+            return [
+                {
+                    "name": name,
+                    "stem": Path(name).stem,
+                    "path": os.path.join(directory, name),
+                    "size": entry.files[name][0],
+                    "modified": entry.files[name][1],
+                }
+                for name in names
+            ]
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "directories": len(self._dirs),
+        }
+
+
+# Global singleton instance (updated by the LogWriter thread)
+log_index = LogIndex()
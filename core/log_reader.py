@@ -0,0 +1,116 @@
+"""
+Bounded-Memory Log Reader
+
+Helpers for serving large text logs without loading them into memory:
+find the start of the last N lines by reading backwards from EOF, advance
+N lines from a byte offset, and iterate a byte range in fixed-size chunks
+(optionally gzip-compressed on the fly).
+
+All functions do blocking file I/O; they are meant to run in a worker
+thread (Starlette iterates sync generators in its threadpool).
+"""
+
+import os
+import zlib
+from typing import Iterator, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+def tail_offset(path, lines: int, size: Optional[int] = None) -> int:
+    """Byte offset where the last `lines` lines of the file begin."""
+    if size is None:
+        size = os.path.getsize(path)
+    if lines <= 0 or size == 0:
+        return size
+
+    with open(path, "rb") as f:
+        # A trailing newline terminates the last line, it does not start a new one
+        f.seek(size - 1)
+        pos = size - 1 if f.read(1) == b"\n" else size
+        newlines = 0
+        while pos > 0:
+            read = min(CHUNK_SIZE, pos)
+            pos -= read
+            f.seek(pos)
+            block = f.read(read)
+            i = len(block)
+            while True:
+                i = block.rfind(b"\n", 0, i)
+                if i < 0:
+                    break
+                newlines += 1
+                if newlines == lines:
+                    return pos + i + 1
+    return 0
+
+
+def advance_lines(path, offset: int, lines: int, size: Optional[int] = None) -> int:
+    """Byte offset just after `lines` lines starting at `offset` (or EOF)."""
+    if size is None:
+        size = os.path.getsize(path)
+    if lines <= 0:
+        return offset
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        pos = offset
+        while pos < size:
+            block = f.read(min(CHUNK_SIZE, size - pos))
+            if not block:
+                break
+            i = -1
+            while True:
+                i = block.find(b"\n", i + 1)
+                if i < 0:
+                    break
+                lines -= 1
+                if lines == 0:
+                    return pos + i + 1
+            pos += len(block)
+    return size
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `bytes=` header into (start, end_exclusive).
+    Returns None if the header is malformed or unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                return None
+            return max(0, size - suffix), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if start >= size or end <= start:
+        return None
+    return start, min(end, size)
+
+
+def iter_range(path, start: int, end: int, gzip: bool = False) -> Iterator[bytes]:
+    """Yield bytes [start, end) of the file in CHUNK_SIZE pieces."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(CHUNK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            if compressor is None:
+                yield block
+            else:
+                out = compressor.compress(block)
+                if out:
+                    yield out
+    if compressor is not None:
+        yield compressor.flush()
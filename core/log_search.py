@@ -0,0 +1,261 @@
+"""
+Log Full-Text Search
+
+Inverted index over the text logs in a user's sessions directory
+(logs/users/{user_id}/sessions/*), so /history/search can find a ticket,
+leg, cycle or reason without shipping whole files to the browser.
+
+- Tokens are lowercased runs of letters, digits, '_' and '.', so tickets
+  (123456789), legs (bx, singlefire), cycles (c3) and prices (1.08345)
+  each index as one token
+- Postings map token -> [(file_id, line byte offset)]
+- A directory is indexed lazily on its first search; from then on the
+  LogWriter feeds appended text as it is written, and each search catches
+  up any file that grew without being reported (e.g. after a restart)
+- A rotation renames files under the index, so that directory is rebuilt
+  on its next search
+- Each directory holds at most MAX_POSTINGS postings; past that its oldest
+  files (by name, which carries the date) are evicted down to 3/4 of the
+  cap and are no longer searched (reported as "evicted_files")
+
+Matching lines are read back by seeking to their offsets.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Set, Tuple
+
+_TOKEN = re.compile(rb"[a-z0-9_.]+")
+
+SEARCH_PATTERNS = (".txt", ".log")
+MAX_RESULTS = 1000
+MAX_POSTINGS = 500_000  # Per directory
+
+
+def _tokens(line: bytes) -> Set[bytes]:
+    return {t.strip(b".") for t in _TOKEN.findall(line.lower())} - {b""}
+
+
+def tokenize_query(query: str) -> List[bytes]:
+    return sorted(_tokens(query.encode("utf-8")))
+
+
+class _DirIndex:
+    __slots__ = ("files", "names", "indexed_upto", "file_postings", "postings", "count", "evicted")
+
+    def __init__(self):
+        self.files: Dict[str, int] = {}          # file name -> file_id
+        self.names: List[str] = []                # file_id -> file name
+        self.indexed_upto: List[int] = []         # file_id -> bytes indexed
+        self.file_postings: List[int] = []        # file_id -> postings held
+        self.postings: Dict[bytes, List[Tuple[int, int]]] = {}
+        self.count = 0                            # Total postings
+        self.evicted: Set[int] = set()            # file_ids no longer indexed
+
+    def file_id(self, name: str) -> int:
+        fid = self.files.get(name)
+        if fid is None:
+            fid = len(self.names)
+            self.files[name] = fid
+            self.names.append(name)
+            self.indexed_upto.append(0)
+            self.file_postings.append(0)
+        return fid
+
+    def add(self, fid: int, start: int, data: bytes) -> int:
+        """Index the complete lines of `data` (file bytes from `start`). Returns bytes consumed."""
+        end = data.rfind(b"\n") + 1
+        offset = 0
+        postings = self.postings
+        added = 0
+        while offset < end:
+            nl = data.index(b"\n", offset)
+            entry = (fid, start + offset)
+            for token in _tokens(data[offset:nl]):
+                plist = postings.get(token)
+                if plist is None:
+                    postings[token] = [entry]
+                else:
+                    plist.append(entry)
+                added += 1
+            offset = nl + 1
+        self.indexed_upto[fid] = start + end
+        self.file_postings[fid] += added
+        self.count += added
+        if self.count > MAX_POSTINGS:
+            self.evict_oldest()
+        return end
+
+    def evict_oldest(self):
+        """Drop the oldest files' postings until the index is at 3/4 of MAX_POSTINGS."""
+        target = MAX_POSTINGS * 3 // 4
+        drop = set()
+        remaining = self.count
+        by_age = sorted(range(len(self.names)), key=self.names.__getitem__)
+        for fid in by_age[:-1]:  # The newest file (the one being written) stays searchable
+            if remaining <= target:
+                break
+            if not self.file_postings[fid]:
+                continue
+            drop.add(fid)
+            remaining -= self.file_postings[fid]
+            self.file_postings[fid] = 0
+        if not drop:
+            return
+
+        for token in list(self.postings):
+            kept = [e for e in self.postings[token] if e[0] not in drop]
+            if kept:
+                self.postings[token] = kept
+            else:
+                del self.postings[token]
+        self.count = remaining
+        self.evicted |= drop
+
+
+class LogSearchIndex:
+    """Per-directory inverted indexes, fed by the LogWriter thread."""
+
+    def __init__(self):
+        self._dirs: Dict[str, _DirIndex] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "builds": 0,
+            "searches": 0,
+            "lines_indexed_live": 0,
+            "bytes_caught_up": 0,
+        }
+
+    # ========================
+    # WRITER NOTIFICATIONS (log writer thread)
+    # ========================
+
+    def on_append(self, path: str, start: int, data: bytes):
+        """`data` (the exact bytes written) was appended to `path` at offset `start`."""
+        directory, name = os.path.split(os.path.abspath(path))
+        if not name.endswith(SEARCH_PATTERNS):
+            return
+        with self._lock:
+            index = self._dirs.get(directory)
+            if index is None:
+                return  # Not searched yet; built on first search
+            fid = index.file_id(name)
+            if fid in index.evicted or index.indexed_upto[fid] != start:
+                return  # Evicted, or a gap the next search catches up from disk
+            index.add(fid, start, data)
+            self.stats["lines_indexed_live"] += data.count(b"\n")
+
+    def on_rotate(self, path: str):
+        with self._lock:
+            self._dirs.pop(os.path.dirname(os.path.abspath(path)), None)
+
+    # ========================
+    # SEARCH (run off the event loop)
+    # ========================
+
+    def _catch_up(self, directory: str, index: _DirIndex):
+        """
+        Index whatever each file gained since it was last indexed. Files are
+        read without the lock (the writer thread's on_append needs it); the
+        lock is only taken to consult and update the index.
+        """
+        with os.scandir(directory) as it:
+            files = [(de.name, de.stat().st_size) for de in it
+                     if de.is_file() and de.name.endswith(SEARCH_PATTERNS)]
+        # Newest first, so the cap evicts the oldest files rather than whichever came last
+        files.sort(reverse=True)
+        for name, size in files:
+            with self._lock:
+                fid = index.file_id(name)
+                if index.evicted and fid not in index.evicted and name < max(index.names[e] for e in index.evicted):
+                    index.evicted.add(fid)  # Older than something already evicted
+                start = index.indexed_upto[fid]
+                if size <= start or fid in index.evicted:
+                    continue
+            with open(os.path.join(directory, name), "rb") as f:
+                f.seek(start)
+                data = f.read(size - start)
+            with self._lock:
+                # The writer (or another search) may have indexed part of it meanwhile;
+                # indexed_upto is always a line start, so skip to it
+                done = index.indexed_upto[fid]
+                if fid in index.evicted or not start <= done < start + len(data):
+                    continue
+                index.add(fid, done, data[done - start:])
+                self.stats["bytes_caught_up"] += len(data) - (done - start)
+
+    def search(self, directory, query: str, limit: int = 100) -> dict:
+        """
+        Lines containing every token of `query`, newest files first.
+        Returns {"query", "tokens", "total", "results": [{file, offset, line}], "took_ms"}.
+        """
+        t0 = time.perf_counter()
+        directory = os.path.abspath(directory)
+        tokens = tokenize_query(query)
+        limit = max(1, min(limit, MAX_RESULTS))
+        result = {"query": query, "tokens": [t.decode() for t in tokens],
+                  "total": 0, "results": []}
+        if not tokens or not os.path.isdir(directory):
+            result["took_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+            return result
+
+        with self._lock:
+            index = self._dirs.get(directory)
+            if index is None:
+                index = _DirIndex()
+                self._dirs[directory] = index
+                self.stats["builds"] += 1
+        self._catch_up(directory, index)
+
+        with self._lock:
+            self.stats["searches"] += 1
+
+            # Intersect postings, rarest token first
+            lists = sorted((index.postings.get(t, []) for t in tokens), key=len)
+            matches = set(lists[0])
+            for plist in lists[1:]:
+                if not matches:
+                    break
+                matches.intersection_update(plist)
+            names = list(index.names)
+            result["evicted_files"] = len(index.evicted)
+
+        # Newest file first (names carry the date), then file order
+        rank = {fid: r for r, fid in enumerate(sorted(range(len(names)), key=names.__getitem__, reverse=True))}
+        ordered = sorted(matches, key=lambda m: (rank[m[0]], m[1]))
+        result["total"] = len(ordered)
+
+        by_file: Dict[int, List[int]] = {}
+        for fid, offset in ordered[:limit]:
+            by_file.setdefault(fid, []).append(offset)
+        for fid in sorted(by_file, key=rank.__getitem__):
+            name = names[fid]
+            try:
+                with open(os.path.join(directory, name), "rb") as f:
+                    for offset in by_file[fid]:
+                        f.seek(offset)
+                        line = f.readline().rstrip(b"\r\n")
+                        result["results"].append({
+                            "file": name,
+                            "offset": offset,
+                            "line": line.decode("utf-8", errors="replace"),
+                        })
+            except OSError:
+                continue
+
+        result["took_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        return result
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "directories": len(self._dirs),
+            "tokens": sum(len(i.postings) for i in self._dirs.values()),
+            "postings": sum(i.count for i in self._dirs.values()),
+        }
+
+
+# Global singleton instance (fed by the LogWriter thread)
+log_search = LogSearchIndex()
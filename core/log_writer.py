@@ -0,0 +1,291 @@
+"""
+Background Log Writer
+
+Single writer thread shared by ActivityLogger and SessionLogger so that
+trading bursts never wait on disk.
+
+- Producers append (path, text) to a deque (atomic append, no lock taken)
+- The writer thread drains it at most every FLUSH_INTERVAL seconds, or
+  sooner once BATCH_SIZE lines are pending, grouping lines per file
+- File handles stay open (LRU-capped); text files rotate by size, binary
+  files (journals with offset indexes) and files registered with
+  never_rotate() (session logs, read whole by /history) are never rotated
+- A failed rotation (e.g. the file is open elsewhere on Windows) does not
+  cost the batch already written; it is retried after ROTATE_RETRY seconds
+- Text lines are dropped (and counted) once MAX_QUEUE lines are pending
+- A failing file only loses its own batch: its text is dropped and
+  counted, its binary data is put back and retried on the next drain
+- Writes and rotations are reported to the log index (history listings)
+  and appended text to the search index (/history/search)
+"""
+
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from core.log_index import log_index
+from core.log_search import log_search
+
+
+class LogWriter:
+    """Asynchronous, batched appender for per-user log files."""
+
+    MAX_QUEUE = 100_000
+    FLUSH_INTERVAL = 0.2        # Max seconds a line waits before hitting disk
+    BATCH_SIZE = 500            # Wake the writer early past this many lines
+    MAX_BYTES = 10 * 1024 * 1024
+    BACKUP_COUNT = 5
+    MAX_OPEN_FILES = 64
+    ROTATE_RETRY = 30.0         # Seconds before retrying a failed rotation
+
+    def __init__(self):
+        self._queue: deque = deque()
+        self._wake = threading.Event()
+        self._drain_lock = threading.Lock()
+        self._handles: "OrderedDict[str, object]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._failing: Dict[str, str] = {}  # path -> last error (reported once)
+        self._no_rotate: Set[str] = set()
+        self._rotate_failing: Dict[str, Tuple[float, str]] = {}  # path -> (retry at, last error)
+        self._stopped = False
+        self.stats = {
+            "written_lines": 0,
+            "dropped_lines": 0,
+            "write_errors": 0,
+            "batches": 0,
+            "rotations": 0,
+            "rotation_errors": 0,
+            "last_batch_ms": 0.0,
+        }
+
+    # ========================
+    # PRODUCER SIDE (event loop)
+    # ========================
+
+    def write(self, path, text: str):
+        """Queue text for appending to `path`. Never blocks."""
+        self._enqueue(str(path), text)
+
+    def write_bytes(self, path, data: bytes):
+        """
+        Queue raw bytes for appending to `path` (binary, never rotated).
+        Never dropped — callers track file offsets from what they queue.
+        """
+        self._enqueue(str(path), data, droppable=False)
+
+    def never_rotate(self, path):
+        """Exempt a text file from size rotation (readers expect it whole)."""
+        self._no_rotate.add(str(path))
+
+    def console(self, text: str):
+        """Queue a line for stdout (echo without blocking the caller)."""
+        self._enqueue(None, text)
+
+    def _enqueue(self, path: Optional[str], text, droppable: bool = True):
+        if droppable and len(self._queue) >= self.MAX_QUEUE:
+            self.stats["dropped_lines"] += 1
+            return
+        self._queue.append((path, text))
+        if self._thread is None:
+            self._start()
+        if len(self._queue) >= self.BATCH_SIZE:
+            self._wake.set()
+
+    # ========================
+    # WRITER THREAD
+    # ========================
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return  # Another producer got here first
+            thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            thread.start()
+            self._thread = thread
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                self._drain()
+            except Exception as e:
+                # Never let the writer thread die; fall back to stderr
+                sys.__stderr__.write(f"[LOGWRITER] Drain failed: {e}\n")
+
+    def _drain(self):
+        """Write everything pending, one write() per file."""
+        with self._drain_lock:
+            t0 = time.perf_counter()
+            grouped: Dict[Optional[str], List[str]] = {}
+            count = 0
+            while True:
+                try:
+                    path, text = self._queue.popleft()
+                except IndexError:
+                    break
+                grouped.setdefault(path, []).append(text)
+                count += 1
+
+            if not count:
+                return
+
+            retry = []
+            for path, chunks in grouped.items():
+                try:
+                    self._write_chunks(path, chunks)
+                except Exception as e:
+                    count -= len(chunks)
+                    self._on_write_error(path, chunks, e, retry)
+
+            if retry:
+                # Ahead of anything queued meanwhile, so per-file order holds
+                self._queue.extendleft(reversed(retry))
+
+            self.stats["written_lines"] += count
+            self.stats["batches"] += 1
+            self.stats["last_batch_ms"] = (time.perf_counter() - t0) * 1000
+
+    def _write_chunks(self, path: Optional[str], chunks: list):
+        if path is None:
+            sys.stdout.write("".join(chunks))
+            sys.stdout.flush()
+            return
+        binary = isinstance(chunks[0], bytes)
+        # Text is encoded here and written in binary mode: no newline
+        # translation on Windows, so offsets are exactly the bytes written
+        data = b"".join(chunks) if binary else "".join(chunks).encode("utf-8")
+        f = self._handle(path)
+        start = f.tell()
+        try:
+            f.write(data)
+            f.flush()
+        except Exception:
+            self._discard_handle(path)
+            if binary:
+                self._truncate(path, start)  # Don't leave a partial record before the retry
+            raise
+        size = f.tell()
+        self._failing.pop(path, None)
+        log_index.on_write(path, size)
+        if not binary:
+            log_search.on_append(path, start, data)
+        if not binary and size >= self.MAX_BYTES and path not in self._no_rotate:
+            self._try_rotate(path)
+
+    def _try_rotate(self, path: str):
+        """Rotate, backing off after a failure (the data is already written)."""
+        failing = self._rotate_failing.get(path)
+        if failing is not None and time.monotonic() < failing[0]:
+            return
+        try:
+            self._rotate(path)
+        except Exception as e:
+            self.stats["rotation_errors"] += 1
+            message = str(e)
+            if failing is None or failing[1] != message:
+                sys.__stderr__.write(f"[LOGWRITER] Rotating {path} failed (retry in {self.ROTATE_RETRY:.0f}s): {e}\n")
+            self._rotate_failing[path] = (time.monotonic() + self.ROTATE_RETRY, message)
+            return
+        self._rotate_failing.pop(path, None)
+
+    def _on_write_error(self, path: Optional[str], chunks: list, error: Exception, retry: list):
+        """Drop (text) or keep for retry (binary) one file's failed batch."""
+        self.stats["write_errors"] += 1
+        binary = isinstance(chunks[0], bytes)
+        if binary:
+            retry.extend((path, chunk) for chunk in chunks)
+        else:
+            self.stats["dropped_lines"] += len(chunks)
+        message = str(error)
+        if self._failing.get(path) != message:
+            self._failing[path] = message
+            action = "will retry" if binary else f"dropped {len(chunks)} lines"
+            sys.__stderr__.write(f"[LOGWRITER] Write to {path} failed ({action}): {error}\n")
+
+    @staticmethod
+    def _truncate(path: str, size: int):
+        try:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+        except OSError:
+            pass
+
+    def _discard_handle(self, path: str):
+        f = self._handles.pop(path, None)
+        if f is not None:
+            try:
+                f.close()
+            except Exception:
+                pass
+
+    def _handle(self, path: str):
+        f = self._handles.get(path)
+        if f is not None:
+            self._handles.move_to_end(path)
+            return f
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        f = open(path, "ab")
+        self._handles[path] = f
+        while len(self._handles) > self.MAX_OPEN_FILES:
+            _, old = self._handles.popitem(last=False)
+            old.close()
+        return f
+
+    def _rotate(self, path: str):
+        """activity_X.log -> activity_X.1.log -> ... (keeps BACKUP_COUNT)."""
+        f = self._handles.pop(path, None)
+        if f is not None:
+            f.close()
+
+        p = Path(path)
+
+        def backup(i: int) -> Path:
+            return p.with_name(f"{p.stem}.{i}{p.suffix}")
+
+        for i in range(self.BACKUP_COUNT - 1, 0, -1):
+            if backup(i).exists():
+                os.replace(backup(i), backup(i + 1))
+        os.replace(p, backup(1))
+        log_index.on_rotate(path)
+        log_search.on_rotate(path)
+        self.stats["rotations"] += 1
+
+    # ========================
+    # CONTROL
+    # ========================
+
+    def flush(self):
+        """Synchronously write everything pending (shutdown/crash path)."""
+        try:
+            self._drain()
+        except Exception:
+            pass
+
+    def close(self):
+        self._stopped = True
+        self._wake.set()
+        self.flush()
+        with self._drain_lock:
+            for f in self._handles.values():
+                f.close()
+            self._handles.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "queue_depth": len(self._queue),
+            "open_files": len(self._handles),
+        }
+
+
+# Global singleton instance (one writer thread per process)
+log_writer = LogWriter()
+atexit.register(log_writer.close)
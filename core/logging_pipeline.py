@@ -0,0 +1,146 @@
+"""
+Queue-Based Logging Pipeline
+
+The root logger only enqueues records (QueueHandler); a QueueListener thread
+runs the real handlers (rotating file + console), so logger.info/error from
+the engine never does file I/O or rollover checks on the event loop.
+
+Repetitive messages are rate limited per logger before they are queued:
+messages are keyed by logger, level and text with digits collapsed (so
+"Engine tick error (#1)" and "(#2)" count as the same message). After
+RATE_LIMIT_BURST records in RATE_LIMIT_WINDOW seconds the rest are dropped,
+and one summary line reports how many were suppressed.
+"""
+
+import logging
+import queue
+import re
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Tuple
+
+_DIGITS = re.compile(r"\d+")
+
+
+class RateLimitFilter(logging.Filter):
+    """Drops repeats of the same message beyond a burst per window."""
+
+    def __init__(self, burst: int, window: float):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._seen: Dict[Tuple[str, int, str], list] = {}  # key -> [window_start, count]
+        self._lock = threading.Lock()
+        self.suppressed_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        key = (record.name, record.levelno, _DIGITS.sub("#", str(record.msg)))
+        now = record.created
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                suppressed = entry[1] - self.burst if entry and entry[1] > self.burst else 0
+                self._seen[key] = [now, 1]
+                if len(self._seen) > 1000:
+                    self._prune(now)
+            else:
+                entry[1] += 1
+                if entry[1] > self.burst:
+                    self.suppressed_total += 1
+                    return False
+                suppressed = 0
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} [{suppressed} similar messages suppressed]"
+            record.args = None
+        return True
+
+    def _prune(self, now: float):
+        for key in [k for k, v in self._seen.items() if now - v[0] >= self.window]:
+            del self._seen[key]
+
+
+class TimedQueueListener(QueueListener):
+    """QueueListener that records queue wait and handler time per record."""
+
+    def __init__(self, log_queue, *handlers, respect_handler_level=True):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.stats = {
+            "records": 0,
+            "queue_wait_ms_max": 0.0,
+            "queue_wait_ms_avg": 0.0,
+            "handler_ms_max": 0.0,
+            "handler_ms_avg": 0.0,
+        }
+
+    def handle(self, record: logging.LogRecord):
+        t0 = time.time()
+        super().handle(record)
+        handler_ms = (time.time() - t0) * 1000
+        wait_ms = (t0 - record.created) * 1000
+
+        s = self.stats
+        s["records"] += 1
+        n = s["records"]
+        s["queue_wait_ms_avg"] += (wait_ms - s["queue_wait_ms_avg"]) / n
+        s["handler_ms_avg"] += (handler_ms - s["handler_ms_avg"]) / n
+        s["queue_wait_ms_max"] = max(s["queue_wait_ms_max"], wait_ms)
+        s["handler_ms_max"] = max(s["handler_ms_max"], handler_ms)
+
+
+# Module state (one pipeline per process)
+_listener: TimedQueueListener = None
+_rate_limit: RateLimitFilter = None
+_queue: queue.SimpleQueue = None
+
+RATE_LIMIT_BURST = 5
+RATE_LIMIT_WINDOW = 60.0  # seconds
+
+
+def setup_logging(handlers: List[logging.Handler], level=logging.INFO,
+                  burst: int = RATE_LIMIT_BURST, window: float = RATE_LIMIT_WINDOW):
+    """
+    Route the root logger through a QueueHandler. `handlers` run on the
+    listener thread. Safe to call once at startup.
+    """
+    global _listener, _rate_limit, _queue
+    if _listener is not None:
+        return
+
+    _queue = queue.SimpleQueue()
+    _rate_limit = RateLimitFilter(burst, window)
+
+    queue_handler = QueueHandler(_queue)
+    queue_handler.addFilter(_rate_limit)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(queue_handler)
+
+    _listener = TimedQueueListener(_queue, *handlers)
+    _listener.start()
+
+
+def stop_logging():
+    """Drain the queue and stop the listener thread (call at shutdown)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_stats() -> dict:
+    if _listener is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        **_listener.stats,
+        "queue_depth": _queue.qsize(),
+        "suppressed": _rate_limit.suppressed_total,
+    }
@@ -2,7 +2,12 @@
 Run State Persistence Module
 
 Persists and restores trading bot run state across server restarts.
-Ensures bots automatically resume trading after a crash.
+Ensures bots automatically resume trading after a crash: the orchestrators
+record what is running, and server startup hands get_running_symbols() to
+BotManager.resume_all.
+
+Writes are atomic and debounced (see core.atomic_file), so start/stop
+bursts cost one write on a worker thread.
 """
 
 import json
@@ -10,7 +15,10 @@ import os
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-RUN_STATE_FILE = "run_state.json"
+from core.atomic_file import DebouncedWriter
+
+# Per-process override (each account worker records its own users)
+RUN_STATE_FILE = os.getenv("RUN_STATE_FILE", "run_state.json")
 
 
 class RunStateManager:
@@ -28,10 +36,14 @@ class RunStateManager:
         ...
     }
     """
+
+    SAVE_DEBOUNCE = 0.5  # Seconds to coalesce saves on the event loop
     
     def __init__(self, state_file: str = RUN_STATE_FILE):
         self.state_file = state_file
         self.state: Dict[str, Any] = {}
+        self._writer = DebouncedWriter(
+            self.state_file, lambda: json.dumps(self.state, indent=2), self.SAVE_DEBOUNCE, tag="RUN STATE")
         self.load_state()
     
     def load_state(self):
@@ -48,15 +60,19 @@ class RunStateManager:
             self.state = {}
     
     def save_state(self):
-        """Persist run state to disk"""
-        try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
-        except Exception as e:
-            print(f" Error saving run state: {e}")
+        """Persist run state to disk (debounced on the event loop)"""
+        self._writer.request()
+
+    def flush(self):
+        """Write any pending changes now (blocking)."""
+        self._writer.flush()
     
     def set_running(self, user_id: str, active_symbols: List[str]):
         """Mark user's bot as running with specific symbols"""
+        current = self.state.get(user_id)
+        if current and current.get("running") and current.get("active_symbols") == active_symbols:
+            return  # Nothing to persist
+
         now = datetime.now().isoformat()
         
         if user_id not in self.state:
@@ -72,7 +88,7 @@ class RunStateManager:
     
     def set_stopped(self, user_id: str):
         """Mark user's bot as stopped"""
-        if user_id in self.state:
+        if user_id in self.state and self.state[user_id].get("running", False):
             self.state[user_id]["running"] = False
             self.state[user_id]["last_updated"] = datetime.now().isoformat()
             self.save_state()
@@ -99,6 +115,20 @@ class RunStateManager:
             if state.get("running", False)
         ]
 
+    def get_running_symbols(self) -> Dict[str, List[str]]:
+        """user_id -> symbols for every user that had a running bot"""
+        return {
+            user_id: list(state.get("active_symbols", []))
+            for user_id, state in self.state.items()
+            if state.get("running", False)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._writer.get_stats(),
+            "running_users": len(self.get_all_running_users()),
+        }
+
 
 # Global singleton instance
 run_state_manager = RunStateManager()
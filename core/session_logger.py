@@ -6,6 +6,7 @@ debugging, and protection against user error blame.
 
 Logs are stored per-user in: logs/users/{user_id}/sessions/
 Each session creates a human-readable text file with timestamps.
+Writes go through the background LogWriter (batched, size-rotated).
 """
 
 import os
@@ -13,6 +14,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from core.log_writer import log_writer
+from core.log_index import log_index
+
 
 class SessionLogger:
     """
@@ -37,15 +41,23 @@ class SessionLogger:
         
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.log_file = self.log_dir / f"session_{self.session_id}.txt"
+        log_writer.never_rotate(self.log_file)  # /history/{session_id} reads the one file
         self.trade_count = 0
         self.session_started = False
         
         print(f"[SESSION] Logging to: {self.log_file}")
     
+    def resume(self, session_id: str, trade_count: int = 0, session_started: bool = False):
+        """Continue an earlier session file (bot rehydrated after eviction)."""
+        self.session_id = session_id
+        self.log_file = self.log_dir / f"session_{session_id}.txt"
+        log_writer.never_rotate(self.log_file)
+        self.trade_count = trade_count
+        self.session_started = session_started
+    
     def _write(self, text: str):
-        """Append text to the log file."""
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(text)
+        """Queue text for appending to the log file."""
+        log_writer.write(self.log_file, text)
     
     def _timestamp(self) -> str:
         """Get current timestamp in readable format."""
@@ -158,15 +170,10 @@ USER ID: {self.user_id}
     
     def get_sessions(self) -> List[Dict[str, str]]:
         """Get list of all session files for this user."""
-        sessions = []
-        if self.log_dir.exists():
-            for file in sorted(self.log_dir.glob("session_*.txt"), reverse=True):
-                sessions.append({
-                    "id": file.stem,
-                    "name": file.name,
-                    "path": str(file)
-                })
-        return sessions
+        return [
+            {"id": f["stem"], "name": f["name"], "path": f["path"]}
+            for f in log_index.list(self.log_dir, ("session_*.txt",), sort="name")
+        ]
     
     def get_session_content(self, session_id: str) -> Optional[str]:
         """Get contents of a specific session log."""
@@ -0,0 +1,183 @@
+"""
+Live Status Hub
+
+Pushes per-user strategy status to dashboard WebSocket connections instead
+of every browser polling /status once a second.
+
+- One publisher task per user, running only while someone is subscribed
+- Every PUSH_INTERVAL it reads the orchestrator's versioned status snapshot
+  and only diffs it when the version moved
+- State changes are pushed as soon as they are seen; price-only changes are
+  throttled to PRICE_INTERVAL
+- Messages: {"type": "snapshot", "version", "data"} on subscribe, then
+  {"type": "delta", "version", "data", "removed"} with only the changed
+  keys (nested for per-symbol strategies) and the key paths that went away
+  (so a value that is legitimately None still arrives as null)
+- A subscriber that falls MAX_PENDING messages behind is resynced with a
+  fresh snapshot instead of buffering without bound
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+PRICE_KEYS = ("current_price",)
+
+
+def diff_status(old: dict, new: dict, path: tuple = ()) -> Tuple[dict, List[list]]:
+    """
+    Changes from `old` to `new`: (changed keys, recursive for dicts;
+    removed key paths, each a list of keys from the top level).
+    """
+    delta = {}
+    removed: List[list] = []
+    for key, value in new.items():
+        if key not in old:
+            delta[key] = value
+            continue
+        prev = old[key]
+        if isinstance(value, dict) and isinstance(prev, dict):
+            sub, sub_removed = diff_status(prev, value, path + (key,))
+            if sub:
+                delta[key] = sub
+            removed.extend(sub_removed)
+        elif prev != value:
+            delta[key] = value
+    for key in old:
+        if key not in new:
+            removed.append([*path, key])
+    return delta, removed
+
+
+class _Topic:
+    __slots__ = ("orchestrator", "subscribers", "task", "status", "version",
+                 "source_version", "last_price_at")
+
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.status: Optional[dict] = None
+        self.version = 0
+        self.source_version = -1  # Orchestrator status version last diffed
+        self.last_price_at = 0.0
+
+
+class StatusHub:
+    """Per-user status publisher shared by all of that user's connections."""
+
+    PUSH_INTERVAL = 0.25   # How often state is diffed (seconds)
+    PRICE_INTERVAL = 1.0   # Price-only updates at most this often
+    MAX_PENDING = 32       # Per-subscriber backlog before a resync
+
+    def __init__(self):
+        self._topics: Dict[int, _Topic] = {}  # id(orchestrator) -> topic
+        self.stats = {
+            "subscribers": 0,
+            "snapshots": 0,
+            "deltas": 0,
+            "resyncs": 0,
+        }
+
+    def subscribe(self, orchestrator) -> asyncio.Queue:
+        """Register a connection; its queue starts with a full snapshot."""
+        topic = self._topics.get(id(orchestrator))
+        if topic is None:
+            topic = _Topic(orchestrator)
+            self._topics[id(orchestrator)] = topic
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_PENDING)
+        if topic.status is None:
+            self._refresh(topic, force_price=True)
+        queue.put_nowait(self._snapshot(topic))
+        topic.subscribers.add(queue)
+        self.stats["subscribers"] += 1
+
+        if topic.task is None or topic.task.done():
+            topic.task = asyncio.create_task(self._publish_loop(topic))
+        return queue
+
+    def unsubscribe(self, orchestrator, queue: asyncio.Queue):
+        topic = self._topics.get(id(orchestrator))
+        if topic is None or queue not in topic.subscribers:
+            return
+        topic.subscribers.discard(queue)
+        self.stats["subscribers"] -= 1
+        if not topic.subscribers:
+            if topic.task is not None:
+                topic.task.cancel()
+            self._topics.pop(id(orchestrator), None)
+
+    def has_subscribers(self, orchestrator) -> bool:
+        topic = self._topics.get(id(orchestrator))
+        return topic is not None and bool(topic.subscribers)
+
+    # ========================
+    # PUBLISHING
+    # ========================
+
+    def _snapshot(self, topic: _Topic) -> dict:
+        self.stats["snapshots"] += 1
+        return {"type": "snapshot", "version": topic.version, "data": topic.status}
+
+    def _refresh(self, topic: _Topic, force_price: bool = False) -> Tuple[dict, List[list]]:
+        """Rebuild status, bump the version if it changed. Returns (delta, removed)."""
+        loop_time = asyncio.get_running_loop().time()
+        source_version, status = topic.orchestrator.get_status_versioned()
+        if source_version == topic.source_version:
+            return {}, []
+
+        price_due = force_price or loop_time - topic.last_price_at >= self.PRICE_INTERVAL
+        held = {}
+        if topic.status is not None and not price_due:
+            # Hold prices at their last published value until the throttle expires
+            held = {k: topic.status[k] for k in PRICE_KEYS
+                    if k in topic.status and status.get(k) != topic.status[k]}
+        if held:
+            status = {**status, **held}  # Copy; the orchestrator snapshot is shared
+        else:
+            topic.source_version = source_version
+
+        delta, removed = diff_status(topic.status, status) if topic.status is not None else (status, [])
+        if delta or removed:
+            topic.version += 1
+            topic.status = status
+            if price_due and any(k in delta for k in PRICE_KEYS):
+                topic.last_price_at = loop_time
+        return delta, removed
+
+    def _broadcast(self, topic: _Topic, delta: dict, removed: List[list]):
+        message = {"type": "delta", "version": topic.version, "data": delta, "removed": removed}
+        for queue in topic.subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind: replace the backlog with one snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot(topic))
+                self.stats["resyncs"] += 1
+        self.stats["deltas"] += 1
+
+    async def _publish_loop(self, topic: _Topic):
+        try:
+            while topic.subscribers:
+                await asyncio.sleep(self.PUSH_INTERVAL)
+                try:
+                    delta, removed = self._refresh(topic)
+                except Exception as e:
+                    print(f"[STATUS] Status refresh failed for {topic.orchestrator.user_id}: {e}")
+                    continue
+                if delta or removed:
+                    self._broadcast(topic, delta, removed)
+        except asyncio.CancelledError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "topics": len(self._topics),
+        }
+
+
+# Global singleton instance (one publisher per connected user)
+status_hub = StatusHub()
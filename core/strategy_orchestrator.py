@@ -1,8 +1,12 @@
-from typing import Dict, List, Set, Any
+from collections import deque
+from typing import Dict, List, Optional, Set, Any, Tuple
 import asyncio
+import os
 import time
 from core.engine.pair_strategy_engine import PairStrategyEngine as GridStrategy
 from core.session_logger import SessionLogger
+from core.run_state import run_state_manager
+from core import fast_json
 
 
 class StrategyOrchestrator:
@@ -11,7 +15,12 @@ class StrategyOrchestrator:
     Works with the new multi-asset config structure.
     Includes session logging for transparency and debugging.
     """
-    
+
+    remote = False  # Runs in this process (see core.account_pool.RemoteOrchestrator)
+
+    STATUS_HISTORY = 32  # Past status versions kept for delta responses
+    HARD_STOP_DELAY = 300.0  # Seconds after the runtime graceful stop before forcing a stop
+
     def __init__(self, config_manager, user_id: str = "default"):
         self.config_manager = config_manager
         self.user_id = user_id
@@ -21,6 +30,22 @@ class StrategyOrchestrator:
         
         # Session Logger for history tracking
         self.session_logger = SessionLogger(user_id)
+
+        # Versioned aggregate status (see get_status_versioned); the epoch
+        # tells this instance's versions from a rebuilt bot's
+        self.status_epoch = os.urandom(4).hex()
+        self.status_version = 0
+        self._status_key: Optional[tuple] = None
+        self._status_snapshot: Optional[dict] = None
+        self._status_history: deque = deque(maxlen=self.STATUS_HISTORY)  # (version, status)
+        self._status_json: Tuple[int, bytes] = (0, b"")  # Serialized snapshot per version
+
+        # Runtime limit (global max_runtime_minutes): loop timers armed when
+        # this user starts running, so the tick path does no timeout work
+        self._run_started_at: Optional[float] = None  # Loop time of the current run's start
+        self._runtime_handle: Optional[asyncio.TimerHandle] = None
+        self._hard_stop_handle: Optional[asyncio.TimerHandle] = None
+        self._runtime_task: Optional[asyncio.Task] = None
         
         # Initialize
         self.update_strategies()
@@ -30,6 +55,9 @@ class StrategyOrchestrator:
         """Pass-through to config manager for the API"""
         return self.config_manager.get_config()
 
+    def get_enabled_symbols(self) -> List[str]:
+        return self.config_manager.get_enabled_symbols()
+
     def update_strategies(self):
         """
         Syncs active strategies with the configuration.
@@ -56,6 +84,47 @@ class StrategyOrchestrator:
 
         self.active_symbols = enabled_symbols
 
+    def is_idle(self) -> bool:
+        """No strategy running (or finishing a graceful stop)."""
+        return not any(bot.running for bot in self.strategies.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Compact state kept when the orchestrator is evicted (config is on disk)."""
+        return {
+            "session_id": self.session_logger.session_id,
+            "trade_count": self.session_logger.trade_count,
+            "session_started": self.session_logger.session_started,
+            "cycles": {sym: bot.state.cycle_count for sym, bot in self.strategies.items()},
+        }
+
+    def restore(self, snapshot: Dict[str, Any]):
+        """Rehydrate from snapshot(): same session log, same cycle numbering."""
+        self.session_logger.resume(
+            snapshot["session_id"], snapshot.get("trade_count", 0), snapshot.get("session_started", False))
+        for sym, cycle in snapshot.get("cycles", {}).items():
+            if sym in self.strategies:
+                self.strategies[sym].state.cycle_count = cycle
+
+    async def update_config(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply a config update and hand new parameters only to the strategies
+        whose symbol changed. Enable/disable flips take effect on the next
+        start/stop, as before. Returns the config diff plus "deferred":
+        symbols whose change waits for their next cycle.
+        """
+        diff = self.config_manager.apply_update(update)
+        deferred = []
+        for symbol in diff["changed"]:
+            strategy = self.strategies.get(symbol)
+            if strategy is not None and strategy.reload_params():
+                deferred.append(symbol)
+        diff["deferred"] = deferred
+        if "max_runtime_minutes" in diff["global"]:
+            self._schedule_runtime()
+        if diff["changed"]:
+            print(f"[ORCHESTRATOR] Config v{diff['version']}: changed {sorted(diff['changed'])}, deferred {deferred}")
+        return diff
+
     async def start(self):
         """Start all enabled strategies"""
         self.update_strategies()
@@ -63,6 +132,7 @@ class StrategyOrchestrator:
         tasks = [bot.start() for bot in self.strategies.values()]
         if tasks:
             await asyncio.gather(*tasks)
+        self._on_run_changed()
 
     async def stop(self):
         """Stop all strategies (graceful - completes open pairs)"""
@@ -70,9 +140,124 @@ class StrategyOrchestrator:
         tasks = [bot.stop() for bot in self.strategies.values()]
         if tasks:
             await asyncio.gather(*tasks)
+        self._on_run_changed()
+
+    def _on_run_changed(self):
+        """
+        After a start/stop: record the symbols to resume after a restart and
+        arm or cancel the runtime timers (gracefully stopping symbols excluded).
+        """
+        symbols = sorted(sym for sym, bot in self.strategies.items() if bot.running and not bot.graceful_stop)
+        if symbols:
+            run_state_manager.set_running(self.user_id, symbols)
+            if self._run_started_at is None:
+                self._run_started_at = asyncio.get_running_loop().time()
+                # A failsafe left from the previous run must not force-stop this one
+                self._cancel_timer("_hard_stop_handle")
+                self._schedule_runtime()
+        else:
+            run_state_manager.set_stopped(self.user_id)
+            self._run_started_at = None
+            self._cancel_timer("_runtime_handle")
+            if self.is_idle():
+                self._cancel_timer("_hard_stop_handle")
+
+    # ========================
+    # RUNTIME LIMIT
+    # ========================
+
+    def _cancel_timer(self, name: str):
+        handle = getattr(self, name)
+        if handle is not None:
+            handle.cancel()
+            setattr(self, name, None)
 
-    async def start_symbol(self, symbol: str):
-        """Start a specific symbol strategy"""
+    def _schedule_runtime(self):
+        """(Re)arm the max runtime timer for the current run, from its start time."""
+        self._cancel_timer("_runtime_handle")
+        if self._run_started_at is None:
+            return
+        try:
+            max_runtime = float(self.config_manager.get_global_config().get("max_runtime_minutes", 0) or 0)
+        except (TypeError, ValueError):
+            max_runtime = 0.0
+        if max_runtime <= 0:
+            return  # 0 means no limit
+        loop = asyncio.get_running_loop()
+        self._runtime_handle = loop.call_at(self._run_started_at + max_runtime * 60, self._on_runtime_expired, max_runtime)
+
+    def _on_runtime_expired(self, max_runtime: float):
+        self._runtime_handle = None
+        self._runtime_task = asyncio.create_task(self._runtime_graceful_stop(max_runtime))
+
+    async def _runtime_graceful_stop(self, max_runtime: float):
+        """max_runtime_minutes reached: graceful stop every symbol, arm the hard stop failsafe."""
+        print(f"[TIMEOUT] {self.user_id}: max_runtime_minutes ({max_runtime}) reached. Triggering graceful stop...")
+        self.session_logger.log(f"TIMEOUT: max_runtime_minutes ({max_runtime}) reached - graceful stop")
+        for symbol, strategy in list(self.strategies.items()):
+            if strategy.running and not strategy.graceful_stop:
+                try:
+                    await strategy.stop()
+                    print(f"[TIMEOUT] {symbol}: Graceful stop activated")
+                except Exception as e:
+                    print(f"[TIMEOUT] {symbol}: Graceful stop failed: {e}")
+        self._on_run_changed()
+
+        if not self.is_idle():
+            self._cancel_timer("_hard_stop_handle")
+            self._hard_stop_handle = asyncio.get_running_loop().call_later(self.HARD_STOP_DELAY, self._on_hard_stop)
+            print(f"[TIMEOUT] {self.user_id}: Hard stop failsafe in {self.HARD_STOP_DELAY / 60:.0f} mins")
+
+    def _on_hard_stop(self):
+        """Graceful stop took too long: stop driving the remaining strategies."""
+        self._hard_stop_handle = None
+        still_running = [sym for sym, bot in self.strategies.items() if bot.running]
+        if not still_running:
+            return
+        print(f"[TIMEOUT] {self.user_id}: Hard stop - graceful stop exceeded {self.HARD_STOP_DELAY / 60:.0f} mins: {still_running}")
+        self.session_logger.log(f"TIMEOUT: hard stop for {', '.join(still_running)}")
+        for symbol in still_running:
+            strategy = self.strategies[symbol]
+            strategy.running = False
+            strategy.graceful_stop = False
+            strategy.activity_log.log_stop(strategy.state.cycle_count, "runtime_hard_stop")
+
+    async def resume(self, symbols: List[str]) -> Dict[str, Any]:
+        """
+        Auto-resume after a restart: enable and start `symbols` concurrently.
+
+        Cycle state is not persisted, so a fresh start would open a new grid
+        on top of whatever the previous run left open. A symbol that still
+        has positions with the strategy's magic number is therefore NOT
+        started; it is reported as blocked for the operator to resolve.
+        Returns {"running": [symbols running afterwards], "blocked": {symbol: open positions}}.
+        """
+        known = [s for s in symbols if s in self.config_manager.config.get("symbols", {})]
+        blocked = {}
+        for symbol in known:
+            open_positions = len(GridStrategy.managed_positions(symbol))
+            if open_positions:
+                blocked[symbol] = open_positions
+                print(f"[RESUME] {self.user_id} {symbol}: {open_positions} positions still open, not resuming")
+                self.session_logger.log(f"Auto-Resume skipped {symbol}: {open_positions} positions still open")
+        to_start = [s for s in known if s not in blocked]
+
+        if self.config_manager.set_symbols_enabled(to_start, True):
+            self.config_manager.save_config()
+        if to_start:
+            self.session_logger.log_button(f"Auto-Resume {', '.join(to_start)}")
+
+        results = await asyncio.gather(*(self.start_symbol(s) for s in to_start), return_exceptions=True)
+        for symbol, result in zip(to_start, results):
+            if isinstance(result, Exception):
+                print(f"[RESUME] {self.user_id} {symbol}: start failed: {result}")
+        self._on_run_changed()
+        return {"running": self.get_active_symbols(), "blocked": blocked}
+
+    async def start_symbol(self, symbol: str, enable: bool = False):
+        """Start a specific symbol strategy (enable=True enables it in the config first)"""
+        if enable:
+            self.config_manager.enable_symbol(symbol, True)
         if symbol not in self.strategies:
             sym_config = self.config_manager.get_symbol_config(symbol)
             if sym_config and sym_config.get('enabled', False):
@@ -84,6 +269,7 @@ class StrategyOrchestrator:
         if symbol in self.strategies:
             self.session_logger.log_button(f"Start {symbol}")
             await self.strategies[symbol].start()
+            self._on_run_changed()
 
     async def stop_symbol(self, symbol: str):
         """Stop a specific symbol strategy (graceful)"""
@@ -92,6 +278,7 @@ class StrategyOrchestrator:
             await self.strategies[symbol].stop()
             del self.strategies[symbol]
             self.active_symbols.discard(symbol)
+            self._on_run_changed()
 
     async def terminate_symbol(self, symbol: str):
         """
@@ -104,10 +291,60 @@ class StrategyOrchestrator:
             await self.strategies[symbol].terminate()
             del self.strategies[symbol]
             self.active_symbols.discard(symbol)
+            self._on_run_changed()
             print(f"[TERMINATE] {symbol}: Strategy terminated and removed.")
         else:
             print(f"[TERMINATE] {symbol}: Strategy not found in active strategies.")
 
+    BATCH_ACTIONS = ("start", "stop", "terminate")
+
+    async def run_batch(self, actions: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Run (symbol, action) pairs concurrently with a single config write.
+        Returns one outcome per input, in order:
+        {"symbol", "action", "status": "ok"|"error", "error"?, "ms"}.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(actions)
+        seen: Set[str] = set()
+        runnable = []
+        for i, (symbol, action) in enumerate(actions):
+            error = None
+            if action not in self.BATCH_ACTIONS:
+                error = f"Unknown action '{action}'"
+            elif symbol in seen:
+                error = "Duplicate symbol in batch"
+            elif symbol not in self.config_manager.config.get("symbols", {}):
+                error = "Unknown symbol"
+            if error:
+                results[i] = {"symbol": symbol, "action": action, "status": "error", "error": error, "ms": 0.0}
+                continue
+            seen.add(symbol)
+            runnable.append((i, symbol, action))
+
+        # One config write for every symbol being started
+        to_start = [symbol for _, symbol, action in runnable if action == "start"]
+        if to_start and self.config_manager.set_symbols_enabled(to_start, True):
+            self.config_manager.save_config()  # Debounced, written off the loop
+
+        handlers = {"start": self.start_symbol, "stop": self.stop_symbol, "terminate": self.terminate_symbol}
+
+        async def run(i: int, symbol: str, action: str):
+            t0 = time.perf_counter()
+            outcome = {"symbol": symbol, "action": action, "status": "ok"}
+            try:
+                await handlers[action](symbol)
+                if action == "start" and symbol not in self.strategies:
+                    outcome.update(status="error", error="Symbol not enabled")
+            except Exception as e:
+                print(f"[BATCH] {action} {symbol} failed: {e}")
+                outcome.update(status="error", error=str(e))
+            outcome["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+            results[i] = outcome
+
+        if runnable:
+            await asyncio.gather(*(run(i, symbol, action) for i, symbol, action in runnable))
+        return results
+
     async def terminate_all(self):
         """
         Nuclear reset - close all positions for ALL active symbols.
@@ -138,6 +375,7 @@ class StrategyOrchestrator:
         
         self.strategies.clear()
         self.active_symbols.clear()
+        self._on_run_changed()
         
         # [NUCLEAR FALLBACK] Scan entire account for ANY remaining positions and close them
         # This handles orphaned positions from symbols that are no longer in 'strategies'
@@ -198,7 +436,45 @@ class StrategyOrchestrator:
         """
         Returns status for all active strategies.
         For multi-asset, returns per-symbol status in a 'strategies' dict.
+        The dict is a shared cached snapshot — callers must not mutate it.
+        """
+        return self.get_status_versioned()[1]
+
+    def get_status_versioned(self) -> Tuple[int, Dict[str, Any]]:
         """
+        (version, status). The version increases whenever any strategy's
+        status version, the strategy set, or the current price changes;
+        otherwise the cached snapshot is returned as-is.
+        """
+        per_symbol_status = {symbol: bot.get_status() for symbol, bot in self.strategies.items()}
+        first_bot = next(iter(self.strategies.values()), None)
+        current_price = first_bot.current_price if first_bot else 0
+        key = (
+            tuple((symbol, id(bot), bot.status_version) for symbol, bot in self.strategies.items()),
+            current_price,
+        )
+        if key != self._status_key:
+            self._status_key = key
+            self._status_snapshot = self._build_status(per_symbol_status, current_price)
+            self.status_version += 1
+            self._status_history.append((self.status_version, self._status_snapshot))
+        return self.status_version, self._status_snapshot
+
+    def get_status_json(self) -> Tuple[int, bytes]:
+        """(version, serialized status) — encoded once per status version."""
+        version, status = self.get_status_versioned()
+        if self._status_json[0] != version:
+            self._status_json = (version, fast_json.dumps(status))
+        return self._status_json
+
+    def get_status_since(self, version: int) -> Optional[dict]:
+        """Status snapshot at a past version, if still in the history window."""
+        for past_version, status in self._status_history:
+            if past_version == version:
+                return status
+        return None
+
+    def _build_status(self, per_symbol_status: Dict[str, dict], current_price: float) -> Dict[str, Any]:
         if not self.strategies:
             return {
                 "running": False,
@@ -216,11 +492,8 @@ class StrategyOrchestrator:
         running_any = False
         is_resetting_any = False
         graceful_stop_any = False
-        per_symbol_status = {}
-        
-        for symbol, bot in self.strategies.items():
-            s = bot.get_status()
-            per_symbol_status[symbol] = s
+
+        for s in per_symbol_status.values():
             total_positions += s.get('open_positions', 0)
             if s.get('running', False):
                 running_any = True
@@ -230,13 +503,12 @@ class StrategyOrchestrator:
                 graceful_stop_any = True
         
         # For backward compatibility, use first bot for single-value fields
-        first_bot = list(self.strategies.values())[0] if self.strategies else None
-        first_status = first_bot.get_status() if first_bot else {}
+        first_status = next(iter(per_symbol_status.values()), {})
 
         return {
             "running": running_any,
             "graceful_stop": graceful_stop_any,
-            "current_price": first_bot.current_price if first_bot else 0,
+            "current_price": current_price,
             "open_positions": total_positions,
             "step": first_status.get('step', 0),
             "iteration": first_status.get('iteration', 0),
@@ -12,8 +12,17 @@ import asyncio
 import MetaTrader5 as mt5
 import os
 import logging
+import time
+from typing import Optional
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from core.engine.bar_builder import bar_builder
+from core.engine.candle_cache import candle_cache
+from core.log_writer import log_writer
+from core.log_index import log_index
+from core.log_search import log_search
+from core import logging_pipeline
 
 load_dotenv()
 
@@ -31,10 +40,13 @@ class TradingEngine:
     MAX_RECONNECT_ATTEMPTS = 10
     # Delay between reconnection attempts (seconds)
     RECONNECT_DELAY = 5
+    # Bar ring checkpoint interval (seconds)
+    BAR_CHECKPOINT_INTERVAL = 60
     
     def __init__(self, bot_manager):
         self.bot_manager = bot_manager
-        self.running = True
+        # True only once MT5 is initialized (see start / wait via ready future)
+        self.running = False
         self.tick_count = 0
         self.last_health_check = datetime.now()
         self.consecutive_errors = 0
@@ -53,11 +65,20 @@ class TradingEngine:
             "last_tick_time": None
         }
         
-        # Graceful stop timeout tracking
-        self.start_time: datetime = None  # Set when tick loop starts
-        self.timeout_graceful_stop_triggered: bool = False
-        self.force_stop_time: datetime = None  # Hard stop failsafe
-        self.db_cleanup_task: asyncio.Task = None  # 5-min cleanup timer
+        # Set when tick loop starts (per-user max runtime timers live in
+        # StrategyOrchestrator, not in the tick path)
+        self.start_time: datetime = None
+
+        # Warm bar state: restored once per process, checkpointed periodically
+        self.bars_restored = False
+        self.last_bar_checkpoint = datetime.now()
+        self.bar_checkpoint_task: asyncio.Task = None
+
+        # Readiness: resolved with MT5 init time (ms) once start() connects,
+        # or with the init error
+        self._ready: Optional[asyncio.Future] = None
+        self._start_task: Optional[asyncio.Task] = None
+        self.last_init_ms: Optional[float] = None
 
     def _init_mt5(self) -> bool:
         """
@@ -131,29 +152,84 @@ class TradingEngine:
             logger.error(f"MT5 health check exception: {e}")
             return False
 
+    def start_in_background(self) -> asyncio.Future:
+        """
+        Launch start() as a task (once) and return the readiness future,
+        which resolves with the MT5 init time in ms or raises the init error.
+        """
+        if self._start_task is not None and not self._start_task.done():
+            return self._ready
+        self._ready = self._new_ready_future()
+        self._start_task = asyncio.create_task(self.start())
+        # Init errors are logged and delivered through the ready future
+        self._start_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._ready
+
+    async def ensure_ready(self, timeout: float) -> dict:
+        """
+        Restart the engine if it is stopped and wait (bounded) for MT5 to
+        initialize. Returns engine fields for API responses, incl. init time.
+        """
+        if self.running:
+            return {"engine": "running"}
+
+        print("[SERVER] Restarting Trading Engine...")
+        ready = self.start_in_background()
+        try:
+            init_ms = await asyncio.wait_for(asyncio.shield(ready), timeout)
+        except asyncio.TimeoutError:
+            return {"engine": "starting", "engine_error": f"MT5 not ready after {timeout:.0f}s"}
+        except Exception as e:
+            return {"engine": "failed", "engine_error": str(e)}
+        return {"engine": "started", "engine_init_ms": round(init_ms, 1)}
+
+    @staticmethod
+    def _new_ready_future() -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may await it (boot path); don't warn about an unretrieved error
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+
+    def _resolve_ready(self, init_ms: float = None, error: Exception = None):
+        if self._ready is None or self._ready.done():
+            return
+        if error is not None:
+            self._ready.set_exception(error)
+        else:
+            self._ready.set_result(init_ms)
+
     async def start(self):
         """
         Start the trading engine with MT5 connection.
         """
         if self.running and self.start_time:
             logger.warning("Engine start called but already running.")
+            self._resolve_ready(self.last_init_ms)
             return
 
+        if self._ready is None or self._ready.done():
+            self._ready = self._new_ready_future()
+
         logger.info(" Engine: Initializing Direct MT5 Connection (Monolith)...")
         
-        # Cancel any pending DB cleanup if we are restarting
-        if self.db_cleanup_task and not self.db_cleanup_task.done():
-            self.db_cleanup_task.cancel()
-            logger.info("Cancelled pending DB cleanup due to restart.")
-            self.db_cleanup_task = None
-        
+        t0 = time.perf_counter()
         if not self._init_mt5():
             logger.critical("Failed to initialize MT5. Engine not starting.")
-            raise RuntimeError("MT5 initialization failed")
+            error = RuntimeError("MT5 initialization failed")
+            self._resolve_ready(error=error)
+            raise error
+        self.last_init_ms = (time.perf_counter() - t0) * 1000
         
+        # Restore tick-built bars so symbols only fetch the delta
+        if not self.bars_restored:
+            arrays = await asyncio.to_thread(bar_builder.read_checkpoint)
+            bar_builder.restore_checkpoint(arrays)
+            self.bars_restored = True
+
         # [FIX] Explicitly set running to True to allow restart after stop()
         self.running = True
-        logger.info(" MT5 Connected. Starting High-Speed Loop.")
+        self._resolve_ready(self.last_init_ms)
+        logger.info(f" MT5 Connected in {self.last_init_ms:.0f} ms. Starting High-Speed Loop.")
         await self.run_tick_loop()
 
     async def run_tick_loop(self):
@@ -162,15 +238,13 @@ class TradingEngine:
         """
         # [FIX] Reset flags for new session
         self.start_time = datetime.now()
-        self.timeout_graceful_stop_triggered = False
-        self.force_stop_time = None
         
-        logger.info(f"[TIMEOUT] Session started at {self.start_time}")
+        logger.info(f"Session started at {self.start_time}")
         
         try:
             while self.running:
                 try:
-                    # 1. Collect all orchestrators FIRST (needed for timeout check and tick processing)
+                    # 1. Collect all orchestrators FIRST
                     all_orchestrators = list(self.bot_manager.bots.values())
                     
                     # Periodic health check
@@ -182,25 +256,6 @@ class TradingEngine:
                                 logger.critical("MT5 reconnection failed. Exiting for watchdog restart.")
                                 raise RuntimeError("MT5 connection lost and could not reconnect")
                     
-                    # CHECK TIMEOUT: Trigger graceful stop if max_runtime_minutes elapsed
-                    if not self.timeout_graceful_stop_triggered:
-                        await self._check_timeout_graceful_stop()
-                    
-                    # CHECK COMPLETION: If timeout triggered, see if all bots have finished
-                    if self.timeout_graceful_stop_triggered:
-                        total_running = 0
-                        for orch in all_orchestrators:
-                            total_running += sum(1 for s in orch.strategies.values() if s.running)
-                        
-                        if total_running == 0:
-                            logger.warning("[TIMEOUT] All symbols finished graceful stop. Shutting down engine.")
-                            print(f"\n[TIMEOUT] All symbols finished. Engine stopping.")
-                            # Schedule DB cleanup in 5 minutes
-                            if self.db_cleanup_task is None:
-                                self.db_cleanup_task = asyncio.create_task(self._schedule_db_cleanup())
-                            await self.stop()
-                            break
-                    
                     # 2. Collect active symbols from all orchestrators
                     active_symbols = set()
                     
@@ -225,6 +280,9 @@ class TradingEngine:
                             # Track stats
                             self.stats["ticks_processed"] += 1
                             self.stats["last_tick_time"] = datetime.now()
+
+                            # Feed local M1/M5/H1 bars (seeds from history on first tick)
+                            bar_builder.on_tick(symbol, tick)
                             
                             # Get positions
                             positions = mt5.positions_get(symbol=symbol)
@@ -233,6 +291,7 @@ class TradingEngine:
                             tick_data = {
                                 'ask': tick.ask, 
                                 'bid': tick.bid,
+                                'time': tick.time,
                                 'positions_count': pos_count
                             }
                             
@@ -240,6 +299,10 @@ class TradingEngine:
                             tasks = [orch.on_external_tick(symbol, tick_data) for orch in all_orchestrators]
                             await asyncio.gather(*tasks)
                     
+                    # Periodically checkpoint bar rings (written off-loop)
+                    if (datetime.now() - self.last_bar_checkpoint).total_seconds() >= self.BAR_CHECKPOINT_INTERVAL:
+                        self._schedule_bar_checkpoint()
+
                     # Reset consecutive error counter on success
                     self.consecutive_errors = 0
                             
@@ -274,6 +337,7 @@ class TradingEngine:
         """
         logger.info("Stopping trading engine...")
         self.running = False
+        await self._final_bar_checkpoint()
         mt5.shutdown()
         logger.info(" MT5 Disconnected. Engine stopped.")
         
@@ -285,80 +349,36 @@ class TradingEngine:
             **self.stats,
             "tick_count": self.tick_count,
             "consecutive_errors": self.consecutive_errors,
-            "running": self.running
+            "running": self.running,
+            "last_init_ms": self.last_init_ms,
+            "candle_cache": candle_cache.get_stats(),
+            "bar_builder": bar_builder.get_stats(),
+            "log_writer": log_writer.get_stats(),
+            "log_index": log_index.get_stats(),
+            "log_search": log_search.get_stats(),
+            "logging": logging_pipeline.get_stats()
         }
     
-    async def _schedule_db_cleanup(self):
-        """
-        Delete DB 5 minutes after graceful stop completion.
-        Called when all engines finish graceful stop.
-        """
-        db_path = "db/grid_v3.db"
-        print(f"\n[CLEANUP] Database cleanup scheduled in 5 minutes...")
-        print(f"[CLEANUP] File: {db_path}")
-        
-        await asyncio.sleep(300)  # 5 minutes
-        
-        if os.path.exists(db_path):
-            try:
-                os.remove(db_path)
-                print(f"[CLEANUP] ✓ Deleted database: {db_path}")
-            except Exception as e:
-                print(f"[CLEANUP] ✗ Could not delete database: {e}")
-    
-    async def _check_timeout_graceful_stop(self):
-        """
-        Check if max_runtime_minutes has elapsed and trigger graceful stop on all engines.
-        
-        This allows existing completed pairs to continue trading to max_positions
-        while blocking all new group creation and grid expansion.
-        """
-        if self.start_time is None:
+    def _schedule_bar_checkpoint(self):
+        """Copy bar rings on the loop, write them to disk in a worker thread."""
+        self.last_bar_checkpoint = datetime.now()
+        if self.bar_checkpoint_task and not self.bar_checkpoint_task.done():
             return
-        
-        # Get max_runtime_minutes from any orchestrator's config
-        all_orchestrators = list(self.bot_manager.bots.values())
-        if not all_orchestrators:
+        arrays = bar_builder.snapshot_rings()
+        if not arrays:
             return
-        
-        # Get global config from first orchestrator
-        try:
-            global_config = all_orchestrators[0].config_manager.get_global_config()
-            max_runtime = float(global_config.get("max_runtime_minutes", 0))
-            if self.tick_count % 300 == 0:  # Log every ~30 seconds (assuming 100ms ticks)
-                  elapsed = datetime.now() - self.start_time
-                  elapsed_mins = elapsed.total_seconds() / 60
-                  logger.debug(f"[TIMEOUT CHECK] Elapsed: {elapsed_mins:.1f}m / Max: {max_runtime}m")
-        except Exception:
-            return
-        
-        # 0 means no timeout
-        if not max_runtime or max_runtime <= 0:
-            return
-        
-        # Check if timeout has elapsed
-        elapsed = datetime.now() - self.start_time
-        elapsed_minutes = elapsed.total_seconds() / 60
-        
-        if elapsed_minutes >= max_runtime:
-            logger.warning(f"[TIMEOUT] max_runtime_minutes ({max_runtime}) reached. Triggering graceful stop on all engines.")
-            print(f"[TIMEOUT] max_runtime_minutes ({max_runtime}) reached after {elapsed_minutes:.1f} minutes. Triggering graceful stop...")
-            
-            # Set graceful_stop on all symbol engines
-            for orch in all_orchestrators:
-                for symbol, strategy in orch.strategies.items():
-                    if hasattr(strategy, 'stop') and not strategy.graceful_stop:
-                        await strategy.stop()
-                        print(f"[TIMEOUT] {symbol}: Graceful stop activated")
-            
-            self.timeout_graceful_stop_triggered = True
-            # [HARD STOP] Set failsafe time (5 minutes from now)
-            self.force_stop_time = datetime.now() + timedelta(minutes=5)
-            print(f"[TIMEOUT] Hard stop failsafe set for {self.force_stop_time.strftime('%H:%M:%S')} (5 mins)")
+        self.bar_checkpoint_task = asyncio.create_task(self._write_bar_checkpoint(arrays))
+
+    async def _final_bar_checkpoint(self):
+        """Let a checkpoint in flight finish, then write the current rings and wait for it."""
+        if self.bar_checkpoint_task is not None:
+            await asyncio.gather(self.bar_checkpoint_task, return_exceptions=True)
+        self._schedule_bar_checkpoint()
+        if self.bar_checkpoint_task is not None and not self.bar_checkpoint_task.done():
+            await self.bar_checkpoint_task
 
-        # [HARD STOP CHECK]
-        if self.timeout_graceful_stop_triggered and self.force_stop_time:
-            if datetime.now() > self.force_stop_time:
-                logger.critical("[TIMEOUT] Hard stop triggered (Graceful stop exceeded 5 mins). Forcing shutdown.")
-                print(f"\n[TIMEOUT] Hard stop triggered! Forcing shutdown...")
-                await self.stop()
\ No newline at end of file
+    async def _write_bar_checkpoint(self, arrays):
+        try:
+            await asyncio.to_thread(bar_builder.write_checkpoint, arrays)
+        except Exception as e:
+            logger.error(f"Bar checkpoint failed: {e}")
@@ -1,4 +1,5 @@
 import uvicorn
+import atexit
 import os
 import sys
 import signal
@@ -15,60 +16,29 @@ LOG_DIR = Path(__file__).parent / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
 # --- Terminal Redirection (Capture Everything) ---
-class Tee:
-    def __init__(self, original_stream, log_file):
-        self.original_stream = original_stream
-        self.log_file = log_file
+from core.console_sink import redirect_console
+from core.logging_pipeline import setup_logging, stop_logging
 
-    def write(self, data):
-        try:
-            self.original_stream.write(data)
-            self.log_file.write(data)
-            self.log_file.flush()
-            self.original_stream.flush()
-        except Exception:
-            pass # Prevent recursion or errors during write
-
-    def flush(self):
-        try:
-            self.original_stream.flush()
-            self.log_file.flush()
-        except Exception:
-            pass
-            
-    def isatty(self):
-        try:
-            return self.original_stream.isatty()
-        except AttributeError:
-            return False
-            
-    def __getattr__(self, name):
-        return getattr(self.original_stream, name)
 
 # Redirect stdout and stderr to file
 terminal_log_path = LOG_DIR / "terminal_output.log"
-try:
-    terminal_file = open(terminal_log_path, "a", encoding="utf-8")
-    sys.stdout = Tee(sys.stdout, terminal_file)
-    sys.stderr = Tee(sys.stderr, terminal_file)
+if redirect_console(terminal_log_path):
     print(f"[SYSTEM] Standard Output & Error redirected to {terminal_log_path}")
-except Exception as e:
-    print(f"[SYSTEM] Failed to redirect terminal output: {e}")
 
-# Configure root logger
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-    handlers=[
-        RotatingFileHandler(
-            LOG_DIR / "bot.log",
-            maxBytes=10 * 1024 * 1024,  # 10 MB
-            backupCount=5,
-            encoding="utf-8"
-        ),
-        logging.StreamHandler()
-    ]
+# Configure root logger (handlers run on a QueueListener thread)
+_formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+_file_handler = RotatingFileHandler(
+    LOG_DIR / "bot.log",
+    maxBytes=10 * 1024 * 1024,  # 10 MB
+    backupCount=5,
+    encoding="utf-8"
 )
+_stream_handler = logging.StreamHandler()
+for _handler in (_file_handler, _stream_handler):
+    _handler.setFormatter(_formatter)
+
+setup_logging([_file_handler, _stream_handler], level=logging.INFO)
+atexit.register(stop_logging)
 
 logger = logging.getLogger("main")
 
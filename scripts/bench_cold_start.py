@@ -0,0 +1,100 @@
+"""
+Cold-start benchmark: N concurrent first requests for one user.
+
+Fires N concurrent BotManager.get_or_create_bot() calls for a user with no
+resident orchestrator (as after a restart) and reports how many
+orchestrators were constructed, how many callers coalesced, total and
+per-caller latency, and the longest event-loop stall seen meanwhile.
+--io-delay slows the config read to show it stays off the loop.
+
+    python scripts/bench_cold_start.py --concurrency 50 --io-delay 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+async def run(concurrency: int, io_delay: float) -> dict:
+    from core.bot_manager import BotManager
+    from core.config_manager import ConfigManager
+
+    if io_delay:
+        load_config = ConfigManager.load_config
+
+        def slow_load(self):
+            time.sleep(io_delay)
+            return load_config(self)
+
+        ConfigManager.load_config = slow_load
+
+    manager = BotManager()
+    user_id = "bench-cold-start"
+    stall = 0.0
+    done = False
+
+    async def watch_loop():
+        nonlocal stall
+        while not done:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - t0 - 0.001)
+
+    async def caller():
+        t0 = time.perf_counter()
+        bot = await manager.get_or_create_bot(user_id)
+        return bot, time.perf_counter() - t0
+
+    watcher = asyncio.create_task(watch_loop())
+    t0 = time.perf_counter()
+    outcomes = await asyncio.gather(*(caller() for _ in range(concurrency)))
+    total = time.perf_counter() - t0
+    done = True
+    await watcher
+
+    latencies = sorted(ms for _, ms in outcomes)
+    return {
+        "concurrency": concurrency,
+        "constructed": manager.stats["created"],
+        "coalesced": manager.stats["coalesced"],
+        "same_orchestrator": all(bot is outcomes[0][0] for bot, _ in outcomes),
+        "total_ms": round(total * 1000, 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+        "max_loop_stall_ms": round(stall * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--io-delay", type=float, default=0.0, help="seconds added to the config read")
+    args = parser.parse_args()
+
+    logs_existed = os.path.exists(os.path.join(ROOT, "logs"))
+    workdir = tempfile.mkdtemp(prefix="bench_cold_start_")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # config_<user>.json lands here
+    try:
+        results = asyncio.run(run(args.concurrency, args.io_delay))
+    finally:
+        from core.log_writer import log_writer
+        log_writer.flush()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        shutil.rmtree(os.path.join(ROOT, "logs", "users", "bench-cold-start"), ignore_errors=True)
+        if not logs_existed:
+            shutil.rmtree(os.path.join(ROOT, "logs"), ignore_errors=True)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+/status throughput benchmark (20 symbols by default).
+
+In-process (default): builds a StrategyOrchestrator with N enabled symbols
+and times the /status serialization path:
+    - cached:   get_status_json() with an unchanged status version
+    - rebuild:  status snapshot rebuilt and re-encoded on every call
+    - stdlib:   json.dumps of the same status (the pre-orjson path)
+
+Against a running server (--url): N concurrent clients poll /status for
+--duration seconds and report requests/s, latency and the 304 share
+(--etag sends If-None-Match like the dashboard's poll fallback).
+
+    python scripts/bench_status.py
+    python scripts/bench_status.py --url http://127.0.0.1:8000 --token <jwt> --etag
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def rate(fn, seconds: float = 1.0) -> float:
+    """Calls per second of fn() over roughly `seconds`."""
+    calls = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        for _ in range(100):
+            fn()
+        calls += 100
+    return calls / (time.perf_counter() - t0)
+
+
+def bench_in_process(symbols: int, seconds: float):
+    from core import fast_json
+    from core.config_manager import AVAILABLE_SYMBOLS, ConfigManager
+    from core.strategy_orchestrator import StrategyOrchestrator
+
+    user_id = "bench-status"
+    logs_existed = os.path.exists(os.path.join(ROOT, "logs"))
+    workdir = tempfile.mkdtemp(prefix="bench_status_")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # config_<user>.json lands here
+    try:
+        config = ConfigManager(user_id=user_id)
+        chosen = list(AVAILABLE_SYMBOLS)[:symbols]
+        config.apply_update({"symbols": {s: {"enabled": s in chosen} for s in AVAILABLE_SYMBOLS}})
+        orch = StrategyOrchestrator(config, user_id=user_id)
+        _, status = orch.get_status_versioned()
+
+        def rebuild():
+            orch._status_key = None
+            orch.get_status_json()
+
+        results = {
+            "symbols": len(orch.strategies),
+            "status_bytes": len(orch.get_status_json()[1]),
+            "json_backend": fast_json.backend(),
+            "cached_per_s": round(rate(orch.get_status_json, seconds)),
+            "rebuild_per_s": round(rate(rebuild, seconds)),
+            "stdlib_json_per_s": round(rate(lambda: json.dumps(status), seconds)),
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        shutil.rmtree(os.path.join(ROOT, "logs", "users", user_id), ignore_errors=True)
+        if not logs_existed:
+            shutil.rmtree(os.path.join(ROOT, "logs"), ignore_errors=True)
+    print(json.dumps(results, indent=2))
+
+
+async def bench_http(url: str, token: str, concurrency: int, duration: float, etag: bool):
+    import aiohttp
+
+    latencies = []
+    codes = {}
+    deadline = time.perf_counter() + duration
+
+    async def client(session):
+        tag = None
+        while time.perf_counter() < deadline:
+            headers = {"Authorization": f"Bearer {token}"}
+            if etag and tag:
+                headers["If-None-Match"] = tag
+            t0 = time.perf_counter()
+            async with session.get(f"{url}/status", headers=headers) as resp:
+                await resp.read()
+                tag = resp.headers.get("ETag", tag)
+                codes[resp.status] = codes.get(resp.status, 0) + 1
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    print(json.dumps({
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2) if latencies else None,
+        "status_codes": codes,
+    }, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=20, help="enabled symbols (in-process mode)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per in-process measurement")
+    parser.add_argument("--url", help="benchmark a running server instead")
+    parser.add_argument("--token", default="", help="bearer token for --url")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--etag", action="store_true", help="send If-None-Match (304 path)")
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(bench_http(args.url.rstrip("/"), args.token, args.concurrency, args.duration, args.etag))
+    else:
+        bench_in_process(args.symbols, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Shared test setup.
+
+The MetaTrader5 package only exists on Windows and needs a running terminal,
+so when it cannot be imported a minimal stand-in module is registered: the
+constants the engine uses plus no-op calls (no ticks, no positions, orders
+not sent). Tests that need market behaviour monkeypatch these functions.
+"""
+
+import os
+import shutil
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+try:
+    import MetaTrader5  # noqa: F401
+except ImportError:
+    mt5 = types.ModuleType("MetaTrader5")
+    mt5.TIMEFRAME_M1, mt5.TIMEFRAME_M5, mt5.TIMEFRAME_H1 = 1, 5, 16385
+    mt5.ORDER_TYPE_BUY, mt5.ORDER_TYPE_SELL = 0, 1
+    mt5.ORDER_FILLING_FOK, mt5.ORDER_FILLING_IOC = 0, 1
+    mt5.ORDER_TIME_GTC = 0
+    mt5.TRADE_ACTION_DEAL = 1
+    mt5.TRADE_RETCODE_DONE = 10009
+
+    mt5.initialize = lambda *a, **k: True
+    mt5.login = lambda *a, **k: True
+    mt5.shutdown = lambda: None
+    mt5.terminal_info = lambda: None
+    mt5.last_error = lambda: (0, "")
+    mt5.symbol_info = lambda symbol: None
+    mt5.symbol_info_tick = lambda symbol: None
+    mt5.symbol_select = lambda *a, **k: True
+    mt5.copy_rates_from_pos = lambda *a, **k: None
+    mt5.positions_get = lambda *a, **k: ()
+    mt5.order_send = lambda request: None
+    sys.modules["MetaTrader5"] = mt5
+
+USERS_LOG_DIR = os.path.join(ROOT, "logs", "users")
+
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch):
+    """
+    Run in tmp_path, where config_<user>.json and run_state.json land.
+    Per-user log directories are anchored at the repo root, so any created
+    during the test are removed afterwards (and logs/ itself if it was new).
+    """
+    from core.log_writer import log_writer
+    from core.run_state import run_state_manager
+
+    logs_existed = os.path.exists(os.path.join(ROOT, "logs"))
+    before = set(os.listdir(USERS_LOG_DIR)) if os.path.isdir(USERS_LOG_DIR) else set()
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+
+    run_state_manager.flush()  # Pending save lands in tmp_path, not the repo
+    log_writer.flush()
+    if os.path.isdir(USERS_LOG_DIR):
+        for name in set(os.listdir(USERS_LOG_DIR)) - before:
+            user_dir = os.path.join(USERS_LOG_DIR, name)
+            with log_writer._drain_lock:  # Don't keep appending to deleted files
+                for path in [p for p in log_writer._handles if p.startswith(user_dir + os.sep)]:
+                    log_writer._discard_handle(path)
+            shutil.rmtree(user_dir, ignore_errors=True)
+    if not logs_existed:
+        shutil.rmtree(os.path.join(ROOT, "logs"), ignore_errors=True)
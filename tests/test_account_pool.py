@@ -0,0 +1,150 @@
+"""Account worker handle: lifecycle, bounded calls, AUTO_RESUME handed to the worker."""
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import account_pool
+from core.account_pool import AccountPool, AccountWorkerHandle, OutcomeUnknown
+
+
+class SilentConnection:
+    """Accepts messages, never answers."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+def make_handle(monkeypatch) -> AccountWorkerHandle:
+    monkeypatch.setattr(AccountWorkerHandle, "REQUEST_TIMEOUT", 0.05)
+    handle = AccountWorkerHandle({"name": "pytest-acc", "users": ["u1"]})
+    handle._connected = asyncio.Event()
+    return handle
+
+
+def test_call_fails_fast_while_disconnected(monkeypatch):
+    async def run():
+        handle = make_handle(monkeypatch)
+        with pytest.raises(ConnectionError, match="not connected"):
+            await handle.call("u1", "get_status")
+        return handle
+
+    handle = asyncio.run(run())
+    assert handle.stats["timeouts"] == 1
+    assert handle.stats["calls"] == 0
+
+
+def test_unanswered_call_times_out_and_is_forgotten(monkeypatch):
+    async def run():
+        handle = make_handle(monkeypatch)
+        handle._conn = SilentConnection()
+        handle._connected.set()
+        with pytest.raises(ConnectionError, match="did not reply"):
+            await handle.call("u1", "get_status")
+        handle._on_message({"id": handle._conn.sent[0]["id"], "result": "late"})  # Dropped
+        return handle
+
+    handle = asyncio.run(run())
+    assert handle._pending == {}
+    assert handle.stats["timeouts"] == 1
+
+
+def test_unanswered_control_call_reports_an_unknown_outcome(monkeypatch):
+    monkeypatch.setattr(AccountWorkerHandle, "CONTROL_TIMEOUT", 0.1)
+
+    async def run():
+        handle = make_handle(monkeypatch)
+        handle._conn = SilentConnection()
+        handle._connected.set()
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(OutcomeUnknown, match="terminate_all.*may still have been applied"):
+            await handle.call("u1", "terminate_all")
+        return asyncio.get_running_loop().time() - started
+
+    assert asyncio.run(run()) >= 0.1  # Its own timeout, not the read one
+
+
+def test_worker_exit_during_control_call_reports_an_unknown_outcome(monkeypatch):
+    async def run():
+        handle = make_handle(monkeypatch)
+        handle._conn = SilentConnection()
+        handle._connected.set()
+        call = asyncio.ensure_future(handle.call("u1", "run_batch", [("start", "EURUSD")]))
+        while not handle._pending:
+            await asyncio.sleep(0)
+        handle._fail_pending(ConnectionError("Account worker pytest-acc exited"))
+        with pytest.raises(OutcomeUnknown, match="exited during run_batch"):
+            await call
+        with pytest.raises(ConnectionError) as read_error:
+            await handle.call("u1", "config")  # Reads stay plain ConnectionErrors
+        assert not isinstance(read_error.value, OutcomeUnknown)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("auto_resume, expected", [(False, "0"), (True, "1")])
+def test_worker_env_carries_auto_resume(auto_resume, expected):
+    pool = AccountPool([{"name": "pytest-acc", "users": ["u1"]}], auto_resume=auto_resume)
+    env = pool.workers["pytest-acc"]._worker_env(("127.0.0.1", 1), b"key")
+    assert env["AUTO_RESUME"] == expected
+
+
+def test_worker_does_not_resume_when_auto_resume_is_off(monkeypatch):
+    account_worker = pytest.importorskip("core.account_worker")  # Needs the engine's dependencies
+    resumed = []
+
+    class FakeBotManager:
+        async def resume_all(self, running):
+            resumed.append(running)
+
+    monkeypatch.setattr(account_worker, "AUTO_RESUME", False)
+    monkeypatch.setattr(account_worker.run_state_manager, "get_running_symbols", lambda: {"u1": ["EURUSD"]})
+    worker = account_worker.AccountWorker.__new__(account_worker.AccountWorker)  # No engine/IPC needed
+    worker.name = "pytest-acc"
+    worker.bot_manager = FakeBotManager()
+
+    async def run():
+        ready = asyncio.get_running_loop().create_future()
+        ready.set_result(None)
+        await worker._resume(ready)
+
+    asyncio.run(run())
+    assert resumed == []
+
+
+class NoDefaultExecutor(ThreadPoolExecutor):
+    """Fails the test if anything runs on the loop's default executor."""
+
+    def submit(self, *args, **kwargs):
+        raise AssertionError("default executor used")
+
+
+@pytest.mark.parametrize("script", [
+    "import sys; sys.exit(3)",  # Dies before connecting
+    "import os\nfrom multiprocessing.connection import Client\n"
+    "host, _, port = os.environ['ACCOUNT_WORKER_ADDRESS'].rpartition(':')\n"
+    "Client((host, int(port)), authkey=bytes.fromhex(os.environ['ACCOUNT_WORKER_AUTHKEY'])).close()",
+])
+def test_worker_lifecycle_stays_off_the_default_executor(tmp_path, monkeypatch, script):
+    real_exec = asyncio.create_subprocess_exec
+
+    async def fake_exec(*args, **kwargs):
+        return await real_exec(sys.executable, "-c", script, **kwargs)
+
+    monkeypatch.setattr(account_pool, "ROOT_DIR", tmp_path)
+    monkeypatch.setattr(account_pool.asyncio, "create_subprocess_exec", fake_exec)
+
+    async def run():
+        asyncio.get_running_loop().set_default_executor(NoDefaultExecutor())
+        handle = make_handle(monkeypatch)
+        await asyncio.wait_for(handle._run_once(), 10)
+        return handle
+
+    handle = asyncio.run(run())
+    assert handle._proc.returncode is not None
+    assert handle._conn is None and not handle._connected.is_set()
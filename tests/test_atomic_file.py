@@ -0,0 +1,39 @@
+"""DebouncedWriter: a failed write stays pending and is retried."""
+
+import asyncio
+import json
+
+from core.atomic_file import DebouncedWriter
+
+
+def test_failed_flush_keeps_data_pending(tmp_path):
+    target = tmp_path / "missing_dir" / "state.json"
+    state = {"v": 1}
+    writer = DebouncedWriter(str(target), lambda: json.dumps(state))
+
+    writer.request()  # No loop: written immediately, and fails
+    assert writer.pending
+    assert writer.stats["write_errors"] == 1
+
+    target.parent.mkdir()
+    assert writer.flush()
+    assert json.loads(target.read_text()) == {"v": 1}
+    assert not writer.pending
+
+
+def test_loop_write_is_retried_after_a_failure(tmp_path, monkeypatch):
+    monkeypatch.setattr(DebouncedWriter, "RETRY_DELAY", 0.01)
+    target = tmp_path / "missing_dir" / "state.json"
+    state = {"v": 2}
+    writer = DebouncedWriter(str(target), lambda: json.dumps(state), delay=0.01)
+
+    async def run():
+        writer.request()
+        await asyncio.sleep(0.05)  # First attempt failed
+        assert writer.stats["write_errors"] >= 1 and writer.pending
+        target.parent.mkdir()
+        await asyncio.wait_for(writer._task, 1)
+
+    asyncio.run(run())
+    assert json.loads(target.read_text()) == {"v": 2}
+    assert not writer.pending
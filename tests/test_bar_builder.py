@@ -0,0 +1,71 @@
+"""BarBuilder: only current rings are served; the rest fall back to the candle cache."""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.engine import bar_builder as bar_builder_module
+from core.engine.bar_builder import BarBuilder, BarRing, RATE_DTYPE, TIMEFRAME_NAMES
+
+M1 = TIMEFRAME_NAMES["M1"]
+
+
+def history(n: int, start: int = 1_700_000_040, seconds: int = 60) -> np.ndarray:
+    rates = np.zeros(n, dtype=RATE_DTYPE)
+    rates["time"] = start + np.arange(n) * seconds
+    rates["open"] = rates["high"] = rates["low"] = rates["close"] = 1.1
+    return rates
+
+
+def builder_with_ring(rates: np.ndarray) -> BarBuilder:
+    builder = BarBuilder()
+    ring = BarRing(500, 60)
+    ring.seed(rates)
+    builder._rings[("EURUSD", M1)] = ring
+    return builder
+
+
+def test_current_ring_is_served():
+    builder = builder_with_ring(history(10))
+    assert len(builder.get("EURUSD", M1, 5)) == 5
+    assert builder.stats["served"] == 1
+
+
+def test_ring_not_updated_for_a_bar_falls_back(monkeypatch):
+    builder = builder_with_ring(history(10))
+    builder._rings[("EURUSD", M1)].updated_at -= 61  # Symbol stopped being polled
+
+    cache_bars = history(5, start=1_800_000_000)
+    monkeypatch.setattr(bar_builder_module.candle_cache, "get", lambda symbol, tf, count: cache_bars)
+    assert builder.get("EURUSD", M1, 5) is None
+    assert builder.chart("EURUSD", "M1", 5)[0]["time"] == 1_800_000_000
+    assert builder.stats["stale"] == 2
+
+
+def test_restored_ring_waits_for_its_catch_up(tmp_path, monkeypatch):
+    path = str(tmp_path / "bars.npz")
+    BarBuilder.write_checkpoint({f"EURUSD|{tf}": history(10) for tf in TIMEFRAME_NAMES.values()}, path)
+    builder = BarBuilder()
+    assert builder.load_checkpoint(path) == 3
+    assert builder.get("EURUSD", M1, 5) is None  # Checkpoint may be hours old
+
+    monkeypatch.setattr(bar_builder_module, "fetch_since", lambda symbol, tf, since, count: history(1, start=since))
+    last = 1_700_000_040 + 9 * 60
+    builder.on_tick("EURUSD", SimpleNamespace(time=last + 5, time_msc=1, bid=1.2))
+    assert len(builder.get("EURUSD", M1, 5)) == 5
+
+
+def test_checkpoint_round_trip_leaves_no_temp_files(tmp_path):
+    path = str(tmp_path / "bars.npz")
+    arrays = {f"EURUSD|{M1}": history(10)}
+    BarBuilder.write_checkpoint(arrays, path)
+    BarBuilder.write_checkpoint(arrays, path)  # Replaces in place
+    assert [p.name for p in tmp_path.iterdir()] == ["bars.npz"]
+    assert np.array_equal(BarBuilder.read_checkpoint(path)[f"EURUSD|{M1}"], arrays[f"EURUSD|{M1}"])
+
+
+def test_unreadable_checkpoint_restores_nothing(tmp_path):
+    path = tmp_path / "bars.npz"
+    path.write_bytes(b"not an npz")
+    builder = BarBuilder()
+    assert builder.load_checkpoint(str(path)) == 0
@@ -0,0 +1,94 @@
+"""BotManager: single-flight creation, persisted snapshots, cached sizes, rebuild epochs."""
+
+import asyncio
+import time
+
+from core.bot_manager import BotManager
+
+
+def test_concurrent_cold_requests_build_one_orchestrator(sandbox, monkeypatch):
+    builds = []
+    real_build = BotManager._build_bot
+
+    def slow_build(user_id, snapshot=None):
+        builds.append(user_id)
+        time.sleep(0.02)  # Widen the window for overlapping callers
+        return real_build(user_id, snapshot)
+
+    monkeypatch.setattr(BotManager, "_build_bot", staticmethod(slow_build))
+
+    async def run():
+        manager = BotManager()
+        bots = await asyncio.gather(*(manager.get_or_create_bot("pytest-single-flight") for _ in range(50)))
+        return manager, bots
+
+    manager, bots = asyncio.run(run())
+    assert builds == ["pytest-single-flight"]
+    assert all(bot is bots[0] for bot in bots)
+    assert manager.stats["created"] == 1
+    assert manager.stats["coalesced"] == 49
+
+
+def test_evicted_snapshot_survives_restart(sandbox):
+    async def evict():
+        manager = BotManager()
+        bot = await manager.get_or_create_bot("pytest-snapshot")
+        assert await manager.evict("pytest-snapshot")
+        manager._snapshot_writer.flush()
+        return bot.session_logger.session_id
+
+    async def rehydrate():
+        manager = BotManager()  # Fresh process: snapshots come from disk
+        bot = await manager.get_or_create_bot("pytest-snapshot")
+        return manager, bot.session_logger.session_id
+
+    session_id = asyncio.run(evict())
+    manager, restored_id = asyncio.run(rehydrate())
+    assert restored_id == session_id
+    assert manager.stats["rehydrated"] == 1
+
+
+def test_stats_use_sizes_from_the_sweep(sandbox):
+    async def run():
+        manager = BotManager()
+        await manager.get_or_create_bot("pytest-sizes")
+        before = manager.get_stats()
+        manager.measure_sizes()
+        return before, manager.get_stats()
+
+    before, after = asyncio.run(run())
+    assert before["sized_bots"] == 0 and before["resident_bytes"] == 0
+    assert after["sized_bots"] == 1 and after["resident_bytes"] > 0
+
+
+def test_failed_rehydration_keeps_the_snapshot(sandbox, monkeypatch):
+    def broken_build(user_id, snapshot=None):
+        raise OSError("disk unavailable")
+
+    monkeypatch.setattr(BotManager, "_build_bot", staticmethod(broken_build))
+    snapshot = {"session_id": "2024-01-01_00-00-00", "trade_count": 3, "cycles": {}}
+
+    async def run():
+        manager = BotManager()
+        manager._snapshots["pytest-keep"] = snapshot
+        try:
+            await manager.get_or_create_bot("pytest-keep")
+        except OSError:
+            pass
+        return manager
+
+    manager = asyncio.run(run())
+    assert manager._snapshots["pytest-keep"] == snapshot
+
+
+def test_rebuilt_bot_gets_a_new_status_epoch(sandbox):
+    async def run():
+        manager = BotManager()
+        first = await manager.get_or_create_bot("pytest-epoch")
+        assert await manager.evict("pytest-epoch")
+        second = await manager.get_or_create_bot("pytest-epoch")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is not second
+    assert first.status_epoch != second.status_epoch  # Old ETags / ?since= tags cannot match
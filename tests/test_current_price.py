@@ -0,0 +1,34 @@
+"""current_price: stopped bots share one live MT5 lookup per symbol per interval."""
+
+from types import SimpleNamespace
+
+from core.engine import pair_strategy_engine
+from core.engine.pair_strategy_engine import PairStrategyEngine
+
+
+def stopped_engine(symbol: str) -> PairStrategyEngine:
+    engine = PairStrategyEngine.__new__(PairStrategyEngine)  # No config/logging needed
+    engine.symbol = symbol
+    engine._last_mid = 0.0
+    engine._last_mid_at = float("-inf")  # No tick-loop quote
+    return engine
+
+
+def test_live_lookups_are_limited_per_symbol(monkeypatch):
+    lookups = []
+
+    def symbol_info_tick(symbol):
+        lookups.append(symbol)
+        return SimpleNamespace(ask=1.1002, bid=1.1)
+
+    monkeypatch.setattr(pair_strategy_engine.mt5, "symbol_info_tick", symbol_info_tick)
+    monkeypatch.setattr(PairStrategyEngine, "_live_quotes", {})
+    users = [stopped_engine("EURUSD") for _ in range(20)]
+
+    for _ in range(4):  # Four status publishes within the interval
+        assert all(abs(engine.current_price - 1.1001) < 1e-12 for engine in users)
+    assert lookups == ["EURUSD"]
+
+    PairStrategyEngine._live_quotes["EURUSD"] = (0.0, 1.1001)  # Interval elapsed
+    users[0].current_price
+    assert lookups == ["EURUSD", "EURUSD"]
@@ -0,0 +1,33 @@
+"""Speculative single fire direction: only used for the bar it was built from."""
+
+import asyncio
+
+from core.engine.pair_strategy_engine import PairStrategyEngine
+
+
+class FakeDirectionEngine:
+    def resolve_snapshot(self, snap, ask, bid):
+        return snap["direction"]
+
+    def resolve(self, ask, bid):
+        return "sync-direction"
+
+
+def make_engine(snapshot_bar: int, tick_time: int) -> PairStrategyEngine:
+    engine = PairStrategyEngine.__new__(PairStrategyEngine)  # No config/logging needed
+    engine.direction_engine = FakeDirectionEngine()
+    engine._direction_task = None
+    engine._direction_snapshot = {"direction": "buy"}
+    engine._direction_snapshot_bar = snapshot_bar
+    engine._tick_time = tick_time
+    return engine
+
+
+def test_snapshot_used_within_its_bar():
+    engine = make_engine(snapshot_bar=1_700_000_040, tick_time=1_700_000_040 + 59)
+    assert asyncio.run(engine._resolve_single_fire_direction(1.1, 1.1)) == ("buy", "speculative")
+
+
+def test_newer_bar_falls_back_to_sync():
+    engine = make_engine(snapshot_bar=1_700_000_040, tick_time=1_700_000_100)
+    assert asyncio.run(engine._resolve_single_fire_direction(1.1, 1.1)) == ("sync-direction", "sync")
@@ -0,0 +1,58 @@
+"""EventJournal: round trip, index seeks, recovery of a crash-truncated tail."""
+
+import pytest
+
+from core.engine import event_journal
+from core.log_writer import log_writer
+
+USER = "pytest-journal"
+
+
+@pytest.fixture
+def journals(sandbox, monkeypatch):
+    monkeypatch.setattr(event_journal, "_journals", {})
+    return event_journal
+
+
+def test_round_trip(journals):
+    journal = journals.get_journal(USER, "EURUSD")
+    journal.record("start", 1, price=1.1)
+    journal.record("fire", 1, leg="Bx", lot=0.01)
+    journal.record("tp_hit", 1, pnl=2.5)
+
+    events = journals.query_events(USER, "EURUSD")
+    assert [e["event"] for e in events] == ["start", "fire", "tp_hit"]
+    assert events[1]["leg"] == "Bx" and events[2]["pnl"] == 2.5
+    assert journal._offset == journal.path.stat().st_size
+
+
+def test_cycle_query_seeks_to_its_index_entry(journals):
+    journal = journals.get_journal(USER, "EURUSD")
+    for cycle in (1, 2, 3):
+        for i in range(event_journal.INDEX_EVERY + 5):
+            journal.record("phase", cycle, i=i)
+
+    events = journals.query_events(USER, "EURUSD", cycle=2)
+    assert len(events) == event_journal.INDEX_EVERY + 5
+    assert {e["cycle"] for e in events} == {2}
+    index = event_journal._load_index(journal.index_path)
+    assert events[0]["offset"] in [entry[2] for entry in index if entry[1] == 2]
+
+
+def test_truncated_tail_is_recovered(journals):
+    journal = journals.get_journal(USER, "EURUSD")
+    for i in range(3):
+        journal.record("info", 1, i=i)
+    log_writer.flush()
+    complete = journal.path.stat().st_size
+    with open(journal.path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00partial")  # Crash mid-record
+
+    journals._journals.clear()  # Fresh process
+    reopened = journals.get_journal(USER, "EURUSD")
+    assert reopened._offset == complete
+    assert reopened.path.stat().st_size == complete
+
+    reopened.record("info", 1, i=3)
+    events = journals.query_events(USER, "EURUSD")
+    assert [e["i"] for e in events] == [0, 1, 2, 3]
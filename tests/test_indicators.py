@@ -0,0 +1,62 @@
+"""Vectorized indicators vs the pure-Python DirectionEngine reference."""
+
+import numpy as np
+import pytest
+
+from core.engine import indicators
+from core.engine.direction_engine import DirectionEngine
+
+RATE_DTYPE = np.dtype([("time", "<i8"), ("open", "<f8"), ("high", "<f8"),
+                       ("low", "<f8"), ("close", "<f8")])
+
+
+def random_rates(rng: np.random.Generator, n: int, start: float = 1.1) -> np.ndarray:
+    """Random-walk candles in the MT5 rates layout."""
+    closes = start + np.cumsum(rng.normal(0, 0.0005, n))
+    opens = np.concatenate(([start], closes[:-1]))
+    spread = np.abs(rng.normal(0, 0.0003, n))
+    rates = np.zeros(n, dtype=RATE_DTYPE)
+    rates["time"] = np.arange(n) * 60
+    rates["open"] = opens
+    rates["close"] = closes
+    rates["high"] = np.maximum(opens, closes) + spread
+    rates["low"] = np.minimum(opens, closes) - spread
+    return rates
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    h1, m5, m1 = random_rates(rng, 200), random_rates(rng, 100), random_rates(rng, 50)
+    checks = indicators.verify_against_reference(DirectionEngine("EURUSD"), h1, m5, m1, 1.1002, 1.1)
+    assert all(checks.values()), checks
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_flat_and_short_series(seed):
+    rng = np.random.default_rng(seed)
+    flat = random_rates(rng, 60)
+    flat["open"] = flat["high"] = flat["low"] = flat["close"] = 1.0
+    checks = indicators.verify_against_reference(DirectionEngine("EURUSD"), flat, flat, flat[:20], 1.0, 1.0)
+    assert all(checks.values()), checks
+
+
+def test_score_many_matches_single():
+    rng = np.random.default_rng(7)
+    rate_sets = {s: (random_rates(rng, 200), random_rates(rng, 100), random_rates(rng, 50))
+                 for s in ("EURUSD", "GBPUSD", "USDJPY")}
+    quotes = {s: (float(r[1]["close"][-1]) + 0.0001, float(r[1]["close"][-1])) for s, r in rate_sets.items()}
+
+    many = indicators.score_many(rate_sets, quotes)
+    for symbol, (h1, m5, m1) in rate_sets.items():
+        assert many[symbol] == indicators.score_rates(h1, m5, m1, *quotes[symbol])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_python_float_inputs_within_tolerance(seed):
+    # sum() over Python floats is compensated on 3.12+, so only near-equal there
+    rng = np.random.default_rng(seed)
+    h1, m5, m1 = random_rates(rng, 200), random_rates(rng, 100), random_rates(rng, 50)
+    checks = indicators.verify_against_reference(DirectionEngine("EURUSD"), h1, m5, m1, 1.1002, 1.1,
+                                                 rtol=1e-12, python_floats=True)
+    assert all(checks.values()), checks
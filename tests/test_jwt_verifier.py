@@ -0,0 +1,96 @@
+"""Offline JWT verification against a locally generated RSA key."""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+jwt = pytest.importorskip("jwt")
+rsa = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.rsa")
+
+from core.jwt_verifier import TokenVerifier  # noqa: E402
+
+KID = "test-key"
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def verifier(private_key):
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": KID, "alg": "RS256", "use": "sig"})
+    fetches = []
+
+    def fetch():
+        fetches.append(time.time())
+        return {"keys": [jwk]}
+
+    v = TokenVerifier(jwks_fetcher=fetch)
+    v.fetches = fetches
+    return v
+
+
+def sign(private_key, kid=KID, **claims):
+    payload = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 600, **claims}
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def test_valid_token(verifier, private_key):
+    token = sign(private_key)
+    assert asyncio.run(verifier.authenticate(token)) == "user-1"
+    assert verifier.verify(token) == "user-1"
+    stats = verifier.get_stats()
+    assert stats["verified"] == 1 and stats["hits"] == 1
+    assert len(verifier.fetches) == 1
+
+
+def test_expired_token(verifier, private_key):
+    token = sign(private_key, exp=int(time.time()) - 60)
+    assert asyncio.run(verifier.authenticate(token)) is None
+
+
+def test_wrong_audience(verifier, private_key):
+    token = sign(private_key, aud="someone-else")
+    assert asyncio.run(verifier.authenticate(token)) is None
+
+
+def test_unknown_kid_refetches_once(verifier, private_key):
+    assert asyncio.run(verifier.authenticate(sign(private_key))) == "user-1"
+    token = sign(private_key, kid="rotated-away")
+    assert asyncio.run(verifier.authenticate(token)) is None
+    assert asyncio.run(verifier.authenticate(token)) is None
+    assert len(verifier.fetches) == 1  # Refetch throttled by JWKS_REFRESH_MIN_INTERVAL
+
+
+def test_revoked_token_rejected(verifier, private_key):
+    token = sign(private_key)
+    assert verifier.verify(token) == "user-1"
+    verifier.revoke(token)
+    assert verifier.verify(token) is None
+
+
+def test_concurrent_verification_from_threads(verifier, private_key):
+    verifier.cache_size = 8
+    tokens = [sign(private_key, sub=f"user-{i}") for i in range(32)]
+    errors = []
+
+    def hammer():
+        try:
+            for _ in range(20):
+                for i, token in enumerate(tokens):
+                    assert verifier.verify(token) == f"user-{i}"
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert verifier.get_stats()["cached"] <= 8
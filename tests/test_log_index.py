@@ -0,0 +1,39 @@
+"""LogIndex listings follow appends to existing files."""
+
+import os
+import time
+
+from core.log_index import LogIndex
+
+
+def test_append_to_older_file_moves_it_first(tmp_path):
+    old, new = tmp_path / "session_a.txt", tmp_path / "session_b.txt"
+    old.write_text("a\n")
+    new.write_text("b\n")
+    past = time.time() - 3600
+    os.utime(old, (past, past))
+
+    index = LogIndex()
+    listing = index.list(tmp_path, ("session_*.txt",), sort="mtime")
+    assert [f["name"] for f in listing] == ["session_b.txt", "session_a.txt"]
+
+    with open(old, "a") as f:
+        f.write("more\n")
+    index.on_write(str(old), old.stat().st_size)
+
+    listing = index.list(tmp_path, ("session_*.txt",), sort="mtime")
+    assert [f["name"] for f in listing] == ["session_a.txt", "session_b.txt"]
+    assert listing[0]["size"] == old.stat().st_size
+
+
+def test_name_listing_stays_cached_across_appends(tmp_path):
+    for name in ("session_a.txt", "session_b.txt"):
+        (tmp_path / name).write_text("x\n")
+    index = LogIndex()
+    index.list(tmp_path, ("session_*.txt",), sort="name")
+
+    for name in ("session_a.txt", "session_b.txt", "session_a.txt"):
+        index.on_write(str(tmp_path / name), 2)
+        listing = index.list(tmp_path, ("session_*.txt",), sort="name")
+        assert [f["name"] for f in listing] == ["session_b.txt", "session_a.txt"]
+    assert index.get_stats()["cached_listings"] == 3
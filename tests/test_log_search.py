@@ -0,0 +1,88 @@
+"""Search index fed by the LogWriter: exact byte offsets and bounded postings."""
+
+from core import log_search as log_search_module
+from core.log_search import LogSearchIndex
+from core.log_writer import LogWriter
+
+
+def make_writer(monkeypatch, index: LogSearchIndex) -> LogWriter:
+    monkeypatch.setattr("core.log_writer.log_search", index)
+    writer = LogWriter()
+    writer._start = lambda: None  # Drain by hand
+    return writer
+
+
+def test_live_appends_index_exact_offsets(tmp_path, monkeypatch):
+    index = LogSearchIndex()
+    writer = make_writer(monkeypatch, index)
+    path = tmp_path / "activity_EURUSD_2024-01-01.log"
+
+    writer.write(path, "cycle c1 — opened bx 1001\nsecond line\n")
+    writer._drain()
+    index.search(tmp_path, "bx")  # Builds the directory index
+
+    for i in range(5):
+        writer.write(path, f"ticket {2000 + i} — closed\nnoise {i}\n")
+        writer._drain()
+
+    assert index.get_stats()["lines_indexed_live"] == 10  # No gaps, no catch-up
+    result = index.search(tmp_path, "ticket 2004")
+    assert [r["line"] for r in result["results"]] == ["ticket 2004 — closed"]
+    raw = path.read_bytes()
+    offset = result["results"][0]["offset"]
+    assert raw[offset:].startswith("ticket 2004".encode())
+    assert b"\r\n" not in raw
+    writer.close()
+
+
+def test_postings_are_capped_by_evicting_oldest_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_search_module, "MAX_POSTINGS", 40)
+    for day in range(1, 6):
+        (tmp_path / f"session_2024-01-0{day}.txt").write_text(
+            "".join(f"day{day} token{i}\n" for i in range(5)))
+
+    index = LogSearchIndex()
+    result = index.search(tmp_path, "day5")
+    assert result["total"] == 5
+    assert result["evicted_files"] > 0
+    assert index.get_stats()["postings"] <= 40
+    assert index.search(tmp_path, "day1")["total"] == 0  # Oldest went first
+
+
+def test_catch_up_reads_files_without_holding_the_lock(tmp_path, monkeypatch):
+    import builtins
+    import threading
+
+    index = LogSearchIndex()
+    old = tmp_path / "session_2024-01-01.txt"
+    new = tmp_path / "session_2024-01-02.txt"
+    old.write_bytes(b"alpha one\n")
+    new.write_bytes(b"")
+    index.search(tmp_path, "alpha")  # Directory indexed
+    old.write_bytes(b"alpha one\nbeta two\n")  # Grew without being reported
+
+    reading, release = threading.Event(), threading.Event()
+    real_open = builtins.open
+
+    def slow_open(path, *args, **kwargs):
+        if str(path) == str(old):
+            reading.set()
+            release.wait(5)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", slow_open)
+    search = threading.Thread(target=index.search, args=(tmp_path, "beta"))
+    search.start()
+    assert reading.wait(5)
+
+    appended = threading.Thread(target=index.on_append, args=(str(new), 0, b"gamma three\n"))
+    appended.start()
+    appended.join(1)
+    live_done = not appended.is_alive()  # Not blocked behind the catch-up read
+    release.set()
+    search.join(5)
+    monkeypatch.undo()
+
+    assert live_done
+    assert index.search(tmp_path, "beta")["total"] == 1
+    assert index.search(tmp_path, "gamma")["total"] == 1
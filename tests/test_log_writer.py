@@ -0,0 +1,116 @@
+"""LogWriter: one failing file must not cost the others their batch."""
+
+import threading
+
+from core.log_writer import LogWriter
+
+
+def test_failing_path_only_loses_its_own_lines(tmp_path):
+    writer = LogWriter()
+    writer._start = lambda: None  # Drain by hand
+    good = tmp_path / "good.log"
+    bad = tmp_path / "bad_dir"
+    bad.mkdir()  # Opening a directory for append fails
+
+    writer.write(good, "one\n")
+    writer.write(bad, "lost\n")
+    writer.write(good, "two\n")
+    writer._drain()
+
+    assert good.read_text() == "one\ntwo\n"
+    stats = writer.get_stats()
+    assert stats["written_lines"] == 2
+    assert stats["dropped_lines"] == 1
+    assert stats["write_errors"] == 1
+    writer.close()
+
+
+def test_failed_binary_data_is_retried(tmp_path):
+    writer = LogWriter()
+    writer._start = lambda: None
+    journal = tmp_path / "journal" / "events.bin"
+    journal.parent.mkdir()
+    journal.mkdir()  # Blocks the path for now
+
+    writer.write_bytes(journal, b"abc")
+    writer.write_bytes(journal, b"def")
+    writer._drain()
+    assert writer.get_stats()["queue_depth"] == 2  # Put back, in order
+
+    journal.rmdir()
+    writer._drain()
+    assert journal.read_bytes() == b"abcdef"
+    assert writer.get_stats()["queue_depth"] == 0
+    writer.close()
+
+
+def test_concurrent_first_writes_start_one_thread(tmp_path, monkeypatch):
+    started = []
+    real_thread = threading.Thread
+
+    def counting_thread(*args, **kwargs):
+        thread = real_thread(*args, **kwargs)
+        if kwargs.get("name") == "log-writer":
+            started.append(thread)
+        return thread
+
+    monkeypatch.setattr(threading, "Thread", counting_thread)
+    writer = LogWriter()
+    barrier = threading.Barrier(16)
+
+    def produce(i):
+        barrier.wait()
+        writer.write(tmp_path / f"f{i}.log", "x\n")
+
+    producers = [real_thread(target=produce, args=(i,)) for i in range(16)]
+    for t in producers:
+        t.start()
+    for t in producers:
+        t.join()
+
+    assert len(started) == 1
+    writer.close()
+
+
+def test_failed_rotation_keeps_the_batch_and_backs_off(tmp_path):
+    writer = LogWriter()
+    writer._start = lambda: None
+    writer.MAX_BYTES = 4
+    attempts = []
+
+    def locked(path):
+        attempts.append(path)
+        raise PermissionError("file is open in another process")
+
+    writer._rotate = locked
+    log = tmp_path / "activity.log"
+    writer.write(log, "one\n")
+    writer._drain()
+    writer.write(log, "two\n")
+    writer._drain()  # Within ROTATE_RETRY: no second attempt
+
+    assert log.read_text() == "one\ntwo\n"
+    stats = writer.get_stats()
+    assert stats["written_lines"] == 2
+    assert stats["dropped_lines"] == 0 and stats["write_errors"] == 0
+    assert stats["rotation_errors"] == 1
+    assert len(attempts) == 1
+    writer.close()
+
+
+def test_never_rotate_files_stay_whole(tmp_path):
+    writer = LogWriter()
+    writer._start = lambda: None
+    writer.MAX_BYTES = 4
+    session = tmp_path / "session_x.txt"
+    writer.never_rotate(session)
+    writer.write(session, "one\n")
+    writer.write(session, "two\n")
+    writer._drain()
+    writer.write(session, "three\n")
+    writer._drain()
+
+    assert session.read_text() == "one\ntwo\nthree\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["session_x.txt"]
+    assert writer.get_stats()["rotations"] == 0
+    writer.close()
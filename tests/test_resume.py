@@ -0,0 +1,35 @@
+"""Auto-resume: never open a new grid on top of positions left open."""
+
+import asyncio
+from types import SimpleNamespace
+
+from core.bot_manager import BotManager
+from core.engine import pair_strategy_engine
+from core.engine.pair_strategy_engine import PairStrategyEngine
+
+
+def test_resume_skips_symbols_with_open_positions(sandbox, monkeypatch):
+    mt5 = pair_strategy_engine.mt5
+    magic = PairStrategyEngine.MAGIC_NUMBER
+    open_positions = {
+        "EURUSD": [SimpleNamespace(ticket=1, magic=magic), SimpleNamespace(ticket=2, magic=magic)],
+        "GBPUSD": [SimpleNamespace(ticket=3, magic=999)],  # Someone else's position
+    }
+    sent = []
+    monkeypatch.setattr(mt5, "positions_get", lambda symbol=None, **k: open_positions.get(symbol, ()))
+    monkeypatch.setattr(mt5, "symbol_info_tick", lambda symbol: SimpleNamespace(ask=1.1002, bid=1.1, time=0))
+    monkeypatch.setattr(mt5, "order_send", lambda request: sent.append(request["symbol"]))
+
+    async def run():
+        manager = BotManager()
+        report = await manager.resume_all({"pytest-resume": ["EURUSD", "GBPUSD"]})
+        bot = manager.bots["pytest-resume"]
+        for strategy in list(bot.strategies.values()):
+            strategy.running = False
+        return report["users"]["pytest-resume"]
+
+    outcome = asyncio.run(run())
+    assert outcome["blocked"] == {"EURUSD": 2}
+    assert "EURUSD" not in outcome["running"]
+    assert "EURUSD" not in sent
+    assert "GBPUSD" in sent  # Not ours, so it does not block
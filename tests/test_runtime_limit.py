@@ -0,0 +1,113 @@
+"""Runtime limit timers: many orchestrators with short limits on one loop."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core.config_manager import ConfigManager
+from core.strategy_orchestrator import StrategyOrchestrator
+
+USERS = 40
+LIMIT = 0.05  # Seconds of max runtime
+HARD_STOP = 0.05  # Seconds of graceful stop allowed before the hard stop
+
+
+class FakeStrategy:
+    """Just the surface the orchestrator's timers touch; `lingers` keeps running after stop()."""
+
+    def __init__(self, lingers: bool = False):
+        self.running = True
+        self.graceful_stop = False
+        self.lingers = lingers
+        self.stop_calls = 0
+        self.state = SimpleNamespace(cycle_count=1)
+        self.activity_log = SimpleNamespace(log_stop=lambda *a: None)
+
+    async def stop(self):
+        self.stop_calls += 1
+        self.graceful_stop = True
+        if not self.lingers:
+            self.running = False
+
+
+@pytest.fixture
+def orchestrators(sandbox, monkeypatch):
+    monkeypatch.setattr(StrategyOrchestrator, "HARD_STOP_DELAY", HARD_STOP)
+    bots = []
+    for i in range(USERS):
+        user_id = f"pytest-runtime-{i}"
+        bot = StrategyOrchestrator(ConfigManager(user_id=user_id), user_id=user_id)
+        bot.strategies.clear()
+        bot.config_manager.config.setdefault("global", {})["max_runtime_minutes"] = LIMIT / 60
+        bots.append(bot)
+    return bots
+
+
+def start(bot, symbol, strategy):
+    bot.strategies[symbol] = strategy
+    bot._on_run_changed()
+
+
+def test_limit_stops_every_orchestrator(orchestrators):
+    async def run():
+        strategies = [FakeStrategy() for _ in orchestrators]
+        for bot, strategy in zip(orchestrators, strategies):
+            start(bot, "EURUSD", strategy)
+        await asyncio.sleep(LIMIT * 3)
+        return strategies
+
+    strategies = asyncio.run(run())
+    assert all(s.stop_calls == 1 and not s.running for s in strategies)
+    assert all(bot.is_idle() and bot._run_started_at is None for bot in orchestrators)
+    assert all(bot._runtime_handle is None and bot._hard_stop_handle is None for bot in orchestrators)
+
+
+def test_stopping_before_the_limit_cancels_the_timer(orchestrators):
+    async def run():
+        strategies = [FakeStrategy() for _ in orchestrators]
+        for bot, strategy in zip(orchestrators, strategies):
+            start(bot, "EURUSD", strategy)
+        for bot, strategy in zip(orchestrators, strategies):
+            strategy.running = False  # Stopped by hand
+            bot._on_run_changed()
+        await asyncio.sleep(LIMIT * 3)
+        return strategies
+
+    strategies = asyncio.run(run())
+    assert all(s.stop_calls == 0 for s in strategies)
+    assert all(bot._runtime_handle is None for bot in orchestrators)
+
+
+def test_hard_stop_ends_lingering_graceful_stops(orchestrators):
+    async def run():
+        strategies = [FakeStrategy(lingers=True) for _ in orchestrators]
+        for bot, strategy in zip(orchestrators, strategies):
+            start(bot, "EURUSD", strategy)
+        await asyncio.sleep(LIMIT + HARD_STOP / 2)
+        armed = [bot._hard_stop_handle is not None for bot in orchestrators]
+        await asyncio.sleep(HARD_STOP * 3)
+        return strategies, armed
+
+    strategies, armed = asyncio.run(run())
+    assert all(armed)
+    assert all(s.stop_calls == 1 and not s.running for s in strategies)
+
+
+def test_restart_during_graceful_stop_is_not_hard_stopped(orchestrators):
+    async def run():
+        lingering = [FakeStrategy(lingers=True) for _ in orchestrators]
+        for bot, strategy in zip(orchestrators, lingering):
+            start(bot, "EURUSD", strategy)
+        await asyncio.sleep(LIMIT + HARD_STOP / 2)  # Graceful stop on, hard stop armed
+
+        restarted = [FakeStrategy() for _ in orchestrators]
+        for bot, strategy in zip(orchestrators, restarted):
+            bot.config_manager.config["global"]["max_runtime_minutes"] = 0  # New run: no limit
+            start(bot, "GBPUSD", strategy)
+        await asyncio.sleep(HARD_STOP * 3)
+        return restarted
+
+    restarted = asyncio.run(run())
+    assert all(s.running and s.stop_calls == 0 for s in restarted)
+    assert all(bot._hard_stop_handle is None and bot._runtime_handle is None for bot in orchestrators)
@@ -0,0 +1,50 @@
+"""Status deltas: None is a value, removals are listed separately."""
+
+import asyncio
+
+from core.status_hub import StatusHub, diff_status
+
+
+def test_diff_keeps_none_values_and_lists_removals():
+    old = {"running": True, "strategies": {"EURUSD": {"direction": "buy", "step": 2}, "GBPUSD": {"step": 1}}}
+    new = {"running": True, "strategies": {"EURUSD": {"direction": None, "step": 2}}}
+    delta, removed = diff_status(old, new)
+    assert delta == {"strategies": {"EURUSD": {"direction": None}}}
+    assert removed == [["strategies", "GBPUSD"]]
+
+
+class FakeOrchestrator:
+    user_id = "u1"
+
+    def __init__(self):
+        self.version = 1
+        self.status = {"current_price": None, "strategies": {"EURUSD": {"phase": "IDLE"}}}
+
+    def get_status_versioned(self):
+        return self.version, self.status
+
+
+def test_hub_pushes_none_and_removed(monkeypatch):
+    monkeypatch.setattr(StatusHub, "PUSH_INTERVAL", 0.01)
+
+    async def run():
+        hub = StatusHub()
+        orch = FakeOrchestrator()
+        queue = hub.subscribe(orch)
+        snapshot = queue.get_nowait()
+        assert snapshot["data"]["current_price"] is None
+
+        orch.version = 2
+        orch.status = {"current_price": None, "strategies": {"EURUSD": {"phase": "IDLE", "direction": None}}}
+        first = await asyncio.wait_for(queue.get(), 1)
+        orch.version = 3
+        orch.status = {"current_price": None, "strategies": {}}
+        second = await asyncio.wait_for(queue.get(), 1)
+        hub.unsubscribe(orch, queue)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["data"] == {"strategies": {"EURUSD": {"direction": None}}}
+    assert first["removed"] == []
+    assert second["data"] == {}
+    assert second["removed"] == [["strategies", "EURUSD"]]